@@ -3,17 +3,38 @@ import sqlite3
 import pandas as pd
 import numpy as np
 import re
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from utils.db import cached_query, get_connection, table_versions
+from utils.embedding_store import append_embeddings, similarities, stale_embeddings
+from utils.prescore import note_activity
+from utils.profiling import profile_section
+from utils.resume_index import BM25_WEIGHTS, FTS_TABLE
 
 # Configuration
-DATABASE_PATH = "mydb.db"
 EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+CROSS_ENCODER_MODEL = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
 BATCH_SIZE = 32
+LEXICAL_K = 1000        # resumes kept by the BM25 filter (stage 1)
+RERANK_K = 50           # candidates re-scored by the cross-encoder (stage 3)
+MAX_QUERY_TERMS = 64    # job terms used in the BM25 query
+STAGE_CACHE_SIZE = 32   # cached stage outputs kept per process
+PAIR_CACHE_SIZE = 20000 # cross-encoder (job, summary) scores kept per process
+SCORE_CHUNK = 200       # resumes scored by the bi-encoder between progress updates
+RERANK_CHUNK = 10       # candidates re-scored by the cross-encoder between updates
+PREVIEW_ROWS = 25       # rows of the running top-N table shown while scoring
+SEMANTIC_WEIGHT = 0.6
+SKILL_WEIGHT = 0.4
+SCORING_VERSION = 1     # bump when the scoring formula changes, to retire stored results
 
 class ATSAnalyzer:
     def __init__(self):
+        # torch and transformers load here, not when the page is imported
+        from sentence_transformers import SentenceTransformer
         self.model = SentenceTransformer(EMBEDDING_MODEL)
         self.embedding_cache = {}
 
@@ -21,20 +42,45 @@ class ATSAnalyzer:
         """Batch process embeddings with caching"""
         uncached = [text for text in texts if text not in self.embedding_cache]
         if uncached:
-            batch_embeddings = self.model.encode(
-                uncached, 
-                batch_size=BATCH_SIZE,
-                convert_to_numpy=True,
-                show_progress_bar=False
-            )
+            with profile_section("model"):
+                batch_embeddings = self.model.encode(
+                    uncached, 
+                    batch_size=BATCH_SIZE,
+                    convert_to_numpy=True,
+                    show_progress_bar=False
+                )
             for text, embedding in zip(uncached, batch_embeddings):
                 self.embedding_cache[text] = embedding
         return np.array([self.embedding_cache[text] for text in texts])
 
-@st.cache_data
+_analyzer = None
+_analyzer_lock = threading.Lock()
+_cross_encoder = None
+_stage_cache = OrderedDict()
+_stage_cache_lock = threading.Lock()
+_pair_cache = OrderedDict()
+
+def get_analyzer():
+    """The process-wide analyzer; the model is loaded once and shared by all sessions."""
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            with profile_section("model"):
+                _analyzer = ATSAnalyzer()
+        return _analyzer
+
+def get_cross_encoder():
+    """The process-wide cross-encoder used to re-rank the top candidates."""
+    global _cross_encoder
+    with _analyzer_lock:
+        if _cross_encoder is None:
+            from sentence_transformers import CrossEncoder
+            with profile_section("model"):
+                _cross_encoder = CrossEncoder(CROSS_ENCODER_MODEL)
+        return _cross_encoder
+
 def fetch_resumes_from_db():
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
         query = """
         SELECT 
             Resume_ID, 
@@ -48,14 +94,12 @@ def fetch_resumes_from_db():
             RESUME_SUMMARY
         FROM RESUMES
         """
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        df = cached_query(query, ["RESUMES"])
         return df
     except sqlite3.Error as e:
         st.error(f"Database Error: {e}")
         return pd.DataFrame()
 
-@st.cache_data
 def fetch_job_descriptions():
     """
     Fetch job descriptions from the JOBS table.
@@ -63,10 +107,8 @@ def fetch_job_descriptions():
     Returns a dictionary mapping Job_Details -> Description.
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
         query = "SELECT Job_Details, Description FROM JOBS"
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        df = cached_query(query, ["Jobs"])
         if 'Job_Details' in df.columns and 'Description' in df.columns:
             return dict(zip(df['Job_Details'], df['Description']))
         else:
@@ -75,24 +117,346 @@ def fetch_job_descriptions():
         st.error(f"Error fetching job descriptions: {e}")
         return {}
 
-def calculate_scores(analyzer, job_embedding, resume_summaries, required_skills, resume_skills_list):
+def resume_similarities(analyzer, job_embedding, resume_ids, resume_summaries):
+    """
+    Cosine similarity of the job to each resume summary, read from the shared
+    embedding store. Resumes not in the store yet, or whose summary changed
+    since they were embedded, are embedded and added first.
+    """
+    conn = get_connection()
+    stale = set(stale_embeddings(conn, EMBEDDING_MODEL, resume_ids, resume_summaries))
+    if stale:
+        positions = [i for i, resume_id in enumerate(resume_ids) if resume_id in stale]
+        texts = [resume_summaries[i] for i in positions]
+        with profile_section("model"):
+            vectors = analyzer.model.encode(
+                texts, batch_size=BATCH_SIZE, convert_to_numpy=True, show_progress_bar=False
+            )
+        append_embeddings(conn, EMBEDDING_MODEL, [resume_ids[i] for i in positions], vectors, texts)
+        conn.commit()
+    return similarities(conn, EMBEDDING_MODEL, job_embedding, resume_ids)
+
+def job_skill_terms(job_description):
+    """The words of a job description the skill score looks for (case variants count separately)."""
+    return sorted(set(re.findall(r'\b[A-Za-z-+]+\b', job_description or "")))
+
+
+def skill_match_scores(required_skills, resume_skills_list):
+    """Share of the required terms found in each resume's skills (case-insensitive substring match)."""
+    if not required_skills:
+        return np.zeros(len(resume_skills_list))
+    terms = [term.lower() for term in required_skills]
+    return np.array([
+        sum(1 for term in terms if term in (resume_skills or "").lower()) / len(terms)
+        for resume_skills in resume_skills_list
+    ])
+
+
+def calculate_scores(analyzer, job_embedding, resume_ids, resume_summaries, required_skills, resume_skills_list):
     """
     Calculate match scores based on both semantic similarity and required skills.
     Semantic similarity is computed between the job description and each resume summary.
     Skill match score is calculated by checking the presence of required skills in each resume.
     The final score is a weighted combination of these two measures.
     """
-    resume_embeddings = analyzer.batch_embed(resume_summaries)
-    semantic_similarities = cosine_similarity([job_embedding], resume_embeddings)[0]
-    skill_match_scores = []
-    for resume_skills in resume_skills_list:
-        matched_skills = [kw for kw in required_skills if kw.lower() in resume_skills.lower()]
-        match_percentage = len(matched_skills) / len(required_skills) if required_skills else 0
-        skill_match_scores.append(match_percentage)
-    
-    combined_scores = (0.6 * semantic_similarities) + (0.4 * np.array(skill_match_scores))
+    semantic_similarities = resume_similarities(analyzer, job_embedding, resume_ids, resume_summaries)
+    skill_scores = skill_match_scores(required_skills, resume_skills_list)
+    combined_scores = (SEMANTIC_WEIGHT * semantic_similarities) + (SKILL_WEIGHT * skill_scores)
     return (combined_scores * 100).clip(0, 100)
 
+# ------------------------------------------------------------------------------
+# Staged ranking: lexical filter -> bi-encoder -> cross-encoder on the top K
+# ------------------------------------------------------------------------------
+# Stage 1 keeps the LEXICAL_K resumes with the best BM25 score for the job's
+# terms (skipped when the corpus is that small anyway). Stage 2 is the
+# original MiniLM + skill score on those candidates. Stage 3 re-scores only
+# the RERANK_K best of them with a cross-encoder, which reads the job and the
+# summary together and ranks better but costs a model call per pair. The
+# extra cost per query is therefore bounded by RERANK_K, whatever the corpus
+# size. Every stage is timed, and its output is cached per job description
+# and corpus version.
+#
+# Stages 2 and 3 run in chunks (SCORE_CHUNK / RERANK_CHUNK resumes) and
+# iter_score_candidates() yields the ranking so far after each one, so the
+# page can draw a running top-N table long before the scan finishes. A
+# stage's result is only cached once it has run to the end.
+def _description_key(job_description):
+    return hashlib.sha1(job_description.strip().encode("utf-8")).hexdigest()
+
+
+def _stage_lookup(stage, key):
+    with _stage_cache_lock:
+        if (stage, key) in _stage_cache:
+            _stage_cache.move_to_end((stage, key))
+            return _stage_cache[(stage, key)]
+    return None
+
+
+def _stage_store(stage, key, result):
+    with _stage_cache_lock:
+        _stage_cache[(stage, key)] = result
+        while len(_stage_cache) > STAGE_CACHE_SIZE:
+            _stage_cache.popitem(last=False)
+
+
+def _cached_stage(stage, key, compute):
+    """Run compute() unless this stage already has a result for key. Returns (result, seconds, cached)."""
+    started = time.perf_counter()
+    result = _stage_lookup(stage, key)
+    if result is not None:
+        return result, time.perf_counter() - started, True
+    result = compute()
+    _stage_store(stage, key, result)
+    return result, time.perf_counter() - started, False
+
+
+def lexical_candidates(required_skills, limit=LEXICAL_K):
+    """Resume_IDs of the best BM25 matches for any of the job's terms."""
+    # Longest first, ties alphabetical, so every process builds the same query.
+    terms = sorted({term.lower() for term in required_skills if len(term) > 1}, key=lambda t: (-len(t), t))
+    if not terms:
+        return []
+    match_query = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms[:MAX_QUERY_TERMS])
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    df = cached_query(f'''
+        SELECT rowid AS Resume_ID FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH ?
+        ORDER BY bm25({FTS_TABLE}, {weights})
+        LIMIT ?
+    ''', ["RESUMES"], params=(match_query, limit))
+    return df["Resume_ID"].tolist()
+
+
+def cross_encoder_scores(job_description, summaries):
+    """
+    Cross-encoder relevance of each summary to the job, scaled to 0-100.
+    Scores are remembered per (job, summary text), so when new resumes enter
+    a job's top K only those pairs go through the model.
+    """
+    job_key = _description_key(job_description)
+    keys = [(job_key, hashlib.sha1((summary or "").encode("utf-8")).hexdigest()) for summary in summaries]
+    scores = np.empty(len(summaries), dtype=float)
+    todo = []
+    with _stage_cache_lock:
+        for i, key in enumerate(keys):
+            if key in _pair_cache:
+                _pair_cache.move_to_end(key)
+                scores[i] = _pair_cache[key]
+            else:
+                todo.append(i)
+    if todo:
+        cross_encoder = get_cross_encoder()
+        with profile_section("model"):
+            logits = np.asarray(cross_encoder.predict(
+                [(job_description, summaries[i]) for i in todo], batch_size=BATCH_SIZE, show_progress_bar=False
+            ), dtype=float)
+        scores[todo] = 100 / (1 + np.exp(-logits))
+        with _stage_cache_lock:
+            for i in todo:
+                _pair_cache[keys[i]] = scores[i]
+            while len(_pair_cache) > PAIR_CACHE_SIZE:
+                _pair_cache.popitem(last=False)
+    return scores
+
+
+def _progress(ranking, stage, done, total, started, timings, final=False):
+    return {
+        "ranking": ranking, "stage": stage, "done": done, "total": total,
+        "seconds": time.perf_counter() - started, "timings": timings, "final": final,
+    }
+
+
+def iter_score_candidates(df_db, job_description, required_skills, rerank=True):
+    """
+    Run the ranking stages over the whole pool, yielding a progress dict
+    after every chunk: "ranking" so far (Resume_ID, Match %, optional
+    Rerank %; best first), "stage", "done" and "total" resumes of that
+    stage, its "seconds" so far and the "timings" of finished stages. The
+    last one has "final" set and holds the complete ranking.
+    """
+    key = (_description_key(job_description), table_versions("RESUMES"))
+    timings = []
+
+    # Stage 1: cheap lexical filter
+    if len(df_db) > LEXICAL_K:
+        ids, seconds, cached = _cached_stage("lexical", key, lambda: lexical_candidates(required_skills))
+        candidates = df_db[df_db["Resume_ID"].isin(ids)].reset_index(drop=True)
+    else:
+        candidates, seconds, cached = df_db, 0.0, False
+    stage = "Lexical filter" if len(df_db) > LEXICAL_K else "Lexical filter (skipped, small corpus)"
+    timings.append((stage, seconds, len(candidates), cached))
+    if candidates.empty:
+        yield _progress(pd.DataFrame(columns=["Resume_ID", "Match %"]), stage, 0, 0, time.perf_counter(), timings, True)
+        return
+
+    # Stage 2: bi-encoder similarity and skill overlap on the candidates
+    started = time.perf_counter()
+    stage_key = key + (tuple(candidates["Resume_ID"]),)
+    scores = _stage_lookup("bi_encoder", stage_key)
+    cached = scores is not None
+    if not cached:
+        analyzer = get_analyzer()
+        job_embedding = analyzer.batch_embed([job_description])[0]
+        scores = np.empty(len(candidates))
+        for start in range(0, len(candidates), SCORE_CHUNK):
+            chunk = candidates.iloc[start:start + SCORE_CHUNK]
+            done = start + len(chunk)
+            scores[start:done] = calculate_scores(
+                analyzer, job_embedding, chunk["Resume_ID"].tolist(), chunk["RESUME_SUMMARY"].tolist(),
+                required_skills, chunk["SKILLS"].tolist()
+            )
+            if done < len(candidates):
+                partial = candidates.iloc[:done][["Resume_ID"]].assign(**{"Match %": np.round(scores[:done], 1)})
+                partial = partial.sort_values("Match %", ascending=False, kind="stable").reset_index(drop=True)
+                yield _progress(partial, "Bi-encoder", done, len(candidates), started, timings)
+        _stage_store("bi_encoder", stage_key, scores)
+    timings.append(("Bi-encoder", time.perf_counter() - started, len(candidates), cached))
+    ranking = candidates[["Resume_ID", "RESUME_SUMMARY"]].assign(**{"Match %": np.round(scores, 1)})
+    ranking = ranking.sort_values("Match %", ascending=False, kind="stable")
+
+    # Stage 3: cross-encoder on the top RERANK_K only. A threshold only ever
+    # cuts the tail of the Match % order, so these are also the top K of
+    # any thresholded result.
+    if rerank:
+        started = time.perf_counter()
+        top = ranking.head(RERANK_K)
+        stage_key = key + (tuple(top["Resume_ID"]),)
+        rerank_scores = _stage_lookup("cross_encoder", stage_key)
+        cached = rerank_scores is not None
+        if not cached:
+            summaries = top["RESUME_SUMMARY"].tolist()
+            rerank_scores = np.full(len(top), np.nan)
+            for start in range(0, len(top), RERANK_CHUNK):
+                done = min(start + RERANK_CHUNK, len(top))
+                rerank_scores[start:done] = cross_encoder_scores(job_description, summaries[start:done])
+                if done < len(top):
+                    partial = ranking.drop(columns="RESUME_SUMMARY").reset_index(drop=True)
+                    partial.loc[:len(top) - 1, "Rerank %"] = np.round(rerank_scores, 1)
+                    yield _progress(partial, "Cross-encoder", done, len(top), started, timings)
+            _stage_store("cross_encoder", stage_key, rerank_scores)
+        timings.append(("Cross-encoder", time.perf_counter() - started, len(top), cached))
+        top = top.assign(**{"Rerank %": np.round(rerank_scores, 1)}).sort_values("Rerank %", ascending=False)
+        ranking = pd.concat([top, ranking.iloc[RERANK_K:]], ignore_index=True)
+    ranking = ranking.drop(columns="RESUME_SUMMARY").reset_index(drop=True)
+    yield _progress(ranking, timings[-1][0], len(ranking), len(ranking), started, timings, True)
+
+
+def score_candidates(df_db, job_description, required_skills, rerank=True):
+    """The complete ranking of iter_score_candidates() and the stage timings."""
+    for progress in iter_score_candidates(df_db, job_description, required_skills, rerank):
+        pass
+    return progress["ranking"], progress["timings"]
+
+
+# ------------------------------------------------------------------------------
+# Persistent result cache
+# ------------------------------------------------------------------------------
+# The full ranking of an analysis (before the threshold is applied) is stored
+# in ATS_RESULT_CACHE under a hash of the normalized job description, the
+# models, the scoring weights and the stage sizes, together with the RESUMES
+# data version it was computed on. Any resume write bumps that version, so
+# a stored ranking is only reused while the pool is unchanged; changing the
+# threshold just re-filters it. Rankings for older versions are pruned on
+# the next store.
+def normalize_description(job_description):
+    """Both models are uncased, so case and spacing do not change the ranking."""
+    return " ".join(job_description.lower().split())
+
+
+def result_cache_key(job_description, rerank):
+    parts = [
+        normalize_description(job_description),
+        EMBEDDING_MODEL,
+        CROSS_ENCODER_MODEL if rerank else "",
+        SEMANTIC_WEIGHT, SKILL_WEIGHT, LEXICAL_K, RERANK_K if rerank else 0,
+        SCORING_VERSION,
+    ]
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def load_ranking(cache_key, corpus_version):
+    """(ranking, time it was computed) stored for this corpus version, or (None, None)."""
+    row = get_connection().execute(
+        "SELECT ranking, created_at FROM ATS_RESULT_CACHE WHERE cache_key = ? AND corpus_version = ?",
+        (cache_key, corpus_version)
+    ).fetchone()
+    return (pd.DataFrame(json.loads(row[0])), row[1]) if row else (None, None)
+
+
+def store_ranking(cache_key, corpus_version, ranking):
+    conn = get_connection()
+    columns = {column: [None if pd.isna(v) else v for v in ranking[column].tolist()] for column in ranking.columns}
+    conn.execute("DELETE FROM ATS_RESULT_CACHE WHERE corpus_version <> ?", (corpus_version,))
+    conn.execute(
+        "INSERT OR REPLACE INTO ATS_RESULT_CACHE (cache_key, corpus_version, created_at, ranking) VALUES (?, ?, ?, ?)",
+        (cache_key, corpus_version, datetime.now().isoformat(timespec="seconds"), json.dumps(columns))
+    )
+    conn.commit()
+
+
+def stream_ranking(job_description, match_threshold, rerank=True):
+    """
+    iter_score_candidates() for the whole resume pool, with each "ranking"
+    replaced by "results": candidates at or above match_threshold with
+    their contact details, best first. "timings" has one entry per stage:
+    (stage, seconds, items out, served from cache). A stored ranking is
+    yielded at once. Yields a single final update whose results are None
+    when the description has no usable terms, and empty with no timings
+    when there are no resumes.
+    """
+    df_db = fetch_resumes_from_db()
+    required_skills = job_skill_terms(job_description)
+    if df_db.empty or not required_skills:
+        yield {
+            "results": pd.DataFrame() if df_db.empty else None, "stage": None, "done": 0, "total": 0,
+            "seconds": 0.0, "timings": [], "final": True,
+        }
+        return
+
+    started = time.perf_counter()
+    cache_key = result_cache_key(job_description, rerank)
+    corpus_version = table_versions("RESUMES")[0]
+    ranking, _ = load_ranking(cache_key, corpus_version)
+    if ranking is not None:
+        timings = [("Stored result", time.perf_counter() - started, len(ranking), True)]
+        updates = [_progress(ranking, "Stored result", len(ranking), len(ranking), started, timings, True)]
+    else:
+        updates = iter_score_candidates(df_db, job_description, required_skills, rerank)
+    for progress in updates:
+        if progress["final"] and ranking is None:
+            store_ranking(cache_key, corpus_version, progress["ranking"])
+        results = _with_details(progress.pop("ranking"), df_db, match_threshold)
+        yield {**progress, "results": results}
+
+
+def rank_resumes(job_description, match_threshold, rerank=True):
+    """The final results and stage timings of stream_ranking()."""
+    for progress in stream_ranking(job_description, match_threshold, rerank):
+        pass
+    return progress["results"], progress["timings"]
+
+
+def prescored_results(job_description, match_threshold, rerank=True):
+    """
+    The stored ranking for the current resumes, thresholded, and when it was
+    computed; (None, None) if it has not been scored yet. Never runs a model.
+    """
+    df_db = fetch_resumes_from_db()
+    ranking, refreshed_at = load_ranking(result_cache_key(job_description, rerank), table_versions("RESUMES")[0])
+    if ranking is None or df_db.empty:
+        return None, None
+    return _with_details(ranking, df_db, match_threshold), refreshed_at
+
+
+def _with_details(ranking, df_db, match_threshold):
+    details = df_db[["Resume_ID", "NAME", "EMAIL", "PHONE_NUMBER", "SKILLS"]]
+    results = ranking[ranking["Match %"] >= match_threshold].merge(details, on="Resume_ID", how="inner", sort=False)
+    columns = ["Resume_ID", "NAME", "EMAIL", "PHONE_NUMBER", "Match %", "SKILLS"]
+    if "Rerank %" in results.columns:
+        columns.append("Rerank %")
+    return results[columns].reset_index(drop=True)
+
+
 def resume_matching_system():
     st.title("📄 ATS Resume Analyzer")
     
@@ -100,7 +464,7 @@ def resume_matching_system():
     job_descriptions = fetch_job_descriptions()
     
     job_options = ["Custom"] + list(job_descriptions.keys())
-    selected_job = st.selectbox("Select a job description:", job_options)
+    selected_job = st.selectbox("Select a job description:", job_options, key="ats_job")
     if selected_job == "Custom":
         default_description = ""
         #st.warning("Please enter a custom job description.")
@@ -112,71 +476,88 @@ def resume_matching_system():
                                     height=200, 
                                     placeholder="Paste complete job description...")
         
-    match_threshold = st.number_input("Minimum Match Threshold (%):", min_value=0, max_value=100, value=70)
+    match_threshold = st.number_input("Minimum Match Threshold (%):", min_value=0, max_value=100, value=70, key="ats_threshold")
+    rerank = st.checkbox(f"Re-rank the top {RERANK_K} with a cross-encoder", value=True, key="ats_rerank")
     
     if st.button("Analyze Resumes"):
         if not job_description.strip():
             st.warning("⚠️ Please enter a job description.")
             return
 
-        with st.spinner("Fetching resumes from database..."):
-            df_db = fetch_resumes_from_db()
-        if df_db.empty:
+        note_activity()
+        st.session_state.pop("ats_partial", None)
+        # Clicking Cancel reruns the page, which stops this run at its next
+        # update; the rerun then shows what had been scored by then.
+        cancel_slot = st.empty()
+        cancel_slot.button("⏹ Cancel", key="ats_cancel")
+        progress_bar = st.progress(0.0)
+        status_text = st.empty()
+        preview = st.empty()
+        for progress in stream_ranking(job_description, match_threshold, rerank):
+            if progress["final"]:
+                break
+            st.session_state.ats_partial = progress["results"]
+            rate = progress["done"] / progress["seconds"] if progress["seconds"] else 0.0
+            eta = (progress["total"] - progress["done"]) / rate if rate else 0.0
+            progress_bar.progress(progress["done"] / progress["total"])
+            status_text.text(
+                f"{progress['stage']}: {progress['done']}/{progress['total']} resumes, "
+                f"{rate:.0f} resumes/s, about {eta:.0f}s left in this stage"
+            )
+            preview.dataframe(progress["results"].head(PREVIEW_ROWS), use_container_width=True, hide_index=True)
+        for slot in (cancel_slot, progress_bar, status_text, preview):
+            slot.empty()
+        st.session_state.pop("ats_partial", None)
+        results_df, timings = progress["results"], progress["timings"]
+        if results_df is None:
+            st.warning("No meaningful skills found in the job description.")
+            return
+        if not timings:
             st.info("No resumes found in the database.")
             return
 
-        total_resumes = len(df_db)
-        
-        analyzer = ATSAnalyzer()
-        required_skills = list(set(re.findall(r'\b[A-Za-z-+]+\b', job_description)))
-        if not required_skills:
-            st.warning("No meaningful skills found in the job description.")
+        with st.expander("Ranking pipeline"):
+            for stage, seconds, items, cached in timings:
+                st.caption(f"{stage}: {seconds * 1000:.0f} ms, {items} resumes" + (" (cached)" if cached else ""))
+        show_results(results_df)
+    elif st.session_state.get("ats_cancel") and "ats_partial" in st.session_state:
+        st.warning("Analysis cancelled. Showing the candidates scored before it stopped.")
+        show_results(st.session_state.pop("ats_partial"))
+    elif selected_job != "Custom" and job_description == default_description and job_description.strip():
+        # Saved jobs are scored in the background (utils.prescore), so their
+        # results can be shown as soon as the job is picked.
+        results_df, refreshed_at = prescored_results(job_description, match_threshold, rerank)
+        if results_df is None:
+            st.caption("Not pre-scored against the latest resumes yet. Click Analyze Resumes to score now.")
             return
+        st.caption(f"🕒 Pre-scored results, last refreshed {refreshed_at.replace('T', ' ')}")
+        show_results(results_df)
 
-        job_embedding = analyzer.batch_embed([job_description])[0]
-        resume_summaries = df_db['RESUME_SUMMARY'].tolist()
-        resume_skills_list = df_db['SKILLS'].tolist()
-        
-        with st.spinner("Analyzing resumes..."):
-            scores = calculate_scores(analyzer, job_embedding, resume_summaries, required_skills, resume_skills_list)
-        
-        results = []
-        for idx, (score, row) in enumerate(zip(scores, df_db.itertuples(index=False))):
-            if score >= match_threshold:
-                results.append({
-                    "Resume_ID": row.Resume_ID,
-                    "NAME": row.NAME,
-                    "EMAIL": row.EMAIL,
-                    "PHONE_NUMBER": row.PHONE_NUMBER,
-                    "Match %": round(score, 1),
-                    "SKILLS": row.SKILLS
-                })
-        
-        if results:
-            results_df = pd.DataFrame(results).sort_values("Match %", ascending=False)
-            st.success(f"Found {len(results)} resumes that meet the minimum match criteria out of {total_resumes} total resumes.")
-            st.markdown("### Top Matching Candidates")
-            st.dataframe(
-                results_df,
-                column_config={
-                    "Match %": st.column_config.ProgressColumn(
-                        format="%.1f%%",
-                        min_value=0,
-                        max_value=100,
-                    )
-                },
-                use_container_width=True,
-                hide_index=True
-            )
-            csv_filename = f"ats_resume_matches_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
-            st.download_button(
-                label="📥 Export Results",
-                data=results_df.to_csv(index=False),
-                file_name=csv_filename,
-                mime="text/csv"
-            )
-        else:
-            st.info("No candidates met the minimum match criteria.")
+
+def show_results(results_df):
+    total_resumes = len(fetch_resumes_from_db())
+    if not results_df.empty:
+        st.success(f"Found {len(results_df)} resumes that meet the minimum match criteria out of {total_resumes} total resumes.")
+        st.markdown("### Top Matching Candidates")
+        progress = {"format": "%.1f%%", "min_value": 0, "max_value": 100}
+        st.dataframe(
+            results_df,
+            column_config={
+                "Match %": st.column_config.ProgressColumn(**progress),
+                "Rerank %": st.column_config.ProgressColumn(**progress),
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+        csv_filename = f"ats_resume_matches_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
+        st.download_button(
+            label="📥 Export Results",
+            data=results_df.to_csv(index=False),
+            file_name=csv_filename,
+            mime="text/csv"
+        )
+    else:
+        st.info("No candidates met the minimum match criteria.")
 
 if __name__ == "__main__":
     resume_matching_system()
@@ -7,7 +7,6 @@ logging.getLogger("torch").setLevel(logging.ERROR)
 import streamlit as st
 import sqlite3
 import pandas as pd
-import google.generativeai as genai
 import PyPDF2 as pdf
 from dotenv import load_dotenv
 import docx2txt
@@ -17,6 +16,11 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import BytesIO
 from typing import Tuple, Dict, Any
 import json
+from utils.db import bump_version, get_connection
+from utils.migrations import run_migrations
+from utils.fuzzy_index import index_resume
+from utils.job_matching import best_jobs_label, job_recommendations, match_resumes
+from utils.near_duplicates import duplicates_of, index_signature, resume_text
 
 # ------------------------------------------------------------------------------
 # Environment & Configuration
@@ -35,48 +39,18 @@ MAX_RETRIES = 3  # Maximum retry attempts for failed resumes
 # ------------------------------------------------------------------------------
 def init_db():
     """
-    Initialize (or upgrade) the SQLite database with table RESUMES.
-    This table stores resume details plus the file as a blob and its filename.
+    Make sure the schema (RESUMES table, search indexes, ...) is up to date
+    and return the shared database connection.
     """
-    conn = sqlite3.connect("mydb.db", check_same_thread=False)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS RESUMES(
-            Resume_ID INTEGER PRIMARY KEY AUTOINCREMENT,
-            NAME VARCHAR(50) NOT NULL,
-            EMAIL VARCHAR(50) NOT NULL,
-            PHONE_NUMBER VARCHAR(20) NOT NULL,
-            JOB_TITLE VARCHAR(50) NOT NULL,
-            CURRENT_JOB VARCHAR(50) NOT NULL,
-            SKILLS TEXT NOT NULL,
-            LOCATION VARCHAR(50) NOT NULL,
-            RESUME_SUMMARY TEXT NOT NULL,
-            RESUME_FILE BLOB,
-            FILE_NAME VARCHAR(100)
-        );
-    ''')
-    conn.commit()
-    
-    # Check if FILE_NAME column exists; if not, try to add it.
-    cursor.execute("PRAGMA table_info(RESUMES)")
-    columns = [info[1] for info in cursor.fetchall()]
-    if 'FILE_NAME' not in columns:
-        try:
-            cursor.execute("ALTER TABLE RESUMES ADD COLUMN FILE_NAME VARCHAR(100)")
-            conn.commit()
-        except sqlite3.OperationalError as e:
-            # Ignore error if column already exists.
-            if "duplicate column" in str(e).lower():
-                pass
-            else:
-                st.error(f"Error updating database schema: {e}")
+    conn = get_connection()
+    run_migrations(conn)
     return conn
 
 def get_all_resumes():
     """
     Retrieve all resume records from the database and return a DataFrame.
     """
-    conn = sqlite3.connect("mydb.db")
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute('''
         SELECT 
@@ -85,7 +59,6 @@ def get_all_resumes():
         FROM RESUMES
     ''')
     rows = cursor.fetchall()
-    conn.close()
     df = pd.DataFrame(rows, columns=[
         'Name', 'Email ID', 'Phone Number', 'Job Title', 'Current Company',
         'Skills', 'Location', 'Resume_Text', 'Resume_File', 'File_Name'
@@ -123,6 +96,7 @@ def extract_text(uploaded_file) -> str:
 # ------------------------------------------------------------------------------
 class GeminiProcessor:
     def __init__(self):
+        import google.generativeai as genai  # slow to import; only needed for uploads
         genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
         self.model = genai.GenerativeModel(
             'gemini-pro',
@@ -233,6 +207,7 @@ def process_file(uploaded_file, processor: GeminiProcessor):
                     "summary": summary if summary else "Not Specified",
                     "resume_file": file_data,
                     "file_name": uploaded_file.name,
+                    "resume_text": text,
                     "error": None
                 }
             else:
@@ -253,6 +228,7 @@ def process_file(uploaded_file, processor: GeminiProcessor):
                         "summary": summary if summary else "Not Specified",
                         "resume_file": file_data,
                         "file_name": uploaded_file.name,
+                        "resume_text": text,
                         "error": None
                     }
         except Exception as e:
@@ -265,6 +241,7 @@ def batch_insert(conn, data) -> int:
     """
     Insert new records or update existing records (by EMAIL) in the RESUMES table.
     Only records with a valid email (i.e. not "Email not found") are inserted.
+    Each written record gets its "resume_id" set.
     """
     try:
         cursor = conn.cursor()
@@ -288,7 +265,8 @@ def batch_insert(conn, data) -> int:
                             LOCATION = ?,
                             RESUME_SUMMARY = ?,
                             RESUME_FILE = ?,
-                            FILE_NAME = ?
+                            FILE_NAME = ?,
+                            RESUME_TEXT = ?
                         WHERE EMAIL = ?
                     ''', (
                         record.get("name", "Not Specified") or "Not Specified",
@@ -300,16 +278,18 @@ def batch_insert(conn, data) -> int:
                         record.get("summary", "Not Specified") or "Not Specified",
                         record.get("resume_file", None),
                         record.get("file_name", "Unknown"),
+                        record.get("resume_text"),
                         email
                     ))
+                    resume_id = result[0]
                     updated_count += 1
                 else:
                     cursor.execute('''
                         INSERT INTO RESUMES (
                             NAME, EMAIL, PHONE_NUMBER, JOB_TITLE, CURRENT_JOB, 
-                            SKILLS, LOCATION, RESUME_SUMMARY, RESUME_FILE, FILE_NAME
+                            SKILLS, LOCATION, RESUME_SUMMARY, RESUME_FILE, FILE_NAME, RESUME_TEXT
                         )
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         record.get("name", "Not Specified") or "Not Specified",
                         email,
@@ -320,9 +300,20 @@ def batch_insert(conn, data) -> int:
                         record.get("location", "Not Specified") or "Not Specified",
                         record.get("summary", "Not Specified") or "Not Specified",
                         record.get("resume_file", None),
-                        record.get("file_name", "Unknown")
+                        record.get("file_name", "Unknown"),
+                        record.get("resume_text")
                     ))
+                    resume_id = cursor.lastrowid
                     inserted_count += 1
+                record["resume_id"] = resume_id
+                index_resume(
+                    conn, resume_id,
+                    record.get("name"), record.get("current_company"), record.get("skills")
+                )
+                index_signature(conn, resume_id, resume_text(
+                    record.get("resume_text"), record.get("summary"), record.get("skills"), record.get("name")
+                ))
+        bump_version(conn, "RESUMES")
         conn.commit()
         st.success(f"Successfully inserted {inserted_count} records and updated {updated_count} records in the database.")
         return inserted_count + updated_count
@@ -419,12 +410,26 @@ def run_app():
         else:
             inserted_count = 0
 
-        st.dataframe(processed_data["name","email","phone","job_title","current_company","skills","location"], height=300)
+        # Score only the resumes from this upload against every open job.
+        resume_ids = [r["resume_id"] for r in valid_records if "resume_id" in r]
+        with st.spinner("Matching new resumes to open jobs..."):
+            match_resumes(conn, resume_ids)
+        recommendations = job_recommendations(resume_ids)
+        # Same person under another email, or a lightly edited resume
+        duplicates = duplicates_of(conn, resume_ids)
+        if not duplicates.empty:
+            st.warning(f"{len(duplicates)} uploaded resume(s) look like near-duplicates of stored ones. Review them on the Duplicates page.")
+
+        if processed_data:
+            summary = pd.DataFrame(processed_data)[["name", "email", "phone", "job_title", "current_company", "skills", "location"]]
+            summary["best_fit_jobs"] = [
+                best_jobs_label(recommendations[r["resume_id"]]) if r.get("resume_id") in recommendations else ""
+                for r in processed_data
+            ]
+            st.dataframe(summary, height=300)
         # st.success(f"Successfully processed {inserted_count} records.")
         if missing_email_count:
             st.info(f"Remaining errors: {missing_email_count} resume(s) with email not found.")
-        
-        conn.close()
     
     
 
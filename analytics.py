@@ -0,0 +1,70 @@
+import pandas as pd
+from utils.db import cached_query, get_connection
+
+# ------------------------------------------------------------------------------
+# Submission pipeline rollups
+# ------------------------------------------------------------------------------
+# SUBMISSION_ROLLUPS holds one row per (day, recruiter, client, status) with
+# the number of submissions in that bucket. Triggers on Submissions keep it
+# current, so the reporting queries below aggregate a few thousand rollup
+# rows instead of the submissions themselves.
+SELECTED_STATUS = "Selected"
+
+
+def ensure_rollups(conn):
+    """Make sure the rollup table and its triggers exist (created by migration 6)."""
+    from utils.migrations import run_migrations
+    run_migrations(conn)
+
+
+def _rollup_query(group_expr, start_day, end_day):
+    return cached_query(f'''
+        SELECT {group_expr} AS key,
+               SUM(submissions) AS Submissions,
+               SUM(CASE WHEN status = ? THEN submissions ELSE 0 END) AS Selected
+        FROM SUBMISSION_ROLLUPS
+        WHERE day BETWEEN ? AND ?
+        GROUP BY key
+        ORDER BY key
+    ''', ["Submissions"], params=(SELECTED_STATUS, str(start_day), str(end_day)))
+
+
+def submissions_by(dimension, start_day, end_day):
+    """
+    Submissions and selections per recruiter, client, status or week, with
+    the submission-to-selection conversion rate (in %).
+    """
+    ensure_rollups(get_connection())
+    group_expr = {
+        "recruiter": "recruiter",
+        "client": "client",
+        "status": "status",
+        # Weeks are rolled up from days below, as SQLite's strftime has no
+        # ISO week before 3.46.
+        "week": "day",
+    }[dimension]
+    df = _rollup_query(group_expr, start_day, end_day).copy()
+    if dimension == "week":
+        df = _by_iso_week(df)
+    df["Conversion %"] = (100 * df["Selected"] / df["Submissions"]).round(1)
+    return df.rename(columns={"key": dimension.capitalize()})
+
+
+def _by_iso_week(df):
+    """Sum per-day rows into ISO weeks labelled like 2024-W09 (days that are not ISO dates are dropped)."""
+    days = pd.to_datetime(df["key"], format="%Y-%m-%d", errors="coerce")
+    df = df[days.notna()]
+    iso = days[days.notna()].dt.isocalendar()
+    df = df.assign(key=iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2))
+    return df.groupby("key", as_index=False)[["Submissions", "Selected"]].sum()
+
+
+def rollup_date_range():
+    """(first day, last day) covered by the rollups, or (None, None) if empty."""
+    ensure_rollups(get_connection())
+    # Days the rollup could not parse as dates are kept as typed; leave them out.
+    df = cached_query(
+        "SELECT MIN(day) AS first_day, MAX(day) AS last_day FROM SUBMISSION_ROLLUPS WHERE date(day) IS NOT NULL",
+        ["Submissions"]
+    )
+    return df["first_day"].iloc[0], df["last_day"].iloc[0]
@@ -0,0 +1,312 @@
+import asyncio
+import hmac
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from utils.db import get_connection
+from utils.migrations import run_migrations
+
+# ------------------------------------------------------------------------------
+# Local HTTP API for ATS scores and resume search
+# ------------------------------------------------------------------------------
+# An aiohttp service next to the Streamlit app, for tools that want scores
+# without a browser: python -m utils.api (127.0.0.1:8502 by default).
+#
+#   POST /score            {"job_description": "...", "resume_ids": [1, 2]}
+#   GET  /jobs/{id}/top    ?k=10&rerank=1
+#   GET  /search           ?q=python, aws&mode=skills|keywords|fuzzy|emails&page=0&page_size=25
+#   GET  /health
+#
+# Model and database work runs on a small thread pool, where each worker
+# thread keeps its own SQLite connection (see utils.db) and all threads
+# share the process-wide models. At most MAX_CONCURRENT jobs run at once;
+# beyond MAX_QUEUED waiting requests the service answers 503 instead of
+# piling up. Score requests that arrive within BATCH_WINDOW of each other
+# are handled together, with all their job descriptions embedded in one
+# model call, and concurrent top-K requests for the same job share one
+# ranking. HTTP keep-alive is on, so clients can reuse their connections.
+API_HOST = os.getenv("ATS_API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("ATS_API_PORT", "8502"))
+API_KEY = os.getenv("ATS_API_KEY")  # when set, required as "Authorization: Bearer <key>"
+WORKER_THREADS = 4
+MAX_CONCURRENT = 4       # model/database jobs running at once
+MAX_QUEUED = 64          # requests allowed to wait for a slot
+BATCH_WINDOW = 0.01      # seconds to collect score requests into one batch
+MAX_BATCH = 32           # score requests per batch
+MAX_RESUME_IDS = 5000    # resumes per score request
+MAX_TOP_K = 500
+MAX_PAGE_SIZE = 100
+SEARCH_MODES = ("skills", "keywords", "fuzzy", "emails")
+
+logger = logging.getLogger(__name__)
+
+
+class BadRequest(ValueError):
+    """A request the client has to fix; answered with 400."""
+
+
+def _error(status, message):
+    return web.json_response({"error": message}, status=status)
+
+
+def _records(df):
+    """DataFrame rows as JSON-ready dicts (NaN becomes null)."""
+    return json.loads(df.to_json(orient="records"))
+
+
+# ------------------------------------------------------------------------------
+# Blocking work (runs on the worker threads)
+# ------------------------------------------------------------------------------
+def _score_batch(requests):
+    """Scores for a batch of (job description, resume IDs) requests, embedding each description once."""
+    from utils.ATS_Score import calculate_scores, get_analyzer, job_skill_terms
+    analyzer = get_analyzer()
+    descriptions = list(dict.fromkeys(description for description, _ in requests))
+    embeddings = dict(zip(descriptions, analyzer.batch_embed(descriptions)))
+    conn = get_connection()
+    responses = []
+    for description, resume_ids in requests:
+        rows = conn.execute(
+            "SELECT Resume_ID, RESUME_SUMMARY, SKILLS FROM RESUMES WHERE Resume_ID IN (SELECT value FROM json_each(?))",
+            (json.dumps(resume_ids),)
+        ).fetchall()
+        found = [row[0] for row in rows]
+        scores = calculate_scores(
+            analyzer, embeddings[description], found, [row[1] or "" for row in rows],
+            job_skill_terms(description), [row[2] or "" for row in rows]
+        ) if rows else []
+        results = sorted(
+            ({"resume_id": resume_id, "match": round(float(score), 1)} for resume_id, score in zip(found, scores)),
+            key=lambda result: -result["match"]
+        )
+        missing = sorted(set(resume_ids) - set(found))
+        responses.append({"results": results, "missing": missing})
+    return responses
+
+
+def _top_for_job(job_id, k, rerank):
+    from utils.ATS_Score import rank_resumes
+    row = get_connection().execute("SELECT Job_Details, Description FROM Jobs WHERE Job_ID = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    results, timings = rank_resumes(row[1], 0, rerank)
+    if results is None:
+        raise BadRequest("the job description has no usable terms")
+    return {
+        "job_id": job_id,
+        "job": row[0],
+        "stored": bool(timings) and timings[0][0] == "Stored result",
+        "results": _records(results.head(k)),
+    }
+
+
+def _search(mode, query, page, page_size):
+    from utils.search import email_search, full_text_search, fuzzy_search
+    conn = get_connection()
+    unmatched = None
+    if mode == "skills":
+        df, total = full_text_search(conn, query, page, page_size, separator=",", column="SKILLS")
+    elif mode == "keywords":
+        df, total = full_text_search(conn, query, page, page_size, separator=",")
+    elif mode == "fuzzy":
+        df, total = fuzzy_search(conn, query, page, page_size)
+    else:
+        df, total, unmatched = email_search(conn, query, page, page_size)
+    response = {"total": total, "page": page, "page_size": page_size, "results": _records(df)}
+    if unmatched is not None:
+        response["unmatched"] = unmatched
+    return response
+
+
+# ------------------------------------------------------------------------------
+# Concurrency limits and batching
+# ------------------------------------------------------------------------------
+class ApiState:
+    """The running service's worker pool, slots, waiting count, shared jobs and score queue."""
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="ats-api")
+        self.slots = asyncio.Semaphore(MAX_CONCURRENT)
+        self.waiting = 0
+        self.inflight = {}
+        self.score_queue = asyncio.Queue()
+        self.batcher = None
+
+
+STATE = web.AppKey("state", ApiState)
+
+
+async def run_blocking(state, fn, *args):
+    """Run fn on the worker pool once one of the MAX_CONCURRENT slots is free."""
+    state.waiting += 1
+    try:
+        await state.slots.acquire()
+    finally:
+        state.waiting -= 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(state.executor, fn, *args)
+    finally:
+        state.slots.release()
+
+
+def _check_capacity(state):
+    if state.waiting + state.score_queue.qsize() >= MAX_QUEUED:
+        raise web.HTTPServiceUnavailable(
+            text=json.dumps({"error": "server busy, retry later"}), content_type="application/json",
+            headers={"Retry-After": "1"}
+        )
+
+
+async def _score_batcher(state):
+    """Collect score requests for up to BATCH_WINDOW and score each batch in one pool job."""
+    queue = state.score_queue
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + BATCH_WINDOW
+        while len(batch) < MAX_BATCH:
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), max(deadline - loop.time(), 0)))
+            except asyncio.TimeoutError:
+                break
+        try:
+            responses = await run_blocking(state, _score_batch, [(description, ids) for description, ids, _ in batch])
+        except Exception as e:
+            logger.exception("Score batch failed")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, _, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+
+
+async def _shared(state, key, fn, *args):
+    """Run fn once for concurrent requests with the same key and give each the result."""
+    inflight = state.inflight
+    if key not in inflight:
+        task = asyncio.ensure_future(run_blocking(state, fn, *args))
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+        inflight[key] = task
+    # shield: one client disconnecting must not cancel the others' result
+    return await asyncio.shield(inflight[key])
+
+
+# ------------------------------------------------------------------------------
+# Handlers
+# ------------------------------------------------------------------------------
+def _int_param(request, name, default, low, high):
+    try:
+        value = int(request.query.get(name, default))
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if not low <= value <= high:
+        raise BadRequest(f"{name} must be between {low} and {high}")
+    return value
+
+
+async def score(request):
+    from utils.ATS_Score import job_skill_terms
+    try:
+        body = await request.json()
+    except ValueError:
+        raise BadRequest("body must be JSON")
+    description = body.get("job_description") if isinstance(body, dict) else None
+    resume_ids = body.get("resume_ids") if isinstance(body, dict) else None
+    if not isinstance(description, str) or not job_skill_terms(description):
+        raise BadRequest("job_description must be text with at least one skill or keyword")
+    if (not isinstance(resume_ids, list) or not resume_ids
+            or not all(isinstance(i, int) and not isinstance(i, bool) for i in resume_ids)):
+        raise BadRequest("resume_ids must be a non-empty list of integers")
+    if len(resume_ids) > MAX_RESUME_IDS:
+        raise BadRequest(f"at most {MAX_RESUME_IDS} resume_ids per request")
+    state = request.app[STATE]
+    _check_capacity(state)
+    future = asyncio.get_running_loop().create_future()
+    await state.score_queue.put((description, list(dict.fromkeys(resume_ids)), future))
+    return web.json_response(await future)
+
+
+async def top_for_job(request):
+    try:
+        job_id = int(request.match_info["job_id"])
+    except ValueError:
+        raise BadRequest("job id must be an integer")
+    k = _int_param(request, "k", 10, 1, MAX_TOP_K)
+    rerank = request.query.get("rerank", "1") not in ("0", "false", "no")
+    state = request.app[STATE]
+    _check_capacity(state)
+    # Computed for k = MAX_TOP_K so requests for different k share it.
+    response = await _shared(state, ("top", job_id, rerank), _top_for_job, job_id, MAX_TOP_K, rerank)
+    if response is None:
+        return _error(404, f"job {job_id} not found")
+    return web.json_response({**response, "results": response["results"][:k]})
+
+
+async def search(request):
+    query = request.query.get("q", "").strip()
+    mode = request.query.get("mode", "keywords")
+    if not query:
+        raise BadRequest("q is required")
+    if mode not in SEARCH_MODES:
+        raise BadRequest(f"mode must be one of {', '.join(SEARCH_MODES)}")
+    page = _int_param(request, "page", 0, 0, 10 ** 6)
+    page_size = _int_param(request, "page_size", 25, 1, MAX_PAGE_SIZE)
+    state = request.app[STATE]
+    _check_capacity(state)
+    return web.json_response(await run_blocking(state, _search, mode, query, page, page_size))
+
+
+async def health(request):
+    state = request.app[STATE]
+    return web.json_response({"status": "ok", "waiting": state.waiting + state.score_queue.qsize()})
+
+
+@web.middleware
+async def errors_and_auth(request, handler):
+    if API_KEY and request.path != "/health":
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, API_KEY):
+            return _error(401, "missing or wrong API key")
+    try:
+        return await handler(request)
+    except BadRequest as e:
+        return _error(400, str(e))
+
+
+async def _on_startup(app):
+    state = ApiState()
+    state.batcher = asyncio.ensure_future(_score_batcher(state))
+    app[STATE] = state
+
+
+async def _on_cleanup(app):
+    state = app[STATE]
+    state.batcher.cancel()
+    state.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_app():
+    run_migrations()
+    app = web.Application(middlewares=[errors_and_auth])
+    app.add_routes([
+        web.post("/score", score),
+        web.get("/jobs/{job_id}/top", top_for_job),
+        web.get("/search", search),
+        web.get("/health", health),
+    ])
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+# python -m utils.api  -> serve on ATS_API_HOST:ATS_API_PORT
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    from utils.startup import warm_up_in_background
+    warm_up_in_background()
+    web.run_app(create_app(), host=API_HOST, port=API_PORT)
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+import aiohttp
+
+# ------------------------------------------------------------------------------
+# Load test for the local API (utils.api)
+# ------------------------------------------------------------------------------
+# Sends --requests requests with --concurrency in flight over one pooled
+# client session (keep-alive connections are reused), then prints
+# throughput and latency percentiles per endpoint:
+#
+#   python -m utils.api_loadtest --requests 500 --concurrency 32 --mix score,top,search
+#
+# Resume IDs for /score come from a /search for --query, and job IDs from
+# --job-ids, so the test only needs the API itself.
+DEFAULT_URL = "http://127.0.0.1:8502"
+DEFAULT_JOB_DESCRIPTION = "Python developer with AWS, SQL and machine learning experience"
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(int(share * len(ordered)), len(ordered) - 1)]
+
+
+async def _resume_ids(session, query, count):
+    async with session.get("/search", params={"q": query, "mode": "keywords", "page_size": 100}) as response:
+        response.raise_for_status()
+        ids = [row["Resume_ID"] for row in (await response.json())["results"]]
+    if not ids:
+        raise SystemExit(f"No resumes match {query!r}; pass another --query")
+    return ids[:count]
+
+
+def _request_for(kind, args, resume_ids):
+    """(method, path, params, json body) for one request of this kind."""
+    if kind == "score":
+        sample = random.sample(resume_ids, min(args.batch, len(resume_ids)))
+        return "POST", "/score", None, {"job_description": args.job_description, "resume_ids": sample}
+    if kind == "top":
+        return "GET", f"/jobs/{random.choice(args.job_ids)}/top", {"k": 10}, None
+    return "GET", "/search", {"q": args.query, "mode": "keywords", "page_size": 25}, None
+
+
+async def run(args):
+    headers = {"Authorization": f"Bearer {args.api_key}"} if args.api_key else {}
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    latencies = defaultdict(list)
+    failures = defaultdict(int)
+    kinds = args.mix.split(",")
+    async with aiohttp.ClientSession(args.url, connector=connector, headers=headers) as session:
+        resume_ids = await _resume_ids(session, args.query, args.batch * 4) if "score" in kinds else []
+        pending = iter(range(args.requests))
+
+        async def worker():
+            for i in pending:
+                kind = kinds[i % len(kinds)]
+                method, path, params, body = _request_for(kind, args, resume_ids)
+                started = time.perf_counter()
+                try:
+                    async with session.request(method, path, params=params, json=body) as response:
+                        await response.read()
+                        ok = response.status == 200
+                except aiohttp.ClientError:
+                    ok = False
+                if ok:
+                    latencies[kind].append(time.perf_counter() - started)
+                else:
+                    failures[kind] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{args.requests} requests, concurrency {args.concurrency}: {elapsed:.1f}s, {total / elapsed:.1f} ok req/s")
+    for kind in kinds:
+        values = latencies[kind]
+        line = f"  {kind:<7} ok {len(values):>5}  failed {failures[kind]:>4}"
+        if values:
+            line += "  p50 {:.0f} ms  p95 {:.0f} ms  p99 {:.0f} ms".format(
+                *(percentile(values, share) * 1000 for share in (0.5, 0.95, 0.99))
+            )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the local ATS API.")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default="score,top,search", help="comma-separated: score, top, search")
+    parser.add_argument("--batch", type=int, default=50, help="resume IDs per /score request")
+    parser.add_argument("--query", default="python", help="search term, also used to pick resume IDs")
+    parser.add_argument("--job-ids", type=lambda text: [int(i) for i in text.split(",")], default=[1])
+    parser.add_argument("--job-description", default=DEFAULT_JOB_DESCRIPTION)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,22 @@
 import streamlit as st
 st.set_page_config(layout="wide")
-import sqlite3
 import hashlib
-import time
 import streamlit_cookies_manager
 
 # Importing utility functions and pages
-from utils.data_loader import load_data
+from utils.auth import COOKIE_NAME, issue_token, revoke_token, revoke_user, verify_token
+from utils.db import bump_version, get_connection
+from utils.migrations import run_migrations
 from utils.recruiter_page import recruiter_page
 from utils.jobs_page import jobs_page
 from utils.submissions_page import submissions_page
 from utils.dashboard import dashboard
-from utils.Bulk_Upload import run_app
-from utils.ATS_Score import resume_matching_system
 from utils.search import search_fun
+from utils.near_duplicates import duplicates_page
+from utils.startup import lazy_page, warm_up_in_background
+from utils.prescore import start_in_background as start_prescoring
+from utils.profiling import profile_page
+from utils.performance_page import can_view_performance, performance_page
 
 # Set page configuration (must be the first Streamlit command)
 
@@ -52,19 +55,9 @@ st.markdown("""
 if not cookies.ready():
     st.stop()
 
-# Database setup
+# Database setup: apply pending schema migrations (once per process)
 def init_db():
-    conn = sqlite3.connect("mydb.db")
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS USERS (
-            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_name TEXT NOT NULL,
-            password TEXT NOT NULL
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    run_migrations()
 
 # Utility function to hash passwords
 def hash_password(password):
@@ -112,7 +105,7 @@ def sign_up():
             st.error("Username and password must be at least 5 characters long.")
             return
         
-        conn = sqlite3.connect("mydb.db")
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM USERS WHERE user_name = ?", (user_name,))
         if cursor.fetchone():
@@ -120,9 +113,9 @@ def sign_up():
         else:
             hashed_password = hash_password(password)
             cursor.execute("INSERT INTO USERS (user_name, password) VALUES (?, ?)", (user_name, hashed_password))
+            bump_version(conn, "USERS")
             conn.commit()
             st.success("Sign-Up successful! You can now log in.")
-        conn.close()
 
 # Login Function with Cookies
 def login():
@@ -161,16 +154,6 @@ def login():
         </style>
     """, unsafe_allow_html=True)
 
-    # Auto-login if cookie exists
-    user_cookie = cookies.get("logged_in_user")
-    if user_cookie:
-        st.session_state.logged_in = True
-        st.session_state.user_name = user_cookie
-        st.success(f"Welcome back, {user_cookie}!")
-        time.sleep(1)
-        st.rerun()
-        return
-
     with st.form("login_form"):
         user_name = st.text_input("Username", key="login_username")
         password = st.text_input("Password", type="password", key="login_password")
@@ -181,17 +164,18 @@ def login():
             st.error("Please fill in all fields.")
             return
 
-        conn = sqlite3.connect("mydb.db")
+        conn = get_connection()
         cursor = conn.cursor()
         hashed_password = hash_password(password)
         cursor.execute("SELECT * FROM USERS WHERE user_name = ? AND password = ?", (user_name, hashed_password))
         user = cursor.fetchone()
-        conn.close()
 
         if user:
+            token = issue_token(user_name, hashed_password)
             st.session_state.logged_in = True
             st.session_state.user_name = user_name
-            cookies["logged_in_user"] = user_name
+            st.session_state.session_token = token
+            cookies[COOKIE_NAME] = token
             cookies.save()
             st.success("Welcome to ATS!")
             st.rerun()
@@ -222,7 +206,7 @@ def forgot_password():
             st.error("Passwords do not match. Please re-enter.")
             return
 
-        conn = sqlite3.connect("mydb.db")
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM USERS WHERE user_name = ?", (user_name,))
         if cursor.fetchone() is None:
@@ -230,24 +214,73 @@ def forgot_password():
         else:
             hashed_password = hash_password(new_password)
             cursor.execute("UPDATE USERS SET password = ? WHERE user_name = ?", (hashed_password, user_name))
+            bump_version(conn, "USERS")
             conn.commit()
+            # The new password hash invalidates the user's existing session tokens.
+            revoke_user(user_name)
             st.success("Password updated successfully! You can now log in.")
-        conn.close()
 
 # Logout Function
 def logout():
+    revoke_token(st.session_state.get("session_token"))
     st.session_state.logged_in = False
     st.session_state.user_name = None
-    cookies["logged_in_user"] = None
+    st.session_state.session_token = None
+    cookies[COOKIE_NAME] = ""
     cookies.save()
     st.rerun()
 
+# Log a returning browser in from its session cookie. Runs only while the
+# session is logged out, so authenticated reruns do no token or DB work.
+def restore_session():
+    token = cookies.get(COOKIE_NAME)
+    user_name = verify_token(token)
+    if user_name:
+        st.session_state.logged_in = True
+        st.session_state.user_name = user_name
+        st.session_state.session_token = token
+
+# Pages reachable from the navigation bar, in display order
+PAGES = {
+    "Dashboard": dashboard,
+    "Recruiters": recruiter_page,
+    "Jobs": jobs_page,
+    "Submissions": submissions_page,
+    # These pull in torch and the Gemini client, so import them on first use
+    "Upload Resumes": lazy_page("utils.Bulk_Upload", "run_app"),
+    "ATS Score": lazy_page("utils.ATS_Score", "resume_matching_system"),
+    "Search": search_fun,
+    "Duplicates": duplicates_page,
+    "Performance": performance_page,
+}
+
+# Widget values that should survive switching to another page and back.
+# Streamlit drops the state of widgets that were not drawn in a run, so these
+# keys are re-assigned on every run to mark them as user state. Only keys of
+# input widgets belong here (buttons and uploaders cannot be re-assigned).
+PERSISTENT_WIDGET_KEYS = (
+    "recruiters_search", "recruiters_sort", "recruiters_desc", "recruiters_page_size", "recruiters_action",
+    "jobs_search", "jobs_sort", "jobs_desc", "jobs_page_size", "jobs_action",
+    "submissions_search", "submissions_sort", "submissions_desc", "submissions_page_size", "submissions_action",
+    "ats_job", "ats_threshold",
+    "search_option", "search_skills", "search_keywords", "search_fuzzy", "search_emails",
+    "search_page_size", "facet_location", "facet_job_title", "facet_company", "facet_skill",
+    "dashboard_auto_refresh", "pipeline_date_range", "duplicates_threshold", "performance_window",
+)
+
+def keep_page_state():
+    for key in PERSISTENT_WIDGET_KEYS:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
 # Main Function
 def main():
     init_db()
 
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False
+    if not st.session_state.logged_in:
+        restore_session()
 
     if not st.session_state.logged_in:
         st.title("Recruitment Management Dashboard")
@@ -259,6 +292,9 @@ def main():
         with tabs[2]:
             forgot_password()
     else:
+        warm_up_in_background()
+        start_prescoring()
+
         # Header section with dashboard title and logout button on top-right
         col1, col2 = st.columns([9, 1])
         with col1:
@@ -290,33 +326,19 @@ def main():
             if st.button("Logout", key="logout_button"):
                 logout()
 
-        # Load data for dashboard
-        recruiter_detail, job_requirements, submission_table = load_data()
-
-        # Tabs for navigation
-        tabs = st.tabs([
-            "Dashboard",
-            "Recruiters",
-            "Jobs",
-            "Submissions",
-            "Upload Resumes",
-            "ATS Score",
-            "Search"
-        ])
-        with tabs[0]:
-            dashboard()
-        with tabs[1]:
-            recruiter_page()
-        with tabs[2]:
-            jobs_page()
-        with tabs[3]:
-            submissions_page()
-        with tabs[4]:
-            run_app()
-        with tabs[5]:
-            resume_matching_system()
-        with tabs[6]:
-            search_fun()
+        # Navigation: unlike st.tabs, only the selected page's code runs.
+        keep_page_state()
+        pages = [page for page in PAGES if page != "Performance" or can_view_performance(st.session_state.user_name)]
+        selected_page = st.radio(
+            "Navigation",
+            options=pages,
+            horizontal=True,
+            key="active_page",
+            label_visibility="collapsed"
+        )
+        # Timed per rerun, with its queries and model calls (see utils.profiling)
+        with profile_page(selected_page):
+            PAGES[selected_page]()
 
 if __name__ == "__main__":
     main()
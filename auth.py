@@ -0,0 +1,119 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from utils.db import get_connection, table_versions
+
+# ------------------------------------------------------------------------------
+# Signed session tokens
+# ------------------------------------------------------------------------------
+# The login cookie holds "user|expiry|signature", signed with HMAC-SHA256.
+# The signature also covers the user's password hash, so a password reset
+# logs out every existing session. A verified token is remembered in an
+# in-process cache for VERIFIED_TTL_SECONDS, so a returning browser is let
+# in with a single DATA_VERSIONS read; after that the user row is read
+# again. Password changes bump the USERS version, which empties the cache
+# in every process, so a reset takes effect everywhere on the next check.
+SESSION_TTL_SECONDS = 7 * 24 * 3600   # how long a login cookie stays valid
+VERIFIED_TTL_SECONDS = 15 * 60        # how long a verified token skips the DB
+COOKIE_NAME = "session_token"
+
+_secret = None
+_verified = {}  # token -> (user_name, cached until)
+_users_version = None  # USERS data version the cache was filled under
+_lock = threading.Lock()
+
+
+def _signing_key():
+    """ATS_SESSION_SECRET, or the key stored in APP_SETTINGS by the migrations."""
+    global _secret
+    if _secret is None:
+        secret = os.getenv("ATS_SESSION_SECRET")
+        if not secret:
+            row = get_connection().execute(
+                "SELECT value FROM APP_SETTINGS WHERE key = 'session_secret'"
+            ).fetchone()
+            secret = row[0]
+        _secret = secret.encode()
+    return _secret
+
+
+def _signature(user_name, expires_at, password_hash):
+    message = f"{user_name}|{expires_at}|{password_hash}".encode()
+    digest = hmac.new(_signing_key(), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def _password_hash(user_name):
+    row = get_connection().execute(
+        "SELECT password FROM USERS WHERE user_name = ?", (user_name,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def issue_token(user_name, password_hash):
+    """New session token for a user who has just logged in."""
+    expires_at = int(time.time()) + SESSION_TTL_SECONDS
+    token = f"{user_name}|{expires_at}|{_signature(user_name, expires_at, password_hash)}"
+    with _lock:
+        _verified[token] = (user_name, time.time() + VERIFIED_TTL_SECONDS)
+    return token
+
+
+def verify_token(token):
+    """The user name the token was issued to, or None if it is invalid or expired."""
+    if not token:
+        return None
+    now = time.time()
+    _forget_if_users_changed()
+    with _lock:
+        cached = _verified.get(token)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    try:
+        user_name, expires_at, signature = token.rsplit("|", 2)
+        expires_at = int(expires_at)
+    except ValueError:
+        return None
+    if expires_at <= now:
+        return None
+    password_hash = _password_hash(user_name)
+    if password_hash is None:
+        return None
+    if not hmac.compare_digest(signature, _signature(user_name, expires_at, password_hash)):
+        return None
+    with _lock:
+        _verified[token] = (user_name, min(now + VERIFIED_TTL_SECONDS, expires_at))
+        # Drop lapsed entries so the cache stays as small as the active user count.
+        for stale in [t for t, (_, until) in _verified.items() if until <= now]:
+            del _verified[stale]
+    return user_name
+
+
+def _forget_if_users_changed():
+    """Empty the cache if any process has changed USERS since it was filled."""
+    global _users_version
+    version = table_versions("USERS")[0]
+    with _lock:
+        if version != _users_version:
+            _verified.clear()
+            _users_version = version
+
+
+def revoke_token(token):
+    """Forget a token on logout."""
+    with _lock:
+        _verified.pop(token, None)
+
+
+def revoke_user(user_name):
+    """
+    Forget every cached token of a user in this process, e.g. after a
+    password change (other processes notice the USERS version bump).
+    """
+    with _lock:
+        for token in [t for t, (user, _) in _verified.items() if user == user_name]:
+            del _verified[token]
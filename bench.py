@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from utils.db import bump_version, clear_query_cache, get_connection
+from utils.migrations import run_migrations
+
+# ------------------------------------------------------------------------------
+# End-to-end benchmarks of the hot paths
+# ------------------------------------------------------------------------------
+# Times search, the page loaders, the dashboard, batch_insert, duplicate
+# lookups and ATS scoring against the database named by ATS_DB_PATH,
+# normally one filled by utils.synthetic_data:
+#
+#   ATS_DB_PATH=bench.db python -m utils.bench                  # compare
+#   ATS_DB_PATH=bench.db python -m utils.bench --save-baseline  # record
+#
+# Each benchmark runs once to warm up and then REPEAT times with the query
+# cache cleared, and its median is compared with the baseline stored in
+# BASELINE_FILE for the same resume count. The run fails (exit code 1) when
+# a benchmark is more than TOLERANCE times slower than its baseline.
+# Timings depend on the machine, so no baseline is shipped: record one on
+# the machine that runs the comparison. Until then a run only prints its
+# timings, says there is nothing to compare against and exits 0.
+# --skip-models leaves out the benchmarks that load the embedding models.
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baselines.json")
+REPEAT = 5
+TOLERANCE = 1.5
+INSERT_BATCH = 100       # records per batch_insert benchmark run
+EMAIL_LOOKUPS = 50
+JOB_DESCRIPTION = "Data Engineer with 5+ years of experience. Must have Python, SQL, Spark, AWS. Nice to have Airflow."
+
+
+def _context(conn):
+    """Inputs the benchmarks share, read once from the database."""
+    resumes = conn.execute("SELECT COUNT(*), MIN(Resume_ID), MAX(Resume_ID) FROM RESUMES").fetchone()
+    if not resumes[0]:
+        sys.exit("The database has no resumes; fill it with utils.synthetic_data first.")
+    emails = [row[0] for row in conn.execute(
+        "SELECT EMAIL FROM RESUMES ORDER BY Resume_ID DESC LIMIT ?", (EMAIL_LOOKUPS,)
+    )]
+    days = conn.execute("SELECT MIN(Data_of_Submission), MAX(Data_of_Submission) FROM Submissions").fetchone()
+    return {
+        "resumes": resumes[0],
+        "middle_id": (resumes[1] + resumes[2]) // 2,
+        "sample_ids": [row[0] for row in conn.execute("SELECT Resume_ID FROM RESUMES ORDER BY Resume_ID LIMIT 100")],
+        "emails": "\n".join(emails),
+        "first_day": days[0],
+        "last_day": days[1],
+    }
+
+
+# ------------------------------------------------------------------------------
+# Benchmarks: name -> function(conn, ctx); names starting with "ats." load models
+# ------------------------------------------------------------------------------
+def _search_skills(conn, ctx):
+    from utils.search import full_text_search
+    full_text_search(conn, "python, aws", 0, 25, separator=",", column="SKILLS")
+
+
+def _search_keywords(conn, ctx):
+    from utils.search import full_text_search
+    full_text_search(conn, "data engineer, spark", 0, 25, separator=",")
+
+
+def _search_fuzzy(conn, ctx):
+    from utils.search import fuzzy_search
+    fuzzy_search(conn, "pythn, kubernets", 0, 25)
+
+
+def _search_emails(conn, ctx):
+    from utils.search import email_search
+    email_search(conn, ctx["emails"], 0, 25)
+
+
+def _search_browse_deep(conn, ctx):
+    from utils.search import count_resumes, get_resume_page
+    get_resume_page(conn, 25, before_id=ctx["middle_id"])
+    count_resumes(conn)
+
+
+def _page_load_data(conn, ctx):
+    from utils.data_loader import load_data
+    load_data()
+
+
+def _page_jobs(conn, ctx):
+    from utils.table_view import count_rows, fetch_page
+    fetch_page("Jobs", "python", "Bill_Rate", True, 50)
+    count_rows("Jobs", "python")
+
+
+def _page_submissions(conn, ctx):
+    from utils.table_view import count_rows, fetch_page
+    fetch_page("Submissions", "", "Data_of_Submission", True, 50, offset=5000)
+    count_rows("Submissions", "")
+
+
+def _dashboard(conn, ctx):
+    from utils.analytics import submissions_by
+    from utils.dashboard import fetch_totals
+    fetch_totals()
+    for dimension in ("recruiter", "client", "status", "week"):
+        submissions_by(dimension, ctx["first_day"], ctx["last_day"])
+
+
+def _duplicates_of(conn, ctx):
+    from utils.near_duplicates import duplicates_of
+    duplicates_of(conn, ctx["sample_ids"])
+
+
+def _batch_insert(conn, ctx):
+    from utils.Bulk_Upload import batch_insert
+    from utils.synthetic_data import INSERT_DOMAIN, resume_records
+    records = list(resume_records(0, INSERT_BATCH, start=ctx["resumes"], email_domain=INSERT_DOMAIN, file_sample=0))
+    try:
+        batch_insert(conn, records)
+    finally:
+        # Leave the database as it was, so every run inserts (not updates).
+        conn.execute("DELETE FROM RESUMES WHERE EMAIL LIKE ?", (f"%@{INSERT_DOMAIN}",))
+        bump_version(conn, "RESUMES")
+        conn.commit()
+
+
+def _ats_calculate_scores(conn, ctx):
+    from utils.ATS_Score import LEXICAL_K, calculate_scores, get_analyzer, job_skill_terms
+    rows = conn.execute(
+        "SELECT Resume_ID, RESUME_SUMMARY, SKILLS FROM RESUMES ORDER BY Resume_ID LIMIT ?", (LEXICAL_K,)
+    ).fetchall()
+    analyzer = get_analyzer()
+    calculate_scores(
+        analyzer, analyzer.batch_embed([JOB_DESCRIPTION])[0], [row[0] for row in rows], [row[1] for row in rows],
+        job_skill_terms(JOB_DESCRIPTION), [row[2] for row in rows]
+    )
+
+
+def _ats_rank(conn, ctx):
+    from utils import ATS_Score
+    # Bypass the stored rankings and stage caches so the pipeline really runs.
+    with ATS_Score._stage_cache_lock:
+        ATS_Score._stage_cache.clear()
+        ATS_Score._pair_cache.clear()
+    required_skills = ATS_Score.job_skill_terms(JOB_DESCRIPTION)
+    ATS_Score.score_candidates(ATS_Score.fetch_resumes_from_db(), JOB_DESCRIPTION, required_skills)
+
+
+BENCHMARKS = {
+    "search.skills": _search_skills,
+    "search.keywords": _search_keywords,
+    "search.fuzzy": _search_fuzzy,
+    "search.emails": _search_emails,
+    "search.browse_deep": _search_browse_deep,
+    "pages.load_data": _page_load_data,
+    "pages.jobs": _page_jobs,
+    "pages.submissions": _page_submissions,
+    "dashboard.reports": _dashboard,
+    "duplicates.of_100": _duplicates_of,
+    "ingest.batch_insert": _batch_insert,
+    "ats.calculate_scores": _ats_calculate_scores,
+    "ats.rank": _ats_rank,
+}
+
+
+def run_benchmarks(names, repeat=REPEAT):
+    """(resume count, {name: median seconds}) for the given benchmarks."""
+    conn = get_connection()
+    run_migrations(conn)
+    ctx = _context(conn)
+    results = {}
+    for name in names:
+        benchmark = BENCHMARKS[name]
+        benchmark(conn, ctx)  # warm-up: imports, models, first-time index setup
+        times = []
+        for _ in range(repeat):
+            clear_query_cache()
+            started = time.perf_counter()
+            benchmark(conn, ctx)
+            times.append(time.perf_counter() - started)
+        results[name] = statistics.median(times)
+        print(f"  {name:<22} {results[name] * 1000:9.1f} ms", flush=True)
+    return ctx["resumes"], results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """(name, seconds, baseline seconds or None, regressed) per benchmark."""
+    rows = []
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        rows.append((name, seconds, base, base is not None and seconds > base * tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ATS hot paths against stored baselines.")
+    parser.add_argument("--only", help="comma-separated benchmark names or prefixes (e.g. search,ats.rank)")
+    parser.add_argument("--skip-models", action="store_true", help="skip the ats.* benchmarks")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these timings as the new baseline")
+    args = parser.parse_args()
+
+    names = list(BENCHMARKS)
+    if args.only:
+        wanted = [part.strip() for part in args.only.split(",") if part.strip()]
+        names = [name for name in names if any(name == w or name.startswith(w + ".") for w in wanted)]
+    if args.skip_models:
+        names = [name for name in names if not name.startswith("ats.")]
+
+    print(f"Running {len(names)} benchmarks, median of {args.repeat}:")
+    resumes, results = run_benchmarks(names, args.repeat)
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    # Baselines are per data size: the synthetic data is deterministic, so
+    # the same resume count means the same database.
+    scale = str(resumes)
+
+    if args.save_baseline:
+        baselines[scale] = {**baselines.get(scale, {}), **{name: round(s, 6) for name, s in results.items()}}
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Saved baseline for {resumes} resumes to {args.baseline}")
+        return
+
+    if scale not in baselines:
+        print(f"\nNo baseline for {resumes} resumes in {args.baseline}, so nothing was compared.")
+        print("Record one on this machine with --save-baseline.")
+        return
+
+    rows = compare(results, baselines[scale], args.tolerance)
+    print(f"\nCompared with the baseline for {resumes} resumes (tolerance {args.tolerance:g}x):")
+    for name, seconds, base, regressed in rows:
+        if base is None:
+            verdict = "no baseline"
+        else:
+            verdict = f"{seconds / base:5.2f}x  " + ("SLOWER" if regressed else "ok")
+        print(f"  {name:<22} {seconds * 1000:9.1f} ms  {verdict}")
+    regressions = [name for name, _, _, regressed in rows if regressed]
+    if regressions:
+        print(f"FAIL: {', '.join(regressions)}")
+    sys.exit(1 if regressions else 0)
+
+
+# ATS_DB_PATH=bench.db python -m utils.bench [--skip-models] [--save-baseline]
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import csv
+import os
+import sqlite3
+import tempfile
+import streamlit as st
+import pandas as pd
+from utils.db import bump_version, get_connection
+from utils.table_view import TABLE_VIEWS, _search_condition
+
+# ------------------------------------------------------------------------------
+# Bulk CSV / Parquet import and streaming export
+# ------------------------------------------------------------------------------
+# Imports read the file CHUNK_ROWS rows at a time, validate each row and
+# insert the valid ones with one executemany per chunk, inside one
+# transaction per chunk. A bad row never aborts the file: it is reported
+# with its line number and the rest of the chunk is still written.
+# Exports page through the table with a cursor and write each batch
+# straight to a temporary file, so no DataFrame of the whole table is built;
+# the session only keeps the file's path until the next export.
+CHUNK_ROWS = 1000
+EXPORT_BATCH_ROWS = 5000
+FILE_TYPES = ["csv", "parquet"]
+
+# Columns accepted per table, in insert order. "int" columns must parse as
+# whole numbers; "date" columns as dates. Every column is required.
+IMPORT_COLUMNS = {
+    "Jobs": {
+        "Job_Details": "text",
+        "Job_Location": "text",
+        "Bill_Rate": "int",
+        "Visas": "text",
+        "Description": "text",
+        "Client": "text",
+    },
+    "Recruiter": {
+        "Name": "text",
+        "Email": "text",
+        "Phone_Number": "text",
+        "Location": "text",
+        "Designation": "text",
+    },
+    "Submissions": {
+        "Job_ID": "int",
+        "Data_of_Submission": "date",
+        "Client_Name": "text",
+        "Job_title": "text",
+        "Candidate_City": "text",
+        "Candidate_State": "text",
+        "Candidate_Country": "text",
+        "Recruiter_name": "text",
+        "Visa": "text",
+        "Pay_Rate": "int",
+        "Status": "text",
+        "notes": "text",
+    },
+}
+# Free-text columns that may be left empty.
+OPTIONAL_COLUMNS = {"notes"}
+
+
+def read_chunks(file, file_type, chunk_rows=CHUNK_ROWS):
+    """Yield DataFrames of at most chunk_rows rows, all values as strings."""
+    if file_type == "csv":
+        yield from pd.read_csv(file, chunksize=chunk_rows, dtype=str, keep_default_na=False)
+    elif file_type == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet import needs the pyarrow package.")
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas().astype(str).replace({"None": "", "nan": "", "NaT": ""})
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def validate_row(row, columns):
+    """Return (values in insert order, None) or (None, error message)."""
+    values = []
+    for column, kind in columns.items():
+        value = str(row.get(column, "")).strip()
+        if not value:
+            if column in OPTIONAL_COLUMNS:
+                values.append("")
+                continue
+            return None, f"{column} is empty"
+        if kind == "int":
+            try:
+                number = float(value)
+            except ValueError:
+                return None, f"{column} is not a number: {value!r}"
+            if not number.is_integer():
+                return None, f"{column} is not a whole number: {value!r}"
+            value = int(number)
+        elif kind == "date":
+            parsed = pd.to_datetime(value, errors="coerce")
+            if pd.isna(parsed):
+                return None, f"{column} is not a date: {value!r}"
+            value = parsed.date().isoformat()
+        values.append(value)
+    return values, None
+
+
+def _insert_chunk(conn, table, insert, rows):
+    """
+    Insert (line, values) pairs in one transaction. If the batch violates a
+    constraint, redo it row by row so only the offending rows are rejected.
+    Any other database error (locked, disk full, ...) rolls the chunk back
+    and rejects all of its rows. Returns (inserted count, [(line, error)]).
+    """
+    try:
+        conn.executemany(insert, [values for _, values in rows])
+        bump_version(conn, table)
+        conn.commit()
+        return len(rows), []
+    except sqlite3.IntegrityError:
+        conn.rollback()
+    except sqlite3.Error as e:
+        conn.rollback()
+        return 0, _chunk_failed(rows, e)
+
+    inserted, errors = 0, []
+    try:
+        for line, values in rows:
+            try:
+                conn.execute(insert, values)
+                inserted += 1
+            except sqlite3.IntegrityError as e:
+                errors.append((line, str(e)))
+        bump_version(conn, table)
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        return 0, _chunk_failed(rows, e)
+    return inserted, errors
+
+
+def _chunk_failed(rows, error):
+    return [(line, f"Chunk not imported: {error}") for line, _ in rows]
+
+
+def import_rows(table, file, file_type, chunk_rows=CHUNK_ROWS, progress=None):
+    """
+    Import a CSV or Parquet file into `table`. Returns (inserted count,
+    DataFrame of rejected rows with their file line and the reason).
+    `progress`, if given, is called with the running totals after each chunk.
+    """
+    columns = IMPORT_COLUMNS[table]
+    insert = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+    conn = get_connection()
+    inserted, errors = 0, []
+    line = 1  # the header is line 1
+    for chunk in read_chunks(file, file_type, chunk_rows):
+        missing = [c for c in columns if c not in chunk.columns and c not in OPTIONAL_COLUMNS]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        valid = []
+        for row in chunk.to_dict("records"):
+            line += 1
+            values, error = validate_row(row, columns)
+            if error:
+                errors.append((line, error))
+            else:
+                valid.append((line, values))
+        if valid:
+            count, failed = _insert_chunk(conn, table, insert, valid)
+            inserted += count
+            errors.extend(failed)
+        if progress:
+            progress(inserted, len(errors))
+    return inserted, pd.DataFrame(errors, columns=["Line", "Error"])
+
+
+def iter_export_rows(table, search_term="", batch_rows=EXPORT_BATCH_ROWS):
+    """Yield (column names, list of rows) batches for the filtered table."""
+    where, params = _search_condition(table, search_term)
+    query = f"SELECT * FROM {table}"
+    if where:
+        query += f" WHERE {where}"
+    query += f" ORDER BY {TABLE_VIEWS[table]['key']}"
+    cursor = get_connection().execute(query, params)
+    names = [d[0] for d in cursor.description]
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            yield names, rows
+    finally:
+        cursor.close()
+
+
+def parquet_schema(table):
+    """
+    Arrow schema for a Parquet export, fixed before the first batch. INTEGER
+    and REAL columns keep their type unless some row holds another type
+    (SQLite does not enforce declared types); everything else is a string.
+    """
+    import pyarrow as pa
+    conn = get_connection()
+    fields = []
+    for _, name, declared, *_ in conn.execute(f"PRAGMA table_info({table})").fetchall():
+        declared = (declared or "").upper()
+        if "INT" in declared:
+            arrow_type, allowed = pa.int64(), "'integer'"
+        elif any(kind in declared for kind in ("REAL", "FLOA", "DOUB")):
+            arrow_type, allowed = pa.float64(), "'integer', 'real'"
+        else:
+            arrow_type, allowed = pa.string(), None
+        if allowed and conn.execute(
+            f"SELECT 1 FROM {table} WHERE typeof({name}) NOT IN ({allowed}, 'null') LIMIT 1"
+        ).fetchone():
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def _arrow_batch(schema, names, rows):
+    import pyarrow as pa
+    records = []
+    for row in rows:
+        record = {}
+        for field, name, value in zip(schema, names, row):
+            if value is not None and pa.types.is_string(field.type):
+                value = str(value)
+            elif value is not None and pa.types.is_floating(field.type):
+                value = float(value)
+            record[name] = value
+        records.append(record)
+    return pa.Table.from_pylist(records, schema=schema)
+
+
+def export_to_file(table, search_term, file_type):
+    """Write the filtered table to a temporary file and return its path (the caller removes it)."""
+    if file_type not in FILE_TYPES:
+        raise ValueError(f"Unsupported file type: {file_type}")
+    if file_type == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export needs the pyarrow package.")
+    fd, path = tempfile.mkstemp(prefix=f"{table.lower()}_export_", suffix=f".{file_type}")
+    os.close(fd)
+    try:
+        if file_type == "csv":
+            with open(path, "w", encoding="utf-8", newline="") as out:
+                writer = csv.writer(out)
+                wrote_header = False
+                for names, rows in iter_export_rows(table, search_term):
+                    if not wrote_header:
+                        writer.writerow(names)
+                        wrote_header = True
+                    writer.writerows(rows)
+        else:
+            schema = parquet_schema(table)
+            with pq.ParquetWriter(path, schema) as writer:
+                for names, rows in iter_export_rows(table, search_term):
+                    writer.write_table(_arrow_batch(schema, names, rows))
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def _discard_export(key):
+    prepared = st.session_state.pop(key, None)
+    if prepared and os.path.exists(prepared[0]):
+        os.remove(prepared[0])
+
+
+def bulk_import_export(table, label, prefix, search_term=""):
+    """Import and export controls for one table, in a collapsed expander."""
+    with st.expander(f"Bulk import / export {label}"):
+        st.caption(f"Columns: {', '.join(IMPORT_COLUMNS[table])}")
+        uploaded = st.file_uploader(f"Import {label} from CSV or Parquet:", type=FILE_TYPES, key=f"{prefix}_import_file")
+        if uploaded is not None and st.button("Import", key=f"{prefix}_import"):
+            file_type = uploaded.name.rsplit(".", 1)[-1].lower()
+            status = st.empty()
+            try:
+                inserted, errors = import_rows(
+                    table, uploaded, file_type,
+                    progress=lambda done, failed: status.text(f"{done} rows imported, {failed} rejected...")
+                )
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                status.empty()
+                st.success(f"Imported {inserted} rows into {label}.")
+                if not errors.empty:
+                    st.warning(f"{len(errors)} rows were rejected.")
+                    st.dataframe(errors, hide_index=True, use_container_width=True)
+                    st.download_button(
+                        "Download error report", errors.to_csv(index=False),
+                        file_name=f"{prefix}_import_errors.csv", mime="text/csv", key=f"{prefix}_import_errors"
+                    )
+
+        col1, col2 = st.columns([0.3, 0.7])
+        file_type = col1.selectbox("Export format:", FILE_TYPES, key=f"{prefix}_export_type")
+        scope = f"matching '{search_term}'" if search_term else "all rows"
+        # The file is only built when asked for, not on every rerun, and is
+        # dropped once the format or search no longer match it.
+        export_key = f"{prefix}_export_file"
+        if col2.button(f"Prepare export ({scope})", key=f"{prefix}_export"):
+            _discard_export(export_key)
+            try:
+                st.session_state[export_key] = (export_to_file(table, search_term, file_type), file_type, search_term)
+            except ValueError as e:
+                st.error(str(e))
+        prepared = st.session_state.get(export_key)
+        if prepared and (prepared[1:] != (file_type, search_term) or not os.path.exists(prepared[0])):
+            _discard_export(export_key)
+            prepared = None
+        if prepared:
+            path, prepared_type, _ = prepared
+            with open(path, "rb") as data:
+                st.download_button(
+                    f"Download {prepared_type.upper()}", data,
+                    file_name=f"{prefix}.{prepared_type}",
+                    mime="text/csv" if prepared_type == "csv" else "application/octet-stream",
+                    key=f"{prefix}_export_download",
+                )
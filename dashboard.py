@@ -1,40 +1,89 @@
 import streamlit as st
-import sqlite3
-import pandas as pd
+from datetime import date
+from utils.db import cache_stats, get_connection
+from utils.analytics import rollup_date_range, submissions_by
 
-# Function to fetch data from SQLite
-def fetch_data_from_db(query, db_path='mydb.db'):
-    with sqlite3.connect(db_path) as conn:
-        return pd.read_sql_query(query, conn)
+# Tables whose row counts the summary report shows.
+COUNTED_TABLES = ["Recruiter", "Jobs", "Submissions"]
+REFRESH_SECONDS = 30
 
+# Row counters kept current by triggers, so the summary never scans a table
+def ensure_row_counters(conn):
+    from utils.migrations import run_migrations
+    run_migrations(conn)
 
+# Fetch all totals with a single primary-key read
+def fetch_totals():
+    conn = get_connection()
+    ensure_row_counters(conn)
+    totals = dict(conn.execute("SELECT table_name, row_count FROM TABLE_COUNTS").fetchall())
+    return {table: totals.get(table, 0) for table in COUNTED_TABLES}
 
 # Dashboard Function
 def dashboard():
     st.header('Summary Report')
+    auto_refresh = st.toggle(f"Auto-refresh every {REFRESH_SECONDS}s", value=False, key="dashboard_auto_refresh")
 
-    # Fetch data from SQLite
-    recruiter_detail = fetch_data_from_db("SELECT * FROM Recruiter")
-    job_requirements = fetch_data_from_db("SELECT * FROM Jobs")
-    submission_table = fetch_data_from_db("SELECT * FROM Submissions")
-
-    # Calculate totals
-    total_recruiter = recruiter_detail.shape[0]
-    total_jobs = job_requirements.shape[0]
-    total_submission = submission_table.shape[0]
-
-    # Display Metrics
-    total1, total2, total3 = st.columns(3, gap='small')
-
-    with total1:
-        st.info('Total Recruiters', icon="👨‍💼")
-        st.metric(label="Recruiters Count", value=f'{total_recruiter}', label_visibility="collapsed")
-    with total2:
-        st.info('Total Jobs', icon="📋")
-        st.metric(label="Jobs Count", value=f'{total_jobs}', label_visibility="collapsed")
-    with total3:
-        st.info('Total Submissions', icon="📤")
-        st.metric(label="Submissions Count", value=f'{total_submission}', label_visibility="collapsed")
+    # Only the metrics re-run on the timer, not the rest of the app.
+    @st.fragment(run_every=REFRESH_SECONDS if auto_refresh else None)
+    def summary_metrics():
+        totals = fetch_totals()
+
+        # Display Metrics
+        total1, total2, total3 = st.columns(3, gap='small')
+
+        with total1:
+            st.info('Total Recruiters', icon="👨‍💼")
+            st.metric(label="Recruiters Count", value=f'{totals["Recruiter"]}', label_visibility="collapsed")
+        with total2:
+            st.info('Total Jobs', icon="📋")
+            st.metric(label="Jobs Count", value=f'{totals["Jobs"]}', label_visibility="collapsed")
+        with total3:
+            st.info('Total Submissions', icon="📤")
+            st.metric(label="Submissions Count", value=f'{totals["Submissions"]}', label_visibility="collapsed")
+
+        stats = cache_stats()
+        st.caption(f"Query cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} cached results")
+
+    summary_metrics()
+    pipeline_report()
+
+# Submission pipeline charts, read only from the rollup table
+def pipeline_report():
+    st.subheader('Submission Pipeline')
+    first_day, last_day = rollup_date_range()
+    if not first_day:
+        st.info("No submissions to report on yet.")
+        return
+
+    date_range = st.date_input(
+        "Date range:",
+        value=(date.fromisoformat(first_day), date.fromisoformat(last_day)),
+        key="pipeline_date_range"
+    )
+    if len(date_range) != 2:
+        return
+    start_day, end_day = date_range
+
+    weekly = submissions_by("week", start_day, end_day)
+    st.markdown("**Submissions per week**")
+    st.line_chart(weekly, x="Week", y=["Submissions", "Selected"])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        by_recruiter = submissions_by("recruiter", start_day, end_day)
+        st.markdown("**By recruiter**")
+        st.bar_chart(by_recruiter, x="Recruiter", y=["Submissions", "Selected"])
+        st.dataframe(by_recruiter, hide_index=True, use_container_width=True)
+    with col2:
+        by_client = submissions_by("client", start_day, end_day)
+        st.markdown("**By client**")
+        st.bar_chart(by_client, x="Client", y=["Submissions", "Selected"])
+        st.dataframe(by_client, hide_index=True, use_container_width=True)
+
+    by_status = submissions_by("status", start_day, end_day)
+    st.markdown("**By status**")
+    st.bar_chart(by_status, x="Status", y="Submissions")
 
 # Run the dashboard
 if __name__ == "__main__":
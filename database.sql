@@ -1,3 +1,6 @@
+-- The schema is created and upgraded by migrations.py (run at app startup).
+-- The statements below are kept for manual seeding only.
+
 -- CREATE TABLE IF NOT EXISTS Recruiter(
 --     Recruiter_id INTEGER PRIMARY KEY AUTOINCREMENT,
 --     Name VARCHAR(50) NOT NULL,
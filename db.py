@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+import pandas as pd
+from dotenv import load_dotenv
+from utils.profiling import PROFILE, ProfiledConnection
+
+# ------------------------------------------------------------------------------
+# Shared data access for mydb.db
+# ------------------------------------------------------------------------------
+# Every page goes through get_connection(). Each thread (Streamlit runs one
+# script thread per browser session) gets one long-lived connection, tuned
+# once when it is opened. WAL journaling lets readers keep working while a
+# recruiter saves a form or a bulk upload is writing.
+load_dotenv()
+
+DB_PATH = os.getenv("ATS_DB_PATH", "mydb.db")
+BUSY_TIMEOUT_MS = 5000          # wait for a competing writer instead of failing
+CACHE_SIZE_KB = 20000           # page cache per connection (~20 MB)
+MMAP_SIZE = 256 * 1024 * 1024   # memory-map up to 256 MB of the database file
+
+QUERY_CACHE_SIZE = 64           # cached result frames kept per process
+
+_local = threading.local()
+_foreign_keys = False  # switched on by the migration runner once the schema allows it
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _configure(conn):
+    conn.execute("PRAGMA journal_mode = WAL")
+    # NORMAL is durable across application crashes in WAL mode; only a power
+    # loss can roll back the most recent commits.
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if _foreign_keys:
+        conn.execute("PRAGMA foreign_keys = ON")
+    # One row per table, bumped by every write helper; see cached_query().
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS DATA_VERSIONS (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+    conn.commit()
+
+
+def get_connection():
+    """
+    Return this thread's connection to the ATS database, opening and tuning
+    it on first use. Callers commit their own writes but must not close it.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        factory = ProfiledConnection if PROFILE else sqlite3.Connection
+        conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, factory=factory)
+        _configure(conn)
+        _local.conn = conn
+    return conn
+
+
+def enable_foreign_keys(conn=None):
+    """
+    Enforce foreign keys on conn (default: this thread's connection). For the
+    ATS database's own connection, every new connection enforces them too.
+    """
+    global _foreign_keys
+    if conn is None or conn is getattr(_local, "conn", None):
+        _foreign_keys = True
+    (conn or get_connection()).execute("PRAGMA foreign_keys = ON")
+
+
+def close_connection():
+    """Close this thread's connection (e.g. at the end of a worker thread)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+def fetch_data_from_db(query, params=None):
+    """Run a read query on the shared connection and return a DataFrame."""
+    return pd.read_sql_query(query, get_connection(), params=params)
+
+
+# ------------------------------------------------------------------------------
+# Version-stamped read cache
+# ------------------------------------------------------------------------------
+# Write helpers call bump_version() inside their transaction. cached_query()
+# keys each result by the query, its parameters and the current versions of
+# the tables it reads, so a rerun reuses the frame until one of those tables
+# is written. Versions live in the database, so writes made by another
+# server process invalidate this process's cache too.
+def bump_version(conn, *tables):
+    """Mark tables as changed. Call before the caller's commit."""
+    conn.executemany(
+        '''
+        INSERT INTO DATA_VERSIONS (table_name, version) VALUES (?, 1)
+        ON CONFLICT(table_name) DO UPDATE SET version = version + 1
+        ''',
+        [(table.lower(),) for table in tables]
+    )
+
+
+def table_versions(*tables):
+    """Current data version of each table (0 if never written)."""
+    names = [table.lower() for table in tables]
+    marks = ", ".join("?" for _ in names)
+    rows = get_connection().execute(
+        f"SELECT table_name, version FROM DATA_VERSIONS WHERE table_name IN ({marks})", names
+    ).fetchall()
+    found = dict(rows)
+    return tuple(found.get(name, 0) for name in names)
+
+
+def cached_query(query, tables, params=None):
+    """
+    fetch_data_from_db() with a shared cache invalidated by table versions.
+    The returned DataFrame is shared between callers; treat it as read-only.
+    """
+    key = (query, tuple(params or ()), tuple(tables), table_versions(*tables))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return _cache[key]
+        _cache_stats["misses"] += 1
+
+    df = fetch_data_from_db(query, params)
+    with _cache_lock:
+        _cache[key] = df
+        while len(_cache) > QUERY_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return df
+
+
+def cache_stats():
+    """Hit/miss counters and current size of the query cache."""
+    with _cache_lock:
+        return {**_cache_stats, "entries": len(_cache)}
+
+
+def clear_query_cache():
+    """Drop every cached frame (benchmarks use it to time cold reads)."""
+    with _cache_lock:
+        _cache.clear()
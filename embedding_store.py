@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import numpy as np
+from utils.db import DB_PATH
+
+# ------------------------------------------------------------------------------
+# Resume embeddings in a memory-mapped float16 file shared by all processes
+# ------------------------------------------------------------------------------
+# Per model there is a base file ({model}.{generation}.npy, unit-length
+# float16 vectors) with its Resume_ID list, plus an append log of
+# (Resume_ID, vector) records for resumes embedded since. Every process
+# opens the files read-only with np.load(mmap_mode="r") / np.memmap, so the
+# operating system keeps one copy of the pages for the whole machine no
+# matter how many Streamlit workers score against it.
+#
+# EMBEDDING_STORE (in SQLite) records the generation and how many log
+# records are committed. Appends happen inside the caller's write
+# transaction and only advance that counter, so readers never see a record
+# that was not committed, and SQLite's write lock serializes appenders
+# across processes. When the log grows past COMPACT_MIN_ROWS (and
+# COMPACT_RATIO of the base), base and log are merged into the next
+# generation's base file and the log starts over. EMBEDDING_HASHES keeps a
+# hash of the summary each vector was computed from, so a resume whose
+# summary changed is re-embedded (see stale_embeddings).
+EMBEDDINGS_DIR = os.getenv(
+    "ATS_EMBEDDINGS_DIR", os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "embeddings")
+)
+COMPACT_MIN_ROWS = 5000
+COMPACT_RATIO = 0.2
+SCORE_CHUNK_ROWS = 8192  # rows upcast to float32 at a time while scoring
+
+_views = {}  # model -> (generation, log rows, view dict)
+_views_lock = threading.Lock()
+
+
+def _file_stem(model):
+    return re.sub(r'[^A-Za-z0-9]+', '_', model)
+
+
+def _paths(model, generation):
+    stem = os.path.join(EMBEDDINGS_DIR, f"{_file_stem(model)}.{generation}")
+    return stem + ".npy", stem + ".ids.npy", stem + ".log"
+
+
+def _record_dtype(dims):
+    return np.dtype([("id", "<i8"), ("vec", "<f2", (dims,))])
+
+
+def _text_hash(text):
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+def _unit_float16(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float16)
+
+
+def _state(conn, model):
+    return conn.execute(
+        "SELECT dims, generation, base_rows, log_rows FROM EMBEDDING_STORE WHERE model = ?", (model,)
+    ).fetchone()
+
+
+def append_embeddings(conn, model, resume_ids, vectors, texts):
+    """
+    Record embeddings for these resumes, computed from texts (a later record
+    for the same resume replaces the earlier one). Call inside the caller's
+    write transaction; does not commit.
+    """
+    resume_ids = list(resume_ids)
+    if not resume_ids:
+        return
+    vectors = _unit_float16(vectors)
+    # Taking the write lock first makes the read-modify-write below safe
+    # against appenders in other processes.
+    conn.execute(
+        "INSERT OR IGNORE INTO EMBEDDING_STORE (model, dims, generation, base_rows, log_rows) VALUES (?, ?, 0, 0, 0)",
+        (model, vectors.shape[1])
+    )
+    dims, generation, base_rows, log_rows = _state(conn, model)
+    if dims != vectors.shape[1]:
+        raise ValueError(f"{model} embeddings have {dims} dimensions, not {vectors.shape[1]}")
+
+    records = np.empty(len(resume_ids), dtype=_record_dtype(dims))
+    records["id"] = resume_ids
+    records["vec"] = vectors
+    os.makedirs(EMBEDDINGS_DIR, exist_ok=True)
+    _, _, log_path = _paths(model, generation)
+    with open(log_path, "r+b" if os.path.exists(log_path) else "w+b") as log:
+        # Write after the last committed record; anything beyond it is left
+        # over from a rolled-back transaction and is overwritten.
+        log.seek(log_rows * records.dtype.itemsize)
+        log.write(records.tobytes())
+        log.flush()
+        os.fsync(log.fileno())
+    log_rows += len(records)
+    conn.execute("UPDATE EMBEDDING_STORE SET log_rows = ? WHERE model = ?", (log_rows, model))
+    conn.executemany(
+        "INSERT OR REPLACE INTO EMBEDDING_HASHES (model, Resume_ID, text_hash) VALUES (?, ?, ?)",
+        [(model, resume_id, _text_hash(text)) for resume_id, text in zip(resume_ids, texts)]
+    )
+    if log_rows >= max(COMPACT_MIN_ROWS, COMPACT_RATIO * base_rows):
+        compact(conn, model)
+
+
+def _open(model, dims, generation, base_rows, log_rows):
+    """Read-only views of the base and the committed part of the log."""
+    vectors_path, ids_path, log_path = _paths(model, generation)
+    if base_rows:
+        base = np.load(vectors_path, mmap_mode="r")
+        base_ids = np.load(ids_path, mmap_mode="r")
+    else:
+        base = np.zeros((0, dims), dtype=np.float16)
+        base_ids = np.zeros(0, dtype=np.int64)
+    if log_rows:
+        log = np.memmap(log_path, dtype=_record_dtype(dims), mode="r", shape=(log_rows,))
+        log_vectors, log_ids = log["vec"], log["id"]
+    else:
+        log_vectors, log_ids = np.zeros((0, dims), dtype=np.float16), np.zeros(0, dtype=np.int64)
+
+    # Position of the newest record of every resume (log records win).
+    all_ids = np.concatenate([base_ids, log_ids])
+    unique_ids, first_in_reversed = np.unique(all_ids[::-1], return_index=True)
+    latest = len(all_ids) - 1 - first_in_reversed
+    return {
+        "base": base, "log": log_vectors, "base_rows": len(base_ids),
+        "ids": unique_ids, "positions": latest, "dims": dims,
+    }
+
+
+def open_store(conn, model):
+    """This process's views of the store, reopened only when another write was committed."""
+    state = _state(conn, model)
+    if state is None:
+        return None
+    dims, generation, base_rows, log_rows = state
+    with _views_lock:
+        cached = _views.get(model)
+        if cached and cached[:2] == (generation, log_rows):
+            return cached[2]
+    view = _open(model, dims, generation, base_rows, log_rows)
+    with _views_lock:
+        _views[model] = (generation, log_rows, view)
+    return view
+
+
+def _rows(view, positions):
+    """Vectors at the given store positions (base first, then log), as float32."""
+    base_rows = view["base_rows"]
+    out = np.empty((len(positions), view["dims"]), dtype=np.float32)
+    in_base = positions < base_rows
+    out[in_base] = view["base"][positions[in_base]]
+    out[~in_base] = view["log"][positions[~in_base] - base_rows]
+    return out
+
+
+def similarity_matrix(conn, model, queries, resume_ids):
+    """
+    Cosine similarity of each query vector (the rows of queries) to each
+    resume, as a resumes x queries array with NaN rows for resumes with no
+    stored embedding. Rows are upcast SCORE_CHUNK_ROWS at a time, so
+    scoring never copies the whole matrix.
+    """
+    resume_ids = np.asarray(resume_ids, dtype=np.int64)
+    queries = np.asarray(queries, dtype=np.float32)
+    scores = np.full((len(resume_ids), len(queries)), np.nan, dtype=np.float32)
+    view = open_store(conn, model)
+    if view is None or not len(view["ids"]):
+        return scores
+    norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    queries = queries / norms
+    slots = np.searchsorted(view["ids"], resume_ids).clip(0, len(view["ids"]) - 1)
+    found = np.flatnonzero(view["ids"][slots] == resume_ids)
+    positions = view["positions"][slots[found]]
+    for start in range(0, len(found), SCORE_CHUNK_ROWS):
+        chunk = slice(start, start + SCORE_CHUNK_ROWS)
+        scores[found[chunk]] = _rows(view, positions[chunk]) @ queries.T
+    return scores
+
+
+def similarities(conn, model, query, resume_ids):
+    """Cosine similarity of one query vector to each resume (see similarity_matrix)."""
+    return similarity_matrix(conn, model, np.asarray(query)[None, :], resume_ids)[:, 0]
+
+
+def stale_embeddings(conn, model, resume_ids, texts):
+    """
+    The resume IDs that have no stored embedding for this model, or one
+    computed from a different text than theirs.
+    """
+    resume_ids = [int(resume_id) for resume_id in resume_ids]
+    view = open_store(conn, model)
+    if view is None or not len(view["ids"]):
+        return resume_ids
+    stored = np.isin(resume_ids, view["ids"])
+    hashes = dict(conn.execute(
+        "SELECT Resume_ID, text_hash FROM EMBEDDING_HASHES WHERE model = ? AND Resume_ID IN (SELECT value FROM json_each(?))",
+        (model, json.dumps(resume_ids))
+    ).fetchall())
+    return [
+        resume_id for resume_id, text, found in zip(resume_ids, texts, stored)
+        if not found or hashes.get(resume_id) != _text_hash(text)
+    ]
+
+
+def compact(conn, model):
+    """
+    Merge base and log into the next generation, dropping superseded records
+    and deleted resumes. Runs inside the caller's write transaction.
+    """
+    dims, generation, base_rows, log_rows = _state(conn, model)
+    view = _open(model, dims, generation, base_rows, log_rows)
+    existing = {row[0] for row in conn.execute("SELECT Resume_ID FROM RESUMES")}
+    keep = np.array([resume_id in existing for resume_id in view["ids"].tolist()], dtype=bool)
+    ids = np.ascontiguousarray(view["ids"][keep])
+    positions = view["positions"][keep]
+
+    vectors_path, ids_path, _ = _paths(model, generation + 1)
+    matrix = np.lib.format.open_memmap(vectors_path + ".tmp", mode="w+", dtype=np.float16, shape=(len(ids), dims))
+    for start in range(0, len(ids), SCORE_CHUNK_ROWS):
+        chunk = slice(start, start + SCORE_CHUNK_ROWS)
+        matrix[chunk] = _rows(view, positions[chunk])
+    matrix.flush()
+    del matrix
+    with open(ids_path + ".tmp", "wb") as f:
+        np.save(f, ids)
+    os.replace(vectors_path + ".tmp", vectors_path)
+    os.replace(ids_path + ".tmp", ids_path)
+    conn.execute(
+        "UPDATE EMBEDDING_STORE SET generation = ?, base_rows = ?, log_rows = 0 WHERE model = ?",
+        (generation + 1, len(ids), model)
+    )
+    conn.execute(
+        "DELETE FROM EMBEDDING_HASHES WHERE model = ? AND Resume_ID NOT IN (SELECT Resume_ID FROM RESUMES)", (model,)
+    )
+    # Older generations may still be mapped by other processes (and cannot be
+    # removed on Windows then); they are retried on the next compaction.
+    for name in os.listdir(EMBEDDINGS_DIR):
+        parts = name.split(".")
+        if parts[0] == _file_stem(model) and len(parts) > 1 and parts[1].isdigit() and int(parts[1]) < generation:
+            try:
+                os.remove(os.path.join(EMBEDDINGS_DIR, name))
+            except OSError:
+                pass
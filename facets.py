@@ -0,0 +1,77 @@
+import sqlite3
+
+# ------------------------------------------------------------------------------
+# Facet counts for the Search tab, maintained incrementally by triggers
+# ------------------------------------------------------------------------------
+# RESUME_FACETS keeps one row per (facet, value) with the number of resumes
+# carrying that value. Location, job title and company are counted from
+# RESUMES; skills are counted from the trigram index's resume links, which
+# already hold one row per (skill, resume). Reading the counts never scans
+# RESUMES.
+FACET_COLUMNS = {
+    "location": "LOCATION",
+    "job_title": "JOB_TITLE",
+    "company": "CURRENT_JOB",
+}
+FACET_LABELS = {
+    "location": "Location",
+    "job_title": "Job Title",
+    "company": "Company",
+    "skill": "Skills",
+}
+
+
+def ensure_facets(conn):
+    """Make sure the facet table and its triggers exist (created by migration 5)."""
+    from utils.migrations import run_migrations
+    run_migrations(conn)
+
+
+def facet_counts(conn, facet, limit=50):
+    """Most common values of one facet as [(value, count)], read from RESUME_FACETS."""
+    return conn.execute(
+        "SELECT value, count FROM RESUME_FACETS WHERE facet = ? ORDER BY count DESC, value LIMIT ?",
+        (facet, limit)
+    ).fetchall()
+
+
+def facet_filter_sql(selected, id_column="RESUMES.Resume_ID"):
+    """
+    SQL condition and parameters for the selected facet values, e.g.
+    {"location": ["Dallas"], "skill": ["python", "aws"]}. Values within one
+    facet are OR-ed, facets are AND-ed; every selected skill must be present.
+    Returns ("", []) when nothing is selected.
+    """
+    clauses, params = [], []
+    for facet, column in FACET_COLUMNS.items():
+        values = selected.get(facet) or []
+        if values:
+            marks = ", ".join("?" for _ in values)
+            clauses.append(f"TRIM(RESUMES.{column}) COLLATE NOCASE IN ({marks})")
+            params.extend(values)
+    for skill in selected.get("skill") or []:
+        clauses.append(f'''EXISTS (
+            SELECT 1 FROM FUZZY_TERM_RESUMES r JOIN FUZZY_TERMS t ON t.term_id = r.term_id
+            WHERE r.Resume_ID = {id_column} AND t.kind = 'skill' AND t.term = ?)''')
+        params.append(skill)
+    return " AND ".join(clauses), params
+
+
+def filter_resume_ids(conn, resume_ids, selected):
+    """Keep only the IDs (in their original order) that satisfy the facet selection."""
+    where, params = facet_filter_sql(selected)
+    if not where or not resume_ids:
+        return list(resume_ids)
+    keep = set()
+    # Stay well below SQLite's bound-parameter limit.
+    for start in range(0, len(resume_ids), 500):
+        chunk = list(resume_ids[start:start + 500])
+        marks = ", ".join("?" for _ in chunk)
+        try:
+            rows = conn.execute(
+                f"SELECT Resume_ID FROM RESUMES WHERE Resume_ID IN ({marks}) AND {where}", chunk + params
+            ).fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        keep.update(resume_id for (resume_id,) in rows)
+    return [resume_id for resume_id in resume_ids if resume_id in keep]
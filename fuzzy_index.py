@@ -0,0 +1,139 @@
+import re
+import sqlite3
+
+# ------------------------------------------------------------------------------
+# Typo-tolerant trigram index for candidate names, companies and skills
+# ------------------------------------------------------------------------------
+# FUZZY_TERMS holds the distinct vocabulary (one row per normalised name,
+# company or skill), FUZZY_TRIGRAMS the posting list trigram -> term and
+# FUZZY_TERM_RESUMES which resumes use a term. A lookup only reads the
+# postings of the query's own trigrams, so its cost depends on the size of
+# the vocabulary those trigrams touch, never on the number of resumes.
+TERM_KINDS = ("name", "company", "skill")
+MIN_SIMILARITY = 0.3
+
+def normalize_term(text):
+    """Lowercase and collapse whitespace; returns '' for empty/placeholder values."""
+    term = re.sub(r"\s+", " ", str(text or "")).strip().lower()
+    return "" if term in ("", "not specified", "null", "none") else term
+
+
+def split_skills(skills):
+    """Canonical skill terms from a comma/semicolon/pipe separated skills string."""
+    terms = [normalize_term(s) for s in re.split(r"[,;|\n]", skills or "")]
+    return sorted({t for t in terms if t})
+
+
+def trigrams(term):
+    """pg_trgm-style trigrams: every word is padded with two leading and one trailing space."""
+    grams = set()
+    for word in term.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def ensure_fuzzy_index(conn):
+    """Make sure the trigram tables exist (created by migration 5)."""
+    from utils.migrations import run_migrations
+    run_migrations(conn)
+
+
+def _term_id(cursor, kind, term):
+    cursor.execute("SELECT term_id FROM FUZZY_TERMS WHERE kind = ? AND term = ?", (kind, term))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    grams = trigrams(term)
+    cursor.execute(
+        "INSERT INTO FUZZY_TERMS (kind, term, trigram_count) VALUES (?, ?, ?)",
+        (kind, term, len(grams))
+    )
+    term_id = cursor.lastrowid
+    cursor.executemany(
+        "INSERT OR IGNORE INTO FUZZY_TRIGRAMS (trigram, term_id) VALUES (?, ?)",
+        [(gram, term_id) for gram in grams]
+    )
+    return term_id
+
+
+def index_resume(conn, resume_id, name, company, skills):
+    """
+    (Re)index one resume's name, company and skills. Call inside the same
+    transaction that inserts or updates the RESUMES row; does not commit.
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM FUZZY_TERM_RESUMES WHERE Resume_ID = ?", (resume_id,))
+    terms = [("name", normalize_term(name)), ("company", normalize_term(company))]
+    terms += [("skill", skill) for skill in split_skills(skills)]
+    for kind, term in terms:
+        if not term:
+            continue
+        cursor.execute(
+            "INSERT OR IGNORE INTO FUZZY_TERM_RESUMES (term_id, Resume_ID) VALUES (?, ?)",
+            (_term_id(cursor, kind, term), resume_id)
+        )
+
+
+def rebuild_fuzzy_index(conn):
+    """Re-index every resume from scratch (used on first start and for repairs)."""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM FUZZY_TERM_RESUMES")
+    rows = cursor.execute("SELECT Resume_ID, NAME, CURRENT_JOB, SKILLS FROM RESUMES").fetchall()
+    for resume_id, name, company, skills in rows:
+        index_resume(conn, resume_id, name, company, skills)
+    conn.commit()
+
+
+def fuzzy_lookup(conn, text, kinds=TERM_KINDS, limit=10, min_similarity=MIN_SIMILARITY):
+    """
+    Vocabulary terms most similar to `text`, best first, as (kind, term, similarity).
+    Similarity is the Jaccard index of the two trigram sets (as in pg_trgm).
+    Only terms that are still used by at least one resume are returned.
+    """
+    query_grams = trigrams(normalize_term(text))
+    if not query_grams:
+        return []
+    gram_marks = ", ".join("?" for _ in query_grams)
+    kind_marks = ", ".join("?" for _ in kinds)
+    try:
+        return conn.execute(f'''
+            WITH shared AS (
+                SELECT term_id, COUNT(*) AS hits
+                FROM FUZZY_TRIGRAMS
+                WHERE trigram IN ({gram_marks})
+                GROUP BY term_id
+            )
+            SELECT t.kind, t.term,
+                   CAST(s.hits AS REAL) / (? + t.trigram_count - s.hits) AS similarity
+            FROM shared s
+            JOIN FUZZY_TERMS t ON t.term_id = s.term_id
+            WHERE t.kind IN ({kind_marks})
+              AND CAST(s.hits AS REAL) / (? + t.trigram_count - s.hits) >= ?
+              AND EXISTS (SELECT 1 FROM FUZZY_TERM_RESUMES r WHERE r.term_id = t.term_id)
+            ORDER BY similarity DESC, t.term
+            LIMIT ?
+        ''', [*query_grams, len(query_grams), *kinds, len(query_grams), min_similarity, limit]).fetchall()
+    except sqlite3.OperationalError:
+        return []
+
+
+def fuzzy_resume_ids(conn, text, kinds=TERM_KINDS, min_similarity=MIN_SIMILARITY, max_terms=25):
+    """
+    Resume IDs matching the closest terms to `text`, ranked by the best
+    similarity any of their terms reached. Returns [(Resume_ID, similarity, term)].
+    """
+    matches = fuzzy_lookup(conn, text, kinds=kinds, limit=max_terms, min_similarity=min_similarity)
+    best = {}
+    for kind, term, similarity in matches:
+        rows = conn.execute('''
+            SELECT r.Resume_ID
+            FROM FUZZY_TERMS t
+            JOIN FUZZY_TERM_RESUMES r ON r.term_id = t.term_id
+            WHERE t.kind = ? AND t.term = ?
+        ''', (kind, term)).fetchall()
+        for (resume_id,) in rows:
+            if resume_id not in best or similarity > best[resume_id][0]:
+                best[resume_id] = (similarity, term)
+    ranked = sorted(best.items(), key=lambda item: (-item[1][0], -item[0]))
+    return [(resume_id, similarity, term) for resume_id, (similarity, term) in ranked]
@@ -0,0 +1,258 @@
+import hashlib
+import threading
+import numpy as np
+from utils.db import bump_version, cached_query, table_versions
+from utils.embedding_store import append_embeddings, similarity_matrix
+from utils.profiling import profile_section
+
+# ------------------------------------------------------------------------------
+# Reverse matching: best-fit jobs for newly ingested resumes
+# ------------------------------------------------------------------------------
+# The ATS page scores one job against every resume. This module goes the
+# other way at upload time: the new resumes are scored against every job
+# in one matrix product and the TOP_N_JOBS best jobs per resume are stored
+# in RESUME_JOB_MATCHES. Scores use the ATS formula, weights and skill
+# score from utils.ATS_Score (semantic similarity of description and
+# summary plus the share of the job's terms found in the resume's skills),
+# so both directions agree.
+#
+# Job embeddings are stored in JOB_EMBEDDINGS with a hash of the text they
+# were computed from; only new or edited jobs are re-embedded, and the
+# normalized job matrix is kept in memory until the Jobs table changes.
+# The cost of matching is therefore proportional to the number of new
+# resumes, not to the size of the resume table.
+#
+# Jobs added or edited after a resume was uploaded are merged in by the
+# pre-scoring scheduler (utils.prescore): rematch_changed_jobs() scores them
+# against every resume's stored embedding in one matrix product and
+# MATCHED_JOBS records the job text each merge used. A resume whose list
+# loses an edited job is not refilled from jobs below its top TOP_N_JOBS.
+TOP_N_JOBS = 5
+REMATCH_BATCH = 16  # changed jobs merged per call
+
+_job_matrix = None  # (Jobs data version, model name, matrix dict)
+_job_matrix_lock = threading.Lock()
+_matched_jobs_version = None  # Jobs data version with every change merged
+
+
+def _text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def job_matrix(conn, analyzer, model_name):
+    """
+    Normalized embeddings of every job, embedding only jobs whose text
+    changed since they were stored. Returns a dict with "job_ids",
+    "matrix" (jobs x dims, float32) and "terms" (one term list per job).
+    """
+    from utils.ATS_Score import job_skill_terms
+    global _job_matrix
+    version = table_versions("Jobs")
+    with _job_matrix_lock:
+        if _job_matrix and _job_matrix[:2] == (version, model_name):
+            return _job_matrix[2]
+
+        jobs = conn.execute("SELECT Job_ID, Description FROM Jobs ORDER BY Job_ID").fetchall()
+        stored = {
+            job_id: (text_hash, embedding)
+            for job_id, text_hash, embedding in conn.execute(
+                "SELECT Job_ID, text_hash, embedding FROM JOB_EMBEDDINGS WHERE model = ?", (model_name,)
+            )
+        }
+        hashes = {job_id: _text_hash(description or "") for job_id, description in jobs}
+        stale = [(job_id, description or "") for job_id, description in jobs
+                 if stored.get(job_id, (None,))[0] != hashes[job_id]]
+        if stale:
+            with profile_section("model"):
+                fresh = analyzer.model.encode(
+                    [text for _, text in stale], batch_size=32, convert_to_numpy=True, show_progress_bar=False
+                ).astype(np.float32)
+            rows = [(job_id, model_name, hashes[job_id], vector.tobytes())
+                    for (job_id, _), vector in zip(stale, fresh)]
+            conn.executemany(
+                "INSERT OR REPLACE INTO JOB_EMBEDDINGS (Job_ID, model, text_hash, embedding) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+            for job_id, _, text_hash, blob in rows:
+                stored[job_id] = (text_hash, blob)
+
+        job_ids = [job_id for job_id, _ in jobs]
+        if job_ids:
+            matrix = _normalize(np.vstack([np.frombuffer(stored[job_id][1], dtype=np.float32) for job_id in job_ids]))
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        result = {
+            "job_ids": job_ids,
+            "matrix": matrix,
+            "terms": [job_skill_terms(description) for _, description in jobs],
+        }
+        _job_matrix = (version, model_name, result)
+        return result
+
+
+def skill_scores(resume_skills, job_term_lists):
+    """The ATS skill score of each resume for each job (resumes x jobs)."""
+    from utils.ATS_Score import skill_match_scores
+    scores = np.zeros((len(resume_skills), len(job_term_lists)), dtype=np.float32)
+    for j, terms in enumerate(job_term_lists):
+        scores[:, j] = skill_match_scores(terms, resume_skills)
+    return scores
+
+
+def match_resumes(conn, resume_ids, top_n=TOP_N_JOBS):
+    """
+    Embed the given resumes into the shared embedding store, score them
+    against every job and store their top_n jobs. Returns the number of
+    resumes matched (0 when there are no jobs).
+    """
+    from utils.ATS_Score import EMBEDDING_MODEL as model_name, SEMANTIC_WEIGHT, SKILL_WEIGHT, get_analyzer
+    resume_ids = list(resume_ids)
+    if not resume_ids:
+        return 0
+    marks = ", ".join("?" for _ in resume_ids)
+    resumes = conn.execute(
+        f"SELECT Resume_ID, RESUME_SUMMARY, SKILLS FROM RESUMES WHERE Resume_ID IN ({marks})", resume_ids
+    ).fetchall()
+    if not resumes:
+        return 0
+
+    analyzer = get_analyzer()
+    # Encoded directly (not through the analyzer's text cache): the vectors
+    # go to the shared embedding store instead of this process's memory.
+    with profile_section("model"):
+        summaries = np.asarray(analyzer.model.encode(
+            [summary for _, summary, _ in resumes], batch_size=32, convert_to_numpy=True, show_progress_bar=False
+        ), dtype=np.float32)
+    append_embeddings(conn, model_name, [r[0] for r in resumes], summaries, [summary for _, summary, _ in resumes])
+    jobs = job_matrix(conn, analyzer, model_name)
+    if not jobs["job_ids"]:
+        conn.commit()
+        return 0
+
+    semantic = _normalize(summaries) @ jobs["matrix"].T
+    skills = skill_scores([skills for _, _, skills in resumes], jobs["terms"])
+    scores = ((SEMANTIC_WEIGHT * semantic + SKILL_WEIGHT * skills) * 100).clip(0, 100)
+
+    n = min(top_n, len(jobs["job_ids"]))
+    top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    rows = []
+    for i, (resume_id, _, _) in enumerate(resumes):
+        best = sorted(top[i], key=lambda j: -scores[i, j])
+        rows += [(resume_id, jobs["job_ids"][j], rank, round(float(scores[i, j]), 1))
+                 for rank, j in enumerate(best, start=1)]
+
+    conn.executemany("DELETE FROM RESUME_JOB_MATCHES WHERE Resume_ID = ?", [(r[0],) for r in resumes])
+    conn.executemany(
+        "INSERT INTO RESUME_JOB_MATCHES (Resume_ID, Job_ID, rank, score) VALUES (?, ?, ?, ?)", rows
+    )
+    bump_version(conn, "RESUME_JOB_MATCHES")
+    conn.commit()
+    return len(resumes)
+
+
+def changed_jobs(conn, model_name):
+    """Job_IDs added or edited since they were last merged into the matches."""
+    rows = conn.execute('''
+        SELECT j.Job_ID, j.Description, m.text_hash
+        FROM Jobs j
+        LEFT JOIN MATCHED_JOBS m ON m.Job_ID = j.Job_ID AND m.model = ?
+        ORDER BY j.Job_ID
+    ''', (model_name,)).fetchall()
+    return [job_id for job_id, description, matched in rows if matched != _text_hash(description or "")]
+
+
+def rematch_changed_jobs(conn, limit=REMATCH_BATCH, top_n=TOP_N_JOBS):
+    """
+    Score up to limit added or edited jobs against every embedded resume and
+    merge them into each resume's top_n jobs. Does no work while the Jobs
+    table is unchanged. Returns the number of jobs merged.
+    """
+    from utils.ATS_Score import EMBEDDING_MODEL as model_name, SEMANTIC_WEIGHT, SKILL_WEIGHT, get_analyzer
+    global _matched_jobs_version
+    version = table_versions("Jobs")
+    if version == _matched_jobs_version:
+        return 0
+    changed = changed_jobs(conn, model_name)[:limit]
+    if not changed:
+        _matched_jobs_version = version
+        return 0
+
+    jobs = job_matrix(conn, get_analyzer(), model_name)
+    columns = {job_id: i for i, job_id in enumerate(jobs["job_ids"])}
+    changed = [job_id for job_id in changed if job_id in columns]  # skip jobs deleted meanwhile
+    if not changed:
+        return 0
+    marks = ", ".join("?" for _ in changed)
+    hashes = conn.execute(
+        f"SELECT Job_ID, text_hash FROM JOB_EMBEDDINGS WHERE model = ? AND Job_ID IN ({marks})",
+        [model_name] + changed
+    ).fetchall()
+
+    resumes = conn.execute("SELECT Resume_ID, SKILLS FROM RESUMES ORDER BY Resume_ID").fetchall()
+    semantic = similarity_matrix(
+        conn, model_name, jobs["matrix"][[columns[job_id] for job_id in changed]], [r[0] for r in resumes]
+    )
+    embedded = np.flatnonzero(~np.isnan(semantic[:, 0]))
+    skills = skill_scores([resumes[i][1] for i in embedded], [jobs["terms"][columns[job_id]] for job_id in changed])
+    scores = ((SEMANTIC_WEIGHT * semantic[embedded] + SKILL_WEIGHT * skills) * 100).clip(0, 100)
+
+    current = {}
+    for resume_id, job_id, score in conn.execute(
+        "SELECT Resume_ID, Job_ID, score FROM RESUME_JOB_MATCHES ORDER BY Resume_ID, rank"
+    ):
+        current.setdefault(resume_id, []).append((job_id, score))
+    merged = set(changed)
+    updated, rows = [], []
+    for row, i in enumerate(embedded):
+        resume_id = resumes[i][0]
+        old = current.get(resume_id, [])
+        candidates = [(job_id, score) for job_id, score in old if job_id not in merged]
+        candidates += [(job_id, round(float(scores[row, k]), 1)) for k, job_id in enumerate(changed)]
+        best = sorted(candidates, key=lambda c: -c[1])[:top_n]
+        if best != old:
+            updated.append((resume_id,))
+            rows += [(resume_id, job_id, rank, score) for rank, (job_id, score) in enumerate(best, start=1)]
+
+    conn.executemany("DELETE FROM RESUME_JOB_MATCHES WHERE Resume_ID = ?", updated)
+    conn.executemany(
+        "INSERT INTO RESUME_JOB_MATCHES (Resume_ID, Job_ID, rank, score) VALUES (?, ?, ?, ?)", rows
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO MATCHED_JOBS (Job_ID, model, text_hash) VALUES (?, ?, ?)",
+        [(job_id, model_name, text_hash) for job_id, text_hash in hashes]
+    )
+    bump_version(conn, "RESUME_JOB_MATCHES")
+    conn.commit()
+    return len(changed)
+
+
+def job_recommendations(resume_ids):
+    """{Resume_ID: DataFrame of its best-fit jobs, best first} for the given resumes."""
+    resume_ids = [int(resume_id) for resume_id in resume_ids]
+    if not resume_ids:
+        return {}
+    marks = ", ".join("?" for _ in resume_ids)
+    df = cached_query(f'''
+        SELECT m.Resume_ID, m.rank AS Rank, m.Job_ID, j.Job_Details, j.Client, m.score AS "Match %"
+        FROM RESUME_JOB_MATCHES m
+        JOIN Jobs j ON j.Job_ID = m.Job_ID
+        WHERE m.Resume_ID IN ({marks})
+        ORDER BY m.Resume_ID, m.rank
+    ''', ["RESUME_JOB_MATCHES", "Jobs"], params=resume_ids)
+    return {resume_id: group.drop(columns="Resume_ID") for resume_id, group in df.groupby("Resume_ID")}
+
+
+def best_jobs_label(matches, limit=3):
+    """Short "Job (Client) 82%" list for one resume's matches."""
+    top = matches.head(limit)
+    return ", ".join(
+        f"{job} ({client}) {score:.0f}%"
+        for job, client, score in zip(top["Job_Details"], top["Client"], top["Match %"])
+    )
@@ -1,88 +1,68 @@
 import streamlit as st
 import sqlite3
-import pandas as pd
+from utils.db import bump_version, get_connection
+from utils.bulk_io import bulk_import_export
+from utils.table_view import fetch_row, paged_table_view, row_id_input
 
-# Database connection
-def get_db_connection():
-    return sqlite3.connect('mydb.db')
-
-
-# Fetch job details
-def load_job_data():
-    conn = get_db_connection()
-    query = "SELECT * FROM Jobs"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+# Fetch one job's details
+def load_job(job_id):
+    return fetch_row("Jobs", job_id)
 
 
 # Update job details
 
 
 def update_job_details(Job_ID, Job_Details, Job_Location, Bill_Rate, Visas, Description, Client):
-    conn = get_db_connection()
+    conn = get_connection()
     query = """
         UPDATE Jobs
         SET Job_Details = ?, Job_Location = ?, Bill_Rate = ?, Visas = ?, Description = ?, Client = ?
         WHERE Job_ID = ?
     """
     conn.execute(query, (Job_Details, Job_Location, Bill_Rate, Visas, Description, Client, Job_ID))
+    bump_version(conn, "Jobs")
     conn.commit()
-    conn.close()
 
 
 # Add a new job
 def add_new_job( Job_Details, Job_Location, Bill_Rate, Visas, Description, Client):
-    conn = get_db_connection()
+    conn = get_connection()
     query = """
         INSERT INTO Jobs (Job_Details, Job_Location, Bill_Rate, Visas, Description, Client)
         VALUES (?, ?, ?, ?, ?, ?)
     """
     conn.execute(query, ( Job_Details, Job_Location, Bill_Rate, Visas, Description, Client))
+    bump_version(conn, "Jobs")
     conn.commit()
-    conn.close()
 
 
 # Remove a job
 def remove_job(job_id):
-    conn = get_db_connection()
+    conn = get_connection()
     query = "DELETE FROM Jobs WHERE Job_ID = ?"
     conn.execute(query, (job_id,))
+    bump_version(conn, "Jobs")
     conn.commit()
-    conn.close()
 
 
 # Jobs Page
 def jobs_page():
     st.header("Job Details")
 
-    # Load data from the database
-    job_data = load_job_data()
-
-    # Search functionality
-    search_term = st.text_input("Search by Job Description:")
-    filtered_df_search = job_data[
-        job_data["Description"].str.contains(search_term, case=False, na=False)
-    ]
-    with st.expander("Job Requirements", expanded=bool(search_term)):
-        st.dataframe(filtered_df_search, hide_index=True, use_container_width=True)
+    # Search, sort and page through jobs; only the visible page is loaded
+    _, search_term = paged_table_view("Jobs", "Job Requirements", "Search by Job Description:", "jobs")
+    bulk_import_export("Jobs", "Jobs", "jobs", search_term)
 
     action = st.radio(
         "Choose an Action:",
         options=["Edit Job Details", "Add New Job", "Remove Job"],
+        key="jobs_action",
     )
 
     if action == "Edit Job Details":
         st.subheader("Edit Job Details")
-        job_ids = job_data["Job_ID"].tolist()
-        job_ids.insert(0, "Select a Job ID")
-
-        selected_job_id = st.selectbox("Select Job ID:", job_ids)
-        if selected_job_id != "Select a Job ID":
-            current_row = job_data[
-                job_data["Job_ID"] == selected_job_id
-            ].iloc[0]
-
+        selected_job_id, current_row = row_id_input("Job ID:", load_job, "jobs_edit_id")
+        if current_row is not None:
             updated_jd_details = st.text_input("Job Details:", value=current_row["Job_Details"])
             updated_job_location = st.text_input("Job Location:", value=current_row["Job_Location"])
             updated_bill_rate = st.text_input("Bill Rate:", value=current_row["Bill_Rate"])
@@ -121,15 +101,18 @@ def jobs_page():
 
     elif action == "Remove Job":
         st.subheader("Remove Job")
-        job_ids = job_data["Job_ID"].tolist()
-        job_ids.insert(0, "Select a Job ID")
-
-        selected_job_id = st.selectbox("Select Job ID to Remove:", job_ids)
-        if selected_job_id != "Select a Job ID":
+        selected_job_id, current_row = row_id_input("Job ID to Remove:", load_job, "jobs_remove_id")
+        if current_row is not None:
+            st.caption(f"{current_row['Job_Details']} ({current_row['Client']})")
             if st.button("Remove Job", key="remove_job"):
-                remove_job(selected_job_id)
-                st.success("Job removed successfully!")
-                st.rerun()
+                try:
+                    remove_job(selected_job_id)
+                except sqlite3.IntegrityError:
+                    get_connection().rollback()
+                    st.error("This job still has submissions. Remove them before removing the job.")
+                else:
+                    st.success("Job removed successfully!")
+                    st.rerun()
 
 
 # Main function
@@ -0,0 +1,662 @@
+import hashlib
+import logging
+import secrets
+import sqlite3
+import threading
+from datetime import datetime
+from utils.db import enable_foreign_keys, get_connection
+
+# ------------------------------------------------------------------------------
+# Versioned schema migrations
+# ------------------------------------------------------------------------------
+# Each migration runs once per database and is recorded in SCHEMA_MIGRATIONS.
+# run_migrations() is called at startup; it applies whatever is missing in
+# version order and is a no-op for the rest of the process afterwards.
+# Migrations only use idempotent DDL (IF NOT EXISTS, column probes), so a
+# migration interrupted half-way can simply run again on the next start.
+# Never edit a migration that has shipped; add a new one instead. Each one
+# therefore writes out its own DDL rather than calling into feature modules.
+# Once a database is current, verify_indexes() checks the lookups in
+# INDEXED_QUERIES with EXPLAIN QUERY PLAN and logs any that scan instead.
+
+logger = logging.getLogger(__name__)
+
+
+def _exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+def _create_base_tables(conn):
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS USERS (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_name TEXT NOT NULL,
+            password TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS Recruiter(
+            Recruiter_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Name VARCHAR(50) NOT NULL,
+            Email VARCHAR(50) NOT NULL,
+            Phone_Number VARCHAR(50) NOT NULL,
+            Location VARCHAR(50) NOT NULL,
+            Designation VARCHAR(50) NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS Jobs(
+            Job_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Job_Details VARCHAR(50) NOT NULL,
+            Job_Location VARCHAR(50) NOT NULL,
+            Bill_Rate INTEGER NOT NULL,
+            Visas VARCHAR(50) NOT NULL,
+            Description VARCHAR(50) NOT NULL,
+            Client VARCHAR(50) NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS Submissions(
+            Submission_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Job_ID INTEGER,
+            Data_of_Submission DATE NOT NULL,
+            Client_Name VARCHAR(50) NOT NULL,
+            Job_title VARCHAR(50) NOT NULL,
+            Candidate_City VARCHAR(50) NOT NULL,
+            Candidate_State VARCHAR(50) NOT NULL,
+            Candidate_Country VARCHAR(50) NOT NULL,
+            Recruiter_name VARCHAR(50) NOT NULL,
+            Visa VARCHAR(50) NOT NULL,
+            Pay_Rate INTEGER NOT NULL,
+            Status VARCHAR(50) NOT NULL,
+            notes VARCHAR(50) NOT NULL,
+            FOREIGN KEY (Job_ID) REFERENCES Jobs(Job_ID),
+            FOREIGN KEY (Recruiter_name) REFERENCES Recruiter(Name)
+        );
+        CREATE TABLE IF NOT EXISTS RESUMES(
+            Resume_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            NAME VARCHAR(50) NOT NULL,
+            EMAIL VARCHAR(50) NOT NULL,
+            PHONE_NUMBER VARCHAR(20) NOT NULL,
+            JOB_TITLE VARCHAR(50) NOT NULL,
+            CURRENT_JOB VARCHAR(50) NOT NULL,
+            SKILLS TEXT NOT NULL,
+            LOCATION VARCHAR(50) NOT NULL,
+            RESUME_SUMMARY TEXT NOT NULL,
+            RESUME_FILE BLOB,
+            FILE_NAME VARCHAR(100),
+            RESUME_TEXT TEXT
+        );
+    ''')
+
+
+def _add_resume_file_columns(conn):
+    # RESUMES tables created by older versions lack these columns.
+    columns = [info[1] for info in conn.execute("PRAGMA table_info(RESUMES)").fetchall()]
+    if "FILE_NAME" not in columns:
+        conn.execute("ALTER TABLE RESUMES ADD COLUMN FILE_NAME VARCHAR(100)")
+    if "RESUME_TEXT" not in columns:
+        conn.execute("ALTER TABLE RESUMES ADD COLUMN RESUME_TEXT TEXT")
+
+
+def _add_lookup_indexes(conn):
+    conn.executescript('''
+        CREATE INDEX IF NOT EXISTS idx_submissions_job_id ON Submissions(Job_ID);
+        CREATE INDEX IF NOT EXISTS idx_submissions_recruiter_name ON Submissions(Recruiter_name);
+        CREATE INDEX IF NOT EXISTS idx_submissions_client_name ON Submissions(Client_Name);
+        CREATE INDEX IF NOT EXISTS idx_resumes_email ON RESUMES(EMAIL);
+        CREATE INDEX IF NOT EXISTS idx_users_user_name ON USERS(user_name);
+    ''')
+    # Submissions.Recruiter_name references Recruiter(Name); SQLite can only
+    # enforce that foreign key when the parent column is unique.
+    duplicate = conn.execute("SELECT Name FROM Recruiter GROUP BY Name HAVING COUNT(*) > 1 LIMIT 1").fetchone()
+    if duplicate is None:
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_recruiter_name ON Recruiter(Name)")
+    else:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_recruiter_name ON Recruiter(Name)")
+
+
+# ------------------------------------------------------------------------------
+# Feature schemas (migrations 4-13)
+# ------------------------------------------------------------------------------
+# Each migration holds its own copy of the schema it creates, with the column
+# lists of the time written out here, so later changes to the feature modules
+# can never change what an already-numbered migration does. Only the trigram
+# backfill, which needs Python, calls into utils.fuzzy_index.
+_V4_FTS_COLUMNS = "NAME, JOB_TITLE, CURRENT_JOB, SKILLS, LOCATION, RESUME_SUMMARY, RESUME_TEXT"
+
+
+def _add_resume_search_index(conn):
+    new_values = ", ".join(f"new.{c.strip()}" for c in _V4_FTS_COLUMNS.split(","))
+    old_values = ", ".join(f"old.{c.strip()}" for c in _V4_FTS_COLUMNS.split(","))
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resumes_email_norm ON RESUMES(LOWER(TRIM(EMAIL)))")
+    if _exists(conn, "RESUMES_FTS"):
+        return
+    conn.executescript(f'''
+        BEGIN;
+        CREATE VIRTUAL TABLE RESUMES_FTS USING fts5(
+            {_V4_FTS_COLUMNS},
+            content='RESUMES',
+            content_rowid='Resume_ID',
+            tokenize="unicode61 tokenchars '+#'"
+        );
+
+        CREATE TRIGGER IF NOT EXISTS RESUMES_FTS_AI AFTER INSERT ON RESUMES BEGIN
+            INSERT INTO RESUMES_FTS(rowid, {_V4_FTS_COLUMNS})
+            VALUES (new.Resume_ID, {new_values});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS RESUMES_FTS_AD AFTER DELETE ON RESUMES BEGIN
+            INSERT INTO RESUMES_FTS(RESUMES_FTS, rowid, {_V4_FTS_COLUMNS})
+            VALUES ('delete', old.Resume_ID, {old_values});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS RESUMES_FTS_AU AFTER UPDATE OF {_V4_FTS_COLUMNS} ON RESUMES BEGIN
+            INSERT INTO RESUMES_FTS(RESUMES_FTS, rowid, {_V4_FTS_COLUMNS})
+            VALUES ('delete', old.Resume_ID, {old_values});
+            INSERT INTO RESUMES_FTS(rowid, {_V4_FTS_COLUMNS})
+            VALUES (new.Resume_ID, {new_values});
+        END;
+
+        INSERT INTO RESUMES_FTS(RESUMES_FTS) VALUES ('rebuild');
+        COMMIT;
+    ''')
+
+
+_V5_FACET_COLUMNS = {"location": "LOCATION", "job_title": "JOB_TITLE", "company": "CURRENT_JOB"}
+
+
+def _v5_increment(facet, value):
+    return f'''
+        INSERT INTO RESUME_FACETS (facet, value, count)
+        SELECT '{facet}', TRIM({value}), 1 WHERE COALESCE(TRIM({value}), '') <> ''
+        ON CONFLICT(facet, value) DO UPDATE SET count = count + 1;'''
+
+
+def _v5_decrement(facet, value):
+    return f'''
+        UPDATE RESUME_FACETS SET count = count - 1
+        WHERE facet = '{facet}' AND value = TRIM({value});'''
+
+
+def _add_fuzzy_index_and_facets(conn):
+    fuzzy_is_new = not _exists(conn, "FUZZY_TERMS")
+    conn.executescript('''
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS FUZZY_TERMS(
+            term_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            term TEXT NOT NULL,
+            trigram_count INTEGER NOT NULL,
+            UNIQUE(kind, term)
+        );
+        CREATE TABLE IF NOT EXISTS FUZZY_TRIGRAMS(
+            trigram TEXT NOT NULL,
+            term_id INTEGER NOT NULL,
+            PRIMARY KEY(trigram, term_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS FUZZY_TERM_RESUMES(
+            term_id INTEGER NOT NULL,
+            Resume_ID INTEGER NOT NULL,
+            PRIMARY KEY(term_id, Resume_ID)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_fuzzy_term_resumes_resume
+            ON FUZZY_TERM_RESUMES(Resume_ID);
+
+        CREATE TRIGGER IF NOT EXISTS RESUMES_FUZZY_AD AFTER DELETE ON RESUMES BEGIN
+            DELETE FROM FUZZY_TERM_RESUMES WHERE Resume_ID = old.Resume_ID;
+        END;
+        COMMIT;
+    ''')
+    if fuzzy_is_new:
+        from utils.fuzzy_index import rebuild_fuzzy_index
+        rebuild_fuzzy_index(conn)
+    if _exists(conn, "RESUME_FACETS"):
+        return
+
+    prune = "DELETE FROM RESUME_FACETS WHERE count <= 0;"
+    columns = ", ".join(_V5_FACET_COLUMNS.values())
+    on_insert = "".join(_v5_increment(f, f"new.{c}") for f, c in _V5_FACET_COLUMNS.items())
+    on_delete = "".join(_v5_decrement(f, f"old.{c}") for f, c in _V5_FACET_COLUMNS.items())
+    backfill = "".join(f'''
+        INSERT INTO RESUME_FACETS (facet, value, count)
+        SELECT '{f}', TRIM({c}), COUNT(*) FROM RESUMES
+        WHERE COALESCE(TRIM({c}), '') <> ''
+        GROUP BY TRIM({c}) COLLATE NOCASE;''' for f, c in _V5_FACET_COLUMNS.items())
+    conn.executescript(f'''
+        BEGIN;
+        CREATE TABLE RESUME_FACETS(
+            facet TEXT NOT NULL,
+            value TEXT NOT NULL COLLATE NOCASE,
+            count INTEGER NOT NULL,
+            PRIMARY KEY(facet, value)
+        );
+        CREATE INDEX idx_resume_facets_count ON RESUME_FACETS(facet, count DESC);
+
+        CREATE TRIGGER RESUMES_FACETS_AI AFTER INSERT ON RESUMES BEGIN
+            {on_insert}
+        END;
+
+        CREATE TRIGGER RESUMES_FACETS_AD AFTER DELETE ON RESUMES BEGIN
+            {on_delete}
+            {prune}
+        END;
+
+        CREATE TRIGGER RESUMES_FACETS_AU AFTER UPDATE OF {columns} ON RESUMES BEGIN
+            {on_delete}
+            {on_insert}
+            {prune}
+        END;
+
+        CREATE TRIGGER FUZZY_SKILL_FACETS_AI AFTER INSERT ON FUZZY_TERM_RESUMES
+        WHEN (SELECT kind FROM FUZZY_TERMS WHERE term_id = new.term_id) = 'skill' BEGIN
+            {_v5_increment("skill", "(SELECT term FROM FUZZY_TERMS WHERE term_id = new.term_id)")}
+        END;
+
+        CREATE TRIGGER FUZZY_SKILL_FACETS_AD AFTER DELETE ON FUZZY_TERM_RESUMES
+        WHEN (SELECT kind FROM FUZZY_TERMS WHERE term_id = old.term_id) = 'skill' BEGIN
+            {_v5_decrement("skill", "(SELECT term FROM FUZZY_TERMS WHERE term_id = old.term_id)")}
+            {prune}
+        END;
+
+        {backfill}
+        INSERT INTO RESUME_FACETS (facet, value, count)
+        SELECT 'skill', t.term, COUNT(*)
+        FROM FUZZY_TERM_RESUMES r JOIN FUZZY_TERMS t ON t.term_id = r.term_id
+        WHERE t.kind = 'skill'
+        GROUP BY t.term;
+        COMMIT;
+    ''')
+
+
+_V6_COUNTED_TABLES = ["Recruiter", "Jobs", "Submissions"]
+_V6_DAY = "COALESCE(date({row}.Data_of_Submission), {row}.Data_of_Submission)"
+
+
+def _v6_bucket(row):
+    return f"{_V6_DAY.format(row=row)}, {row}.Recruiter_name, {row}.Client_Name, {row}.Status"
+
+
+def _add_counters_and_rollups(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS TABLE_COUNTS (
+            table_name TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL
+        )
+    ''')
+    for table in _V6_COUNTED_TABLES:
+        if conn.execute("SELECT 1 FROM TABLE_COUNTS WHERE table_name = ?", (table,)).fetchone():
+            continue
+        conn.executescript(f'''
+            BEGIN;
+            CREATE TRIGGER IF NOT EXISTS COUNT_{table}_AI AFTER INSERT ON {table} BEGIN
+                UPDATE TABLE_COUNTS SET row_count = row_count + 1 WHERE table_name = '{table}';
+            END;
+            CREATE TRIGGER IF NOT EXISTS COUNT_{table}_AD AFTER DELETE ON {table} BEGIN
+                UPDATE TABLE_COUNTS SET row_count = row_count - 1 WHERE table_name = '{table}';
+            END;
+            INSERT INTO TABLE_COUNTS (table_name, row_count) SELECT '{table}', COUNT(*) FROM {table};
+            COMMIT;
+        ''')
+    if _exists(conn, "SUBMISSION_ROLLUPS"):
+        return
+
+    add_new = f'''
+            INSERT INTO SUBMISSION_ROLLUPS (day, recruiter, client, status, submissions)
+            VALUES ({_v6_bucket("new")}, 1)
+            ON CONFLICT(day, recruiter, client, status) DO UPDATE SET submissions = submissions + 1;'''
+    remove_old = f'''
+            UPDATE SUBMISSION_ROLLUPS SET submissions = submissions - 1
+            WHERE (day, recruiter, client, status) = ({_v6_bucket("old")});
+            DELETE FROM SUBMISSION_ROLLUPS WHERE submissions <= 0;'''
+    conn.executescript(f'''
+        BEGIN;
+        CREATE TABLE SUBMISSION_ROLLUPS (
+            day TEXT NOT NULL,
+            recruiter TEXT NOT NULL,
+            client TEXT NOT NULL,
+            status TEXT NOT NULL,
+            submissions INTEGER NOT NULL,
+            PRIMARY KEY (day, recruiter, client, status)
+        );
+
+        CREATE TRIGGER SUBMISSIONS_ROLLUP_AI AFTER INSERT ON Submissions BEGIN
+            {add_new}
+        END;
+
+        CREATE TRIGGER SUBMISSIONS_ROLLUP_AD AFTER DELETE ON Submissions BEGIN
+            {remove_old}
+        END;
+
+        CREATE TRIGGER SUBMISSIONS_ROLLUP_AU
+        AFTER UPDATE OF Data_of_Submission, Recruiter_name, Client_Name, Status ON Submissions BEGIN
+            {remove_old}
+            {add_new}
+        END;
+
+        INSERT INTO SUBMISSION_ROLLUPS (day, recruiter, client, status, submissions)
+        SELECT {_v6_bucket("Submissions")}, COUNT(*)
+        FROM Submissions
+        GROUP BY 1, 2, 3, 4;
+        COMMIT;
+    ''')
+
+
+# table: (key, search column, sortable columns)
+_V7_TABLE_VIEWS = {
+    "Jobs": ("Job_ID", "Description", ["Job_Details", "Job_Location", "Bill_Rate", "Client"]),
+    "Recruiter": ("Recruiter_id", "Name", ["Name", "Location", "Designation"]),
+    "Submissions": ("Submission_ID", "Client_Name",
+                    ["Data_of_Submission", "Client_Name", "Recruiter_name", "Status", "Job_ID"]),
+}
+
+
+def _add_table_view_indexes(conn):
+    for table, (key, search, sortable) in _V7_TABLE_VIEWS.items():
+        fts = f"{table.upper()}_SEARCH_FTS"
+        statements = [
+            f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_{search.lower()}_nocase ON {table}({search} COLLATE NOCASE);"
+        ]
+        statements += [
+            f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_{column.lower()} ON {table}({column});"
+            for column in sortable
+        ]
+        if not _exists(conn, fts):
+            statements.append(f'''
+                CREATE VIRTUAL TABLE {fts} USING fts5(
+                    {search}, content='{table}', content_rowid='{key}', tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS {fts}_AI AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, {search}) VALUES (new.{key}, new.{search});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {fts}_AD AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {search}) VALUES ('delete', old.{key}, old.{search});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {fts}_AU AFTER UPDATE OF {search} ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {search}) VALUES ('delete', old.{key}, old.{search});
+                    INSERT INTO {fts}(rowid, {search}) VALUES (new.{key}, new.{search});
+                END;
+                INSERT INTO {fts}({fts}) VALUES ('rebuild');
+            ''')
+        conn.executescript("BEGIN;" + "".join(statements) + "COMMIT;")
+
+
+def _add_app_settings(conn):
+    # Holds the key that signs login cookies (see utils.auth).
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS APP_SETTINGS (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
+    conn.execute(
+        "INSERT OR IGNORE INTO APP_SETTINGS (key, value) VALUES ('session_secret', ?)",
+        (secrets.token_hex(32),)
+    )
+
+
+def _add_job_matching(conn):
+    conn.executescript('''
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS JOB_EMBEDDINGS (
+            Job_ID INTEGER PRIMARY KEY,
+            model TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            embedding BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS RESUME_JOB_MATCHES (
+            Resume_ID INTEGER NOT NULL,
+            Job_ID INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (Resume_ID, Job_ID)
+        );
+        CREATE INDEX IF NOT EXISTS idx_resume_job_matches_job_id ON RESUME_JOB_MATCHES(Job_ID);
+
+        CREATE TRIGGER IF NOT EXISTS JOBS_MATCHES_AD AFTER DELETE ON Jobs BEGIN
+            DELETE FROM JOB_EMBEDDINGS WHERE Job_ID = old.Job_ID;
+            DELETE FROM RESUME_JOB_MATCHES WHERE Job_ID = old.Job_ID;
+        END;
+        CREATE TRIGGER IF NOT EXISTS RESUMES_MATCHES_AD AFTER DELETE ON RESUMES BEGIN
+            DELETE FROM RESUME_JOB_MATCHES WHERE Resume_ID = old.Resume_ID;
+        END;
+        COMMIT;
+    ''')
+
+
+def _add_near_duplicates(conn):
+    conn.executescript('''
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS RESUME_MINHASH (
+            Resume_ID INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS RESUME_LSH (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            Resume_ID INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, Resume_ID)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_resume_lsh_resume_id ON RESUME_LSH(Resume_ID);
+        CREATE TABLE IF NOT EXISTS DUPLICATE_DISMISSED (
+            resume_a INTEGER NOT NULL,
+            resume_b INTEGER NOT NULL,
+            PRIMARY KEY (resume_a, resume_b)
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS RESUMES_MINHASH_AD AFTER DELETE ON RESUMES BEGIN
+            DELETE FROM RESUME_MINHASH WHERE Resume_ID = old.Resume_ID;
+            DELETE FROM RESUME_LSH WHERE Resume_ID = old.Resume_ID;
+            DELETE FROM DUPLICATE_DISMISSED WHERE old.Resume_ID IN (resume_a, resume_b);
+        END;
+        COMMIT;
+    ''')
+
+
+def _add_ats_result_cache(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ATS_RESULT_CACHE (
+            cache_key TEXT PRIMARY KEY,
+            corpus_version INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            ranking TEXT NOT NULL
+        )
+    ''')
+
+
+def _add_embedding_store(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS EMBEDDING_STORE (
+            model TEXT PRIMARY KEY,
+            dims INTEGER NOT NULL,
+            generation INTEGER NOT NULL,
+            base_rows INTEGER NOT NULL,
+            log_rows INTEGER NOT NULL
+        )
+    ''')
+
+
+def _add_profiling(conn):
+    conn.executescript('''
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS SLOW_QUERIES (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            page TEXT NOT NULL,
+            query TEXT NOT NULL,
+            ms REAL NOT NULL,
+            rows INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_slow_queries_created_at ON SLOW_QUERIES(created_at);
+        CREATE TABLE IF NOT EXISTS PAGE_TIMINGS (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            page TEXT NOT NULL,
+            wall_ms REAL NOT NULL,
+            db_ms REAL NOT NULL,
+            model_ms REAL NOT NULL,
+            queries INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_page_timings_created_at ON PAGE_TIMINGS(created_at);
+        COMMIT;
+    ''')
+
+
+def _add_embedding_hashes(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS EMBEDDING_HASHES (
+            model TEXT NOT NULL,
+            Resume_ID INTEGER NOT NULL,
+            text_hash TEXT NOT NULL,
+            PRIMARY KEY (model, Resume_ID)
+        )
+    ''')
+    # Vectors stored so far were computed without a hash; take them as
+    # matching today's summaries rather than re-embedding every resume.
+    models = [row[0] for row in conn.execute("SELECT model FROM EMBEDDING_STORE")]
+    resumes = conn.execute("SELECT Resume_ID, RESUME_SUMMARY FROM RESUMES").fetchall()
+    for model in models:
+        conn.executemany(
+            "INSERT OR IGNORE INTO EMBEDDING_HASHES (model, Resume_ID, text_hash) VALUES (?, ?, ?)",
+            [(model, resume_id, hashlib.sha1((summary or "").encode("utf-8")).hexdigest())
+             for resume_id, summary in resumes]
+        )
+
+
+def _add_matched_jobs(conn):
+    # Empty at first: matches stored so far only scored each job against the
+    # resumes uploaded after it, so every job is merged in once.
+    conn.executescript('''
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS MATCHED_JOBS (
+            Job_ID INTEGER NOT NULL,
+            model TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            PRIMARY KEY (Job_ID, model)
+        );
+        CREATE TRIGGER IF NOT EXISTS JOBS_MATCHED_AD AFTER DELETE ON Jobs BEGIN
+            DELETE FROM MATCHED_JOBS WHERE Job_ID = old.Job_ID;
+        END;
+        COMMIT;
+    ''')
+
+
+# (version, description, function) in the order they must be applied
+MIGRATIONS = [
+    (1, "base tables", _create_base_tables),
+    (2, "resume file and text columns", _add_resume_file_columns),
+    (3, "lookup and join indexes", _add_lookup_indexes),
+    (4, "resume full-text and email indexes", _add_resume_search_index),
+    (5, "trigram index and facet counts", _add_fuzzy_index_and_facets),
+    (6, "row counters and submission rollups", _add_counters_and_rollups),
+    (7, "table view search and sort indexes", _add_table_view_indexes),
+    (8, "app settings and session signing key", _add_app_settings),
+    (9, "job embeddings and resume-to-job matches", _add_job_matching),
+    (10, "resume MinHash signatures and LSH buckets", _add_near_duplicates),
+    (11, "stored ATS rankings", _add_ats_result_cache),
+    (12, "shared resume embedding store", _add_embedding_store),
+    (13, "slow-query log and page timings", _add_profiling),
+    (14, "text hashes of stored resume embeddings", _add_embedding_hashes),
+    (15, "jobs merged into the resume-to-job matches", _add_matched_jobs),
+]
+
+# Lookups that must be answered from an index: (query, index expected in the plan)
+INDEXED_QUERIES = [
+    ("SELECT * FROM Submissions WHERE Job_ID = 1", "idx_submissions_job_id"),
+    ("SELECT * FROM Submissions WHERE Recruiter_name = 'x'", "idx_submissions_recruiter_name"),
+    ("SELECT * FROM Submissions WHERE Client_Name = 'x'", "idx_submissions_client_name"),
+    ("SELECT Resume_ID FROM RESUMES WHERE EMAIL = 'x'", "idx_resumes_email"),
+    ("SELECT Resume_ID FROM RESUMES WHERE LOWER(TRIM(EMAIL)) = 'x'", "idx_resumes_email_norm"),
+    ("SELECT * FROM USERS WHERE user_name = 'x'", "idx_users_user_name"),
+    ("SELECT * FROM Recruiter WHERE Name = 'x'", "idx_recruiter_name"),
+    ("SELECT s.*, j.Client FROM Submissions s JOIN Jobs j ON j.Job_ID = s.Job_ID WHERE j.Job_ID = 1",
+     "idx_submissions_job_id"),
+]
+
+_lock = threading.Lock()
+_migrated_databases = set()
+_default_migrated = False  # set once the shared connection's database is current
+
+
+def schema_version(conn):
+    """Highest applied migration version (0 for a fresh database)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATIONS (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    ''')
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM SCHEMA_MIGRATIONS").fetchone()[0]
+
+
+def run_migrations(conn=None):
+    """Apply pending migrations once per process. Returns the versions applied now."""
+    global _default_migrated
+    if conn is None and _default_migrated:
+        return []  # the per-rerun call from app.py costs no database work
+    uses_default = conn is None
+    conn = conn or get_connection()
+    db_name = conn.execute("PRAGMA database_list").fetchone()[2]
+    if db_name and db_name in _migrated_databases:
+        _default_migrated = _default_migrated or uses_default
+        return []
+
+    applied = []
+    with _lock:
+        current = schema_version(conn)
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            migrate(conn)
+            conn.execute(
+                "INSERT INTO SCHEMA_MIGRATIONS (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now().isoformat(timespec="seconds"))
+            )
+            conn.commit()
+            applied.append(version)
+
+        if foreign_keys_usable(conn):
+            enable_foreign_keys(conn)
+        for query, plan in verify_indexes(conn):
+            logger.warning("Lookup does not use its index: %s (plan: %s)", query, plan)
+        if db_name:
+            _migrated_databases.add(db_name)
+        if uses_default:
+            _default_migrated = True
+    return applied
+
+
+def foreign_keys_usable(conn):
+    """
+    True when every declared foreign key points at a unique parent key and
+    the existing rows satisfy them, so PRAGMA foreign_keys can be turned on
+    without breaking writes.
+    """
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()]
+    for table in tables:
+        for fk in conn.execute(f"PRAGMA foreign_key_list('{table}')").fetchall():
+            parent, parent_column = fk[2], fk[4]
+            if parent_column is None:
+                continue  # references the parent's primary key
+            pk = [c[1] for c in conn.execute(f"PRAGMA table_info('{parent}')").fetchall() if c[5]]
+            unique = pk == [parent_column] or any(
+                index[2] and [c[2] for c in conn.execute(f"PRAGMA index_info('{index[1]}')").fetchall()] == [parent_column]
+                for index in conn.execute(f"PRAGMA index_list('{parent}')").fetchall()
+            )
+            if not unique:
+                return False
+    try:
+        return not conn.execute("PRAGMA foreign_key_check").fetchall()
+    except sqlite3.DatabaseError:
+        return False
+
+
+def verify_indexes(conn=None):
+    """
+    Check with EXPLAIN QUERY PLAN that every lookup in INDEXED_QUERIES uses
+    its index. Returns a list of (query, plan) pairs that do not.
+    """
+    conn = conn or get_connection()
+    failures = []
+    for query, index in INDEXED_QUERIES:
+        plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall())
+        if index not in plan:
+            failures.append((query, plan))
+    return failures
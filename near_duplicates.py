@@ -0,0 +1,270 @@
+import hashlib
+import re
+import threading
+import zlib
+import streamlit as st
+import numpy as np
+import pandas as pd
+from utils.db import bump_version, get_connection, table_versions
+from utils.fuzzy_index import index_resume
+from utils.job_matching import match_resumes
+
+# ------------------------------------------------------------------------------
+# Near-duplicate resumes: MinHash signatures and LSH buckets
+# ------------------------------------------------------------------------------
+# Each resume's text is cut into overlapping word shingles and summarized by
+# a NUM_PERM-value MinHash signature (stored as 32-bit values, 512 bytes a
+# resume). Two signatures agree in a position with probability equal to the
+# Jaccard similarity of the shingle sets. The signature is split into BANDS
+# bands of ROWS values; resumes that share any band land in the same LSH
+# bucket and become candidates. Only candidates are compared, so finding
+# duplicates costs roughly the number of resumes plus the number of
+# colliding pairs instead of every pair. With 16 bands of 8 rows, pairs
+# above ~0.7 similarity are very likely to collide and pairs below ~0.4
+# almost never do; candidates are then kept only if their estimated
+# similarity reaches SIMILARITY_THRESHOLD.
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+SIMILARITY_THRESHOLD = 0.8
+BACKFILL_BATCH = 500
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(20240501)  # fixed seed: signatures must be stable across restarts
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_duplicates = None  # (data versions, threshold, DataFrame of verified pairs)
+_duplicates_lock = threading.Lock()
+
+
+def shingles(text):
+    """Hashed SHINGLE_WORDS-word shingles of the lower-cased text."""
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) < SHINGLE_WORDS:
+        words = words + [""] * (SHINGLE_WORDS - len(words))
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(text):
+    """NUM_PERM-value MinHash signature of the text (uint32)."""
+    hashes = np.fromiter(shingles(text), dtype=np.uint64)
+    # (a * h + b) mod p with h, a, b < 2^32 never overflows 64 bits.
+    values = (np.outer(hashes, _PERM_A) + _PERM_B) % np.uint64(_MERSENNE_PRIME)
+    return (values.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def lsh_buckets(signature):
+    """One bucket id per band (signed 64-bit, so SQLite stores it as an INTEGER)."""
+    return [
+        int.from_bytes(hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest(),
+                       "big", signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def resume_text(text, summary, skills, name=""):
+    """Text a resume is fingerprinted from: the extracted file text when stored."""
+    return text if text and text.strip() else " ".join(filter(None, [name, summary, skills]))
+
+
+def index_signature(conn, resume_id, text):
+    """
+    (Re)compute one resume's signature and buckets. Call inside the
+    transaction that writes the RESUMES row; does not commit.
+    """
+    signature = minhash(text)
+    conn.execute(
+        "INSERT OR REPLACE INTO RESUME_MINHASH (Resume_ID, signature) VALUES (?, ?)",
+        (resume_id, signature.tobytes())
+    )
+    conn.execute("DELETE FROM RESUME_LSH WHERE Resume_ID = ?", (resume_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO RESUME_LSH (band, bucket, Resume_ID) VALUES (?, ?, ?)",
+        [(band, bucket, resume_id) for band, bucket in enumerate(lsh_buckets(signature))]
+    )
+
+
+def backfill_signatures(conn, batch_size=BACKFILL_BATCH, progress=None):
+    """
+    Fingerprint every resume that has no signature yet, batch_size resumes
+    per transaction. Returns the number of resumes fingerprinted.
+    """
+    missing = [row[0] for row in conn.execute('''
+        SELECT r.Resume_ID FROM RESUMES r
+        LEFT JOIN RESUME_MINHASH m ON m.Resume_ID = r.Resume_ID
+        WHERE m.Resume_ID IS NULL
+    ''')]
+    for start in range(0, len(missing), batch_size):
+        ids = missing[start:start + batch_size]
+        marks = ", ".join("?" for _ in ids)
+        rows = conn.execute(
+            f"SELECT Resume_ID, RESUME_TEXT, RESUME_SUMMARY, SKILLS, NAME FROM RESUMES WHERE Resume_ID IN ({marks})", ids
+        ).fetchall()
+        for resume_id, text, summary, skills, name in rows:
+            index_signature(conn, resume_id, resume_text(text, summary, skills, name))
+        # Only fingerprints changed: RESUMES caches and stored rankings stay valid.
+        bump_version(conn, "RESUME_MINHASH")
+        conn.commit()
+        if progress:
+            progress(min(start + batch_size, len(missing)), len(missing))
+    return len(missing)
+
+
+def _signatures(conn, resume_ids):
+    ids = list(resume_ids)
+    found = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        marks = ", ".join("?" for _ in chunk)
+        found.update(
+            (resume_id, np.frombuffer(blob, dtype=np.uint32))
+            for resume_id, blob in conn.execute(
+                f"SELECT Resume_ID, signature FROM RESUME_MINHASH WHERE Resume_ID IN ({marks})", chunk
+            )
+        )
+    return found
+
+
+def candidate_pairs(conn, resume_ids=None):
+    """(resume_a, resume_b) pairs sharing an LSH bucket, optionally involving the given resumes."""
+    query = '''
+        SELECT DISTINCT a.Resume_ID, b.Resume_ID
+        FROM RESUME_LSH a
+        JOIN RESUME_LSH b ON b.band = a.band AND b.bucket = a.bucket AND b.Resume_ID > a.Resume_ID
+    '''
+    if resume_ids is None:
+        return conn.execute(query).fetchall()
+    pairs = set()
+    ids = [int(resume_id) for resume_id in resume_ids]
+    for start in range(0, len(ids), 250):
+        chunk = ids[start:start + 250]
+        marks = ", ".join("?" for _ in chunk)
+        pairs.update(conn.execute(
+            query + f" WHERE a.Resume_ID IN ({marks}) OR b.Resume_ID IN ({marks})", chunk + chunk
+        ).fetchall())
+    return sorted(pairs)
+
+
+def verified_pairs(conn, pairs, threshold=SIMILARITY_THRESHOLD):
+    """Candidate pairs whose estimated similarity reaches the threshold, minus dismissed ones."""
+    dismissed = set(conn.execute("SELECT resume_a, resume_b FROM DUPLICATE_DISMISSED").fetchall())
+    pairs = [pair for pair in pairs if pair not in dismissed]
+    signatures = _signatures(conn, {resume_id for pair in pairs for resume_id in pair})
+    rows = []
+    for a, b in pairs:
+        if a in signatures and b in signatures:
+            similarity = float(np.mean(signatures[a] == signatures[b]))
+            if similarity >= threshold:
+                rows.append((a, b, round(similarity, 3)))
+    return pd.DataFrame(rows, columns=["resume_a", "resume_b", "similarity"]).sort_values(
+        "similarity", ascending=False, ignore_index=True
+    )
+
+
+def find_duplicates(threshold=SIMILARITY_THRESHOLD):
+    """All likely duplicate pairs in the corpus, cached until RESUMES or the dismissals change."""
+    global _duplicates
+    versions = table_versions("RESUMES", "RESUME_MINHASH", "DUPLICATE_DISMISSED")
+    with _duplicates_lock:
+        if _duplicates and _duplicates[:2] == (versions, threshold):
+            return _duplicates[2]
+    conn = get_connection()
+    df = verified_pairs(conn, candidate_pairs(conn), threshold)
+    with _duplicates_lock:
+        _duplicates = (versions, threshold, df)
+    return df
+
+
+def duplicates_of(conn, resume_ids, threshold=SIMILARITY_THRESHOLD):
+    """Likely duplicate pairs involving the given (e.g. just uploaded) resumes."""
+    return verified_pairs(conn, candidate_pairs(conn, resume_ids), threshold)
+
+
+def merge_resumes(conn, keep_id, drop_id):
+    """
+    Keep one resume of a duplicate pair and delete the other. Empty fields
+    of the kept resume are filled from the dropped one first; if that
+    changes its summary or skills, it is re-embedded and re-matched to jobs.
+    """
+    columns = ["NAME", "PHONE_NUMBER", "JOB_TITLE", "CURRENT_JOB", "SKILLS", "LOCATION",
+               "RESUME_SUMMARY", "RESUME_FILE", "FILE_NAME", "RESUME_TEXT"]
+    placeholder = "('', 'Not Specified', 'Null')"
+    updates = ", ".join(
+        f"{column} = CASE WHEN {column} IS NULL OR {column} IN {placeholder} "
+        f"THEN (SELECT {column} FROM RESUMES WHERE Resume_ID = :drop) ELSE {column} END"
+        for column in columns
+    )
+    select = "SELECT NAME, CURRENT_JOB, SKILLS, RESUME_TEXT, RESUME_SUMMARY FROM RESUMES WHERE Resume_ID = ?"
+    before = conn.execute(select, (keep_id,)).fetchone()
+    conn.execute(f"UPDATE RESUMES SET {updates} WHERE Resume_ID = :keep", {"keep": keep_id, "drop": drop_id})
+    conn.execute("DELETE FROM RESUMES WHERE Resume_ID = ?", (drop_id,))
+    name, company, skills, text, summary = conn.execute(select, (keep_id,)).fetchone()
+    index_resume(conn, keep_id, name, company, skills)
+    index_signature(conn, keep_id, resume_text(text, summary, skills, name))
+    bump_version(conn, "RESUMES", "RESUME_MINHASH")
+    conn.commit()
+    if (before[2], before[4]) != (skills, summary):
+        match_resumes(conn, [keep_id])
+
+
+def dismiss_pair(conn, resume_a, resume_b):
+    """Remember that two resumes are different people."""
+    conn.execute(
+        "INSERT OR IGNORE INTO DUPLICATE_DISMISSED (resume_a, resume_b) VALUES (?, ?)",
+        (min(resume_a, resume_b), max(resume_a, resume_b))
+    )
+    bump_version(conn, "DUPLICATE_DISMISSED")
+    conn.commit()
+
+
+def _resume_details(conn, resume_ids):
+    marks = ", ".join("?" for _ in resume_ids)
+    return pd.read_sql_query(f'''
+        SELECT Resume_ID, NAME, EMAIL, PHONE_NUMBER, JOB_TITLE, CURRENT_JOB, SKILLS, LOCATION, FILE_NAME
+        FROM RESUMES WHERE Resume_ID IN ({marks})
+    ''', conn, params=list(resume_ids)).set_index("Resume_ID")
+
+
+# Review and merge screen
+def duplicates_page():
+    st.header("Duplicate Resumes")
+    conn = get_connection()
+
+    # Batch mode: fingerprint resumes stored before signatures existed.
+    if st.button("Scan existing resumes", key="duplicates_scan"):
+        bar = st.progress(0.0)
+        done = backfill_signatures(conn, progress=lambda n, total: bar.progress(n / total))
+        bar.empty()
+        st.success(f"Fingerprinted {done} resumes." if done else "All resumes are already fingerprinted.")
+
+    threshold = st.slider("Minimum similarity:", 0.5, 1.0, SIMILARITY_THRESHOLD, 0.05, key="duplicates_threshold")
+    pairs = find_duplicates(threshold)
+    if pairs.empty:
+        st.info("No likely duplicates found.")
+        return
+    st.write(f"Likely duplicate pairs: {len(pairs)}")
+
+    page = pairs.head(20)  # review a few pairs at a time
+    details = _resume_details(conn, set(page["resume_a"]) | set(page["resume_b"]))
+    for pair in page.itertuples(index=False):
+        a, b = int(pair.resume_a), int(pair.resume_b)
+        if a not in details.index or b not in details.index:
+            continue
+        left, right = details.loc[a], details.loc[b]
+        with st.expander(f"{left['NAME']} / {right['NAME']} ({pair.similarity:.0%} similar)"):
+            st.dataframe(pd.DataFrame({f"#{a}": left, f"#{b}": right}), use_container_width=True)
+            col1, col2, col3 = st.columns(3)
+            if col1.button(f"Keep #{a}", key=f"keep_{a}_{b}"):
+                merge_resumes(conn, a, b)
+                st.rerun()
+            if col2.button(f"Keep #{b}", key=f"keep_{b}_{a}"):
+                merge_resumes(conn, b, a)
+                st.rerun()
+            if col3.button("Not duplicates", key=f"dismiss_{a}_{b}"):
+                dismiss_pair(conn, a, b)
+                st.rerun()
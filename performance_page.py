@@ -0,0 +1,91 @@
+import os
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+from utils.db import fetch_data_from_db, get_connection
+from utils.profiling import PROFILE, SLOW_QUERY_MS, flush
+
+# ------------------------------------------------------------------------------
+# Admin tab: page latency and slow queries recorded by utils.profiling
+# ------------------------------------------------------------------------------
+# Shown only to the users listed in ATS_ADMIN_USERS (comma-separated); the
+# slow-query log holds query text, so nobody sees it when that is not set.
+ADMIN_USERS = {name.strip() for name in os.getenv("ATS_ADMIN_USERS", "").split(",") if name.strip()}
+WINDOWS = {"Last hour": 1 / 24, "Last 24 hours": 1, "Last 7 days": 7}
+TOP_QUERIES = 20
+
+
+def can_view_performance(user_name):
+    return user_name in ADMIN_USERS
+
+
+def page_latency(since):
+    """Rerun count, wall-time percentiles and the DB / model / other split per page."""
+    df = fetch_data_from_db(
+        "SELECT page, wall_ms, db_ms, model_ms, queries FROM PAGE_TIMINGS WHERE created_at >= ?", params=(since,)
+    )
+    if df.empty:
+        return df
+    grouped = df.groupby("page")
+    means = grouped[["wall_ms", "db_ms", "model_ms", "queries"]].mean()
+    summary = pd.DataFrame({
+        "Reruns": grouped.size(),
+        "p50 ms": grouped["wall_ms"].quantile(0.5),
+        "p95 ms": grouped["wall_ms"].quantile(0.95),
+        "p99 ms": grouped["wall_ms"].quantile(0.99),
+        "Avg DB ms": means["db_ms"],
+        "Avg model ms": means["model_ms"],
+        "Avg other ms": (means["wall_ms"] - means["db_ms"] - means["model_ms"]).clip(lower=0),
+        "Avg queries": means["queries"],
+    }).round(1)
+    return summary.sort_values("p95 ms", ascending=False).rename_axis("Page").reset_index()
+
+
+def slow_query_offenders(since, limit=TOP_QUERIES):
+    """Slow queries grouped by text, the most total time first."""
+    return fetch_data_from_db('''
+        SELECT query AS Query, COUNT(*) AS Count, ROUND(SUM(ms)) AS "Total ms", ROUND(AVG(ms), 1) AS "Avg ms",
+               ROUND(MAX(ms), 1) AS "Max ms", ROUND(AVG(rows)) AS "Avg rows",
+               GROUP_CONCAT(DISTINCT page) AS Pages, MAX(created_at) AS "Last seen"
+        FROM SLOW_QUERIES
+        WHERE created_at >= ?
+        GROUP BY query
+        ORDER BY SUM(ms) DESC
+        LIMIT ?
+    ''', params=(since, limit))
+
+
+def performance_page():
+    st.title("⏱️ Performance")
+    if not can_view_performance(st.session_state.get("user_name")):
+        st.error("Only the users listed in ATS_ADMIN_USERS can see this page.")
+        return
+    if not PROFILE:
+        st.info("Profiling is switched off (ATS_PROFILE=0).")
+        return
+    flush()  # include this process's latest reruns
+
+    window = st.selectbox("Period:", list(WINDOWS), index=1, key="performance_window")
+    since = (datetime.now() - timedelta(days=WINDOWS[window])).isoformat(timespec="seconds")
+
+    st.subheader("Page latency")
+    st.caption("Wall time of each rerun. Other = Python and Streamlit rendering.")
+    latency = page_latency(since)
+    if latency.empty:
+        st.info("No reruns recorded in this period.")
+    else:
+        st.dataframe(latency, use_container_width=True, hide_index=True)
+
+    st.subheader(f"Slowest queries (≥ {SLOW_QUERY_MS:.0f} ms)")
+    offenders = slow_query_offenders(since)
+    if offenders.empty:
+        st.info("No slow queries in this period.")
+    else:
+        st.dataframe(offenders, use_container_width=True, hide_index=True)
+
+    if st.button("Clear profiling data", key="performance_clear"):
+        conn = get_connection()
+        conn.execute("DELETE FROM PAGE_TIMINGS")
+        conn.execute("DELETE FROM SLOW_QUERIES")
+        conn.commit()
+        st.rerun()
@@ -0,0 +1,158 @@
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from utils.db import get_connection, table_versions
+from utils.embedding_store import append_embeddings, stale_embeddings
+
+# ------------------------------------------------------------------------------
+# Background pre-scoring of saved jobs
+# ------------------------------------------------------------------------------
+# Any resume write retires the stored ATS rankings (see ATS_Score), so the
+# first "Analyze Resumes" after an upload used to pay for the whole pipeline.
+# This scheduler keeps them warm instead. Every few seconds, while nobody
+# has run an analysis for IDLE_SECONDS, it does one micro-batch:
+#   1. embed up to EMBED_BATCH resumes missing from the embedding store or
+#      whose summary changed since they were embedded, or
+#   2. merge new or edited jobs into every resume's best-fit jobs
+#      (see utils.job_matching.rematch_changed_jobs), or
+#   3. rank the newest job whose ranking is missing for the current resumes
+#      (new, edited or invalidated by new resumes) and store it.
+# Both are incremental: stored embeddings and cross-encoder pair scores are
+# reused, so a refresh after an upload only scores what is new. The ATS tab
+# then opens a saved job with its pre-scored results and their timestamp.
+#
+# Run it as a separate worker with "python -m utils.prescore". It can also
+# run as a daemon thread in the app (ATS_PRESCORE=1), but then every
+# Streamlit process that wins the lease loads the embedding and
+# cross-encoder models, so it is off by default. A lease row in
+# APP_SETTINGS makes sure only one process does the work at a time.
+PRESCORE = os.getenv("ATS_PRESCORE", "0") == "1"
+PRESCORE_INTERVAL = 30   # seconds between checks when everything is up to date
+BATCH_PAUSE = 1          # seconds between micro-batches while catching up
+IDLE_SECONDS = 20        # wait this long after the last interactive analysis
+EMBED_BATCH = 64         # resumes embedded per micro-batch
+LEASE_SECONDS = 120      # a scheduler that stops renewing its lease is taken over
+
+logger = logging.getLogger(__name__)
+_owner = f"{socket.gethostname()}:{os.getpid()}"
+_thread_lock = threading.Lock()
+_thread = None
+
+
+def note_activity():
+    """Record that someone is using the ATS, so the scheduler stays out of the way."""
+    conn = get_connection()
+    conn.execute(
+        "INSERT OR REPLACE INTO APP_SETTINGS (key, value) VALUES ('ats_last_activity', ?)", (str(time.time()),)
+    )
+    conn.commit()
+
+
+def _idle(conn):
+    row = conn.execute("SELECT value FROM APP_SETTINGS WHERE key = 'ats_last_activity'").fetchone()
+    return row is None or time.time() - float(row[0]) >= IDLE_SECONDS
+
+
+def _acquire_lease(conn):
+    """Take or renew the scheduler lease. Returns False if another process holds it."""
+    now = time.time()
+    conn.execute("INSERT OR IGNORE INTO APP_SETTINGS (key, value) VALUES ('prescore_lease', '|0')")
+    cur = conn.execute('''
+        UPDATE APP_SETTINGS SET value = ?
+        WHERE key = 'prescore_lease'
+          AND (substr(value, 1, instr(value, '|') - 1) = ?
+               OR CAST(substr(value, instr(value, '|') + 1) AS REAL) < ?)
+    ''', (f"{_owner}|{now + LEASE_SECONDS}", _owner, now))
+    conn.commit()
+    return cur.rowcount == 1
+
+
+def embed_stale(conn, limit=EMBED_BATCH):
+    """
+    Embed up to limit resumes that are not in the embedding store or whose
+    summary changed since. Returns how many.
+    """
+    from utils.ATS_Score import BATCH_SIZE, EMBEDDING_MODEL, fetch_resumes_from_db, get_analyzer
+    df = fetch_resumes_from_db()
+    summaries = df["RESUME_SUMMARY"].fillna("").tolist()
+    stale = set(stale_embeddings(conn, EMBEDDING_MODEL, df["Resume_ID"].tolist(), summaries)[:limit])
+    if not stale:
+        return 0
+    batch = df[df["Resume_ID"].isin(stale)]
+    texts = batch["RESUME_SUMMARY"].fillna("").tolist()
+    vectors = get_analyzer().model.encode(
+        texts, batch_size=BATCH_SIZE, convert_to_numpy=True, show_progress_bar=False
+    )
+    append_embeddings(conn, EMBEDDING_MODEL, batch["Resume_ID"].tolist(), vectors, texts)
+    conn.commit()
+    return len(batch)
+
+
+def stale_jobs(conn, rerank=True):
+    """(Job_ID, Description) of jobs with no stored ranking for the current resumes, newest first."""
+    from utils.ATS_Score import job_skill_terms, result_cache_key
+    corpus_version = table_versions("RESUMES")[0]
+    stored = {row[0] for row in conn.execute(
+        "SELECT cache_key FROM ATS_RESULT_CACHE WHERE corpus_version = ?", (corpus_version,)
+    )}
+    jobs = conn.execute("SELECT Job_ID, Description FROM Jobs ORDER BY Job_ID DESC").fetchall()
+    return [(job_id, description) for job_id, description in jobs
+            if job_skill_terms(description) and result_cache_key(description, rerank) not in stored]
+
+
+def run_once():
+    """One micro-batch of pre-scoring. Returns True if there was work to do."""
+    from utils.ATS_Score import fetch_resumes_from_db, rank_resumes
+    from utils.job_matching import rematch_changed_jobs
+    conn = get_connection()
+    if not _idle(conn) or not _acquire_lease(conn) or fetch_resumes_from_db().empty:
+        return False
+    embedded = embed_stale(conn)
+    if embedded:
+        logger.info("Pre-scoring: embedded %d resumes", embedded)
+        return True
+    rematched = rematch_changed_jobs(conn)
+    if rematched:
+        logger.info("Pre-scoring: merged %d new or edited jobs into the resume matches", rematched)
+        return True
+    jobs = stale_jobs(conn)
+    if not jobs:
+        return False
+    job_id, description = jobs[0]
+    started = time.perf_counter()
+    rank_resumes(description, 0)
+    logger.info("Pre-scoring: ranked job %s in %.1fs (%d left)", job_id, time.perf_counter() - started, len(jobs) - 1)
+    return True
+
+
+def run_forever(stop=None):
+    """Run micro-batches until stop (a threading.Event) is set."""
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            worked = run_once()
+        except Exception:
+            # A failed batch is retried on the next round.
+            logger.exception("Pre-scoring batch failed")
+            worked = False
+        stop.wait(BATCH_PAUSE if worked else PRESCORE_INTERVAL)
+
+
+def start_in_background():
+    """Start the scheduler thread once per process (no-op unless ATS_PRESCORE=1)."""
+    global _thread
+    if not PRESCORE:
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=run_forever, name="ats-prescore", daemon=True)
+            _thread.start()
+
+
+# python -m utils.prescore  -> run the scheduler as a separate worker process
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    run_forever()
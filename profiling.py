@@ -0,0 +1,232 @@
+import atexit
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# ------------------------------------------------------------------------------
+# Query and rerun profiling
+# ------------------------------------------------------------------------------
+# utils.db opens its connections as ProfiledConnection, so every query made
+# through them (conn.execute, cursors, pd.read_sql_query) is timed, with its
+# row count, while a page is being profiled. app.py runs each page inside
+# profile_page(), which records the rerun's wall time, the time spent in
+# the database and in model calls (marked with profile_section("model")),
+# and the number of queries. The rest is Python and Streamlit rendering.
+#
+# Timings are buffered in memory and written every FLUSH_SECONDS on a
+# connection of their own, so profiling never commits a page's open
+# transaction. Queries that took SLOW_QUERY_MS or more go to SLOW_QUERIES
+# (text only, never parameters); every rerun goes to PAGE_TIMINGS. Both keep
+# RETENTION_DAYS of history. Queries outside a profiled page (background
+# threads, the API) are not timed. Set ATS_PROFILE=0 to switch it all off.
+PROFILE = os.getenv("ATS_PROFILE", "1") == "1"
+SLOW_QUERY_MS = float(os.getenv("ATS_SLOW_QUERY_MS", "200"))
+FLUSH_SECONDS = 30
+FLUSH_ROWS = 500         # flush early once this many reruns are buffered
+RETENTION_DAYS = 7
+MAX_QUERY_TEXT = 2000
+
+logger = logging.getLogger(__name__)
+_local = threading.local()  # .scope: the page being profiled on this thread
+_pending = {"timings": [], "slow": []}
+_pending_lock = threading.Lock()  # held only to swap the buffers
+_write_lock = threading.Lock()    # serializes writes on _log_conn
+_last_flush = time.monotonic()
+_log_conn = None
+
+
+# ------------------------------------------------------------------------------
+# Instrumented connection
+# ------------------------------------------------------------------------------
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that adds its execute and fetch time and rows to the current page's record."""
+    _record = None
+
+    def _begin(self, sql):
+        scope = getattr(_local, "scope", None)
+        self._record = None if scope is None else {"sql": sql, "seconds": 0.0, "rows": 0}
+        if self._record is not None:
+            scope["queries"].append(self._record)
+        return self._record
+
+    def _add(self, started, rows):
+        self._record["seconds"] += time.perf_counter() - started
+        self._record["rows"] += rows
+
+    def execute(self, sql, parameters=()):
+        if self._begin(sql) is None:
+            return super().execute(sql, parameters)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._add(started, max(self.rowcount, 0))
+
+    def executemany(self, sql, seq_of_parameters):
+        if self._begin(sql) is None:
+            return super().executemany(sql, seq_of_parameters)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._add(started, max(self.rowcount, 0))
+
+    def executescript(self, script):
+        if self._begin(script) is None:
+            return super().executescript(script)
+        started = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            self._add(started, 0)
+
+    def fetchone(self):
+        if self._record is None:
+            return super().fetchone()
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add(started, row is not None)
+        return row
+
+    def fetchmany(self, *args):
+        if self._record is None:
+            return super().fetchmany(*args)
+        started = time.perf_counter()
+        rows = super().fetchmany(*args)
+        self._add(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        if self._record is None:
+            return super().fetchall()
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add(started, len(rows))
+        return rows
+
+    def __next__(self):
+        if self._record is None:
+            return super().__next__()
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        finally:
+            self._record["seconds"] += time.perf_counter() - started
+        self._record["rows"] += 1
+        return row
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """sqlite3 connection whose queries all go through ProfiledCursor."""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    # The built-in shortcuts do not call cursor(), so route them through it.
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+# ------------------------------------------------------------------------------
+# Page and section timing
+# ------------------------------------------------------------------------------
+@contextmanager
+def profile_page(page):
+    """Profile one rerun of a page (no-op when nested or switched off)."""
+    if not PROFILE or getattr(_local, "scope", None) is not None:
+        yield
+        return
+    scope = {"queries": [], "sections": {}}
+    _local.scope = scope
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Also reached when Streamlit stops the run for a rerun.
+        _local.scope = None
+        _finish(page, scope, time.perf_counter() - started)
+
+
+@contextmanager
+def profile_section(kind):
+    """Attribute the enclosed time (e.g. a model call) to `kind` in the current page's record."""
+    scope = getattr(_local, "scope", None)
+    if scope is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        scope["sections"][kind] = scope["sections"].get(kind, 0.0) + time.perf_counter() - started
+
+
+def normalize_query(sql):
+    """Query text with whitespace collapsed and IN lists shortened, so repeats group together."""
+    sql = " ".join(sql.split())
+    return re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?, ...)", sql)[:MAX_QUERY_TEXT]
+
+
+def _finish(page, scope, seconds):
+    now = datetime.now().isoformat(timespec="seconds")
+    queries = scope["queries"]
+    timing = (now, page, seconds * 1000, sum(q["seconds"] for q in queries) * 1000,
+              scope["sections"].get("model", 0.0) * 1000, len(queries))
+    slow = [(now, page, normalize_query(q["sql"]), q["seconds"] * 1000, q["rows"])
+            for q in queries if q["seconds"] * 1000 >= SLOW_QUERY_MS]
+    with _pending_lock:
+        _pending["timings"].append(timing)
+        _pending["slow"].extend(slow)
+        due = len(_pending["timings"]) >= FLUSH_ROWS or time.monotonic() - _last_flush >= FLUSH_SECONDS
+    if due:
+        flush()
+
+
+def _log_connection():
+    global _log_conn
+    if _log_conn is None:
+        from utils.db import BUSY_TIMEOUT_MS, DB_PATH
+        _log_conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    return _log_conn
+
+
+def flush():
+    """Write buffered timings and slow queries, and drop history older than RETENTION_DAYS."""
+    global _last_flush
+    with _pending_lock:
+        timings, slow = _pending["timings"], _pending["slow"]
+        _pending["timings"], _pending["slow"] = [], []
+        _last_flush = time.monotonic()
+    if not timings and not slow:
+        return
+    cutoff = (datetime.now() - timedelta(days=RETENTION_DAYS)).isoformat(timespec="seconds")
+    # Reruns finishing meanwhile only wait for the swap above, not for this write.
+    with _write_lock:
+        conn = _log_connection()
+        try:
+            conn.executemany(
+                "INSERT INTO PAGE_TIMINGS (created_at, page, wall_ms, db_ms, model_ms, queries) VALUES (?, ?, ?, ?, ?, ?)",
+                timings
+            )
+            conn.executemany("INSERT INTO SLOW_QUERIES (created_at, page, query, ms, rows) VALUES (?, ?, ?, ?, ?)", slow)
+            conn.execute("DELETE FROM PAGE_TIMINGS WHERE created_at < ?", (cutoff,))
+            conn.execute("DELETE FROM SLOW_QUERIES WHERE created_at < ?", (cutoff,))
+            conn.commit()
+        except sqlite3.Error:
+            # Losing a batch of timings must never break a page.
+            conn.rollback()
+            logger.exception("Could not write profiling data")
+
+
+atexit.register(flush)
@@ -1,81 +1,62 @@
 import streamlit as st
 import sqlite3
-import pandas as pd
+from utils.db import bump_version, get_connection
+from utils.bulk_io import bulk_import_export
+from utils.table_view import fetch_row, paged_table_view, row_id_input
 
-# Database connection
-def get_db_connection():
-    return sqlite3.connect('mydb.db')
-
-# Fetch recruiter details
-def load_recruiter_data():
-    conn = get_db_connection()
-    query = "SELECT * FROM Recruiter"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+# Fetch one recruiter's details
+def load_recruiter(recruiter_id):
+    return fetch_row("Recruiter", recruiter_id)
 
 # Update recruiter details
 def update_recruiter_details(Recruiter_id, Name, Email, Phone_Number, Location, Designation):
-    conn = get_db_connection()
+    conn = get_connection()
     query = """
         UPDATE Recruiter
         SET name = ?, email = ?, phone_number = ?, location = ?, Designation = ?
         WHERE recruiter_id = ?
     """
     conn.execute(query, (Name, Email, Phone_Number, Location, Designation, Recruiter_id))
+    bump_version(conn, "Recruiter")
     conn.commit()
-    conn.close()
 
 # Add a new recruiter
 def add_new_recruiter(Name, Email, Phone_Number, Location, Designation):
-    conn = get_db_connection()
+    conn = get_connection()
     query = """
         INSERT INTO Recruiter (Name, Email, Phone_Number, Location, Designation)
         VALUES (?, ?, ?, ?, ?)
     """
     conn.execute(query, (Name, Email, Phone_Number, Location, Designation))
+    bump_version(conn, "Recruiter")
     conn.commit()
-    conn.close()
 
 # Remove a recruiter
 def remove_recruiter(recruiter_id):
-    conn = get_db_connection()
+    conn = get_connection()
     query = "DELETE FROM Recruiter WHERE recruiter_id = ?"
     conn.execute(query, (recruiter_id,))
+    bump_version(conn, "Recruiter")
     conn.commit()
-    conn.close()
 
 # Recruiter Page
 def recruiter_page():
     st.header("Recruiter Details")
 
-    # Load data from the database
-    recruiter_detail = load_recruiter_data()
-
-    # Search functionality
-    search_term = st.text_input("Search by Name:")
-    filtered_df_search = recruiter_detail[
-        recruiter_detail["Name"].str.contains(search_term, case=False, na=False)
-    ]
-    with st.expander("Recruiter Details", expanded=bool(search_term)):
-        st.dataframe(filtered_df_search, hide_index=True, use_container_width=True)
+    # Search, sort and page through recruiters; only the visible page is loaded
+    _, search_term = paged_table_view("Recruiter", "Recruiter Details", "Search by Name:", "recruiters")
+    bulk_import_export("Recruiter", "Recruiters", "recruiters", search_term)
 
     action = st.radio(
         "Choose an Action:",
         options=["Edit Recruiter Details", "Add New Recruiter", "Remove Recruiter"],
+        key="recruiters_action",
     )
 
     if action == "Edit Recruiter Details":
         st.subheader("Edit Recruiter Details")
-        recruiter_ids = recruiter_detail["Recruiter_id"].tolist()
-        recruiter_ids.insert(0, "Select a Recruiter ID")
-
-        selected_recruiter_id = st.selectbox("Select Recruiter ID:", recruiter_ids)
-        if selected_recruiter_id != "Select a Recruiter ID":
-            current_row = recruiter_detail[
-                recruiter_detail["Recruiter_id"] == selected_recruiter_id
-            ].iloc[0]
-
+        selected_recruiter_id, current_row = row_id_input("Recruiter ID:", load_recruiter, "recruiters_edit_id")
+        if current_row is not None:
             updated_name = st.text_input("Name:", value=current_row["Name"])
             updated_email = st.text_input("Email:", value=current_row["Email"])
             updated_phone_number = st.text_input("Phone Number:", value=current_row["Phone_Number"],max_chars=11)
@@ -88,16 +69,21 @@ def recruiter_page():
             updated_designation = st.text_input("Designation:", value=current_row["Designation"])
 
             if st.button("Save Changes"):
-                update_recruiter_details(
-                    selected_recruiter_id,
-                    updated_name,
-                    updated_email,
-                    updated_phone_number,
-                    updated_location,
-                    updated_designation,
-                )
-                st.success("Details updated successfully!")
-                st.rerun()
+                try:
+                    update_recruiter_details(
+                        selected_recruiter_id,
+                        updated_name,
+                        updated_email,
+                        updated_phone_number,
+                        updated_location,
+                        updated_designation,
+                    )
+                except sqlite3.IntegrityError:
+                    get_connection().rollback()
+                    st.error("Another recruiter already has this name, or submissions still refer to the old name.")
+                else:
+                    st.success("Details updated successfully!")
+                    st.rerun()
 
     elif action == "Add New Recruiter":
         st.subheader("Add New Recruiter")
@@ -115,21 +101,31 @@ def recruiter_page():
 
             submitted = st.form_submit_button("Submit")
             if submitted:
-                add_new_recruiter(new_name, new_email, new_phone_number, new_location, new_designation)
-                st.success("New recruiter added successfully!")
-                st.rerun()
+                try:
+                    add_new_recruiter(new_name, new_email, new_phone_number, new_location, new_designation)
+                except sqlite3.IntegrityError:
+                    get_connection().rollback()
+                    st.error("A recruiter with this name already exists.")
+                else:
+                    st.success("New recruiter added successfully!")
+                    st.rerun()
 
     elif action == "Remove Recruiter":
         st.subheader("Remove Recruiter")
-        recruiter_ids = recruiter_detail["Recruiter_id"].tolist()
-        recruiter_ids.insert(0, "Select a Recruiter ID")
-
-        selected_recruiter_id = st.selectbox("Select Recruiter ID to Remove:", recruiter_ids)
-        if selected_recruiter_id != "Select a Recruiter ID":
+        selected_recruiter_id, current_row = row_id_input(
+            "Recruiter ID to Remove:", load_recruiter, "recruiters_remove_id"
+        )
+        if current_row is not None:
+            st.caption(f"{current_row['Name']} ({current_row['Designation']})")
             if st.button("Remove Recruiter"):
-                remove_recruiter(selected_recruiter_id)
-                st.success("Recruiter removed successfully!")
-                st.rerun()
+                try:
+                    remove_recruiter(selected_recruiter_id)
+                except sqlite3.IntegrityError:
+                    get_connection().rollback()
+                    st.error("This recruiter still has submissions. Reassign or remove them first.")
+                else:
+                    st.success("Recruiter removed successfully!")
+                    st.rerun()
 
 # Main function
 def main():
@@ -0,0 +1,115 @@
+import sqlite3
+
+# ------------------------------------------------------------------------------
+# Full-text index over RESUMES (SQLite FTS5, external content)
+# ------------------------------------------------------------------------------
+# The index stores only the tokenised text; the row data stays in RESUMES and
+# is looked up through Resume_ID (the FTS rowid). Triggers keep both in sync.
+FTS_TABLE = "RESUMES_FTS"
+FTS_COLUMNS = [
+    "NAME", "JOB_TITLE", "CURRENT_JOB", "SKILLS",
+    "LOCATION", "RESUME_SUMMARY", "RESUME_TEXT",
+]
+# bm25() weights, in FTS_COLUMNS order: a hit in the name or skills counts
+# far more than the same word somewhere in the raw resume text.
+BM25_WEIGHTS = (10.0, 6.0, 4.0, 8.0, 3.0, 2.0, 1.0)
+
+# Email lookups go through an expression index on the normalised address,
+# so the Search tab can resolve pasted emails without scanning RESUMES.
+EMAIL_KEY = "LOWER(TRIM(EMAIL))"
+EMAIL_CHUNK_SIZE = 500  # stays well below SQLite's bound-parameter limit
+
+
+def ensure_resume_index(conn):
+    """Make sure the FTS5 index and the email index exist (created by migration 4)."""
+    from utils.migrations import run_migrations
+    run_migrations(conn)
+
+
+def build_match_query(search_input, separator=",", column=None):
+    """
+    Turn free-form user input into an FTS5 MATCH expression.
+
+    Every term must match (AND). A term wrapped in double quotes, or made of
+    several words, is searched as a phrase; a trailing '*' makes the last
+    word a prefix ("kube*", "machine lea*"). Returns None for empty input.
+    """
+    terms = []
+    for raw in search_input.split(separator):
+        term = raw.strip()
+        if not term:
+            continue
+        prefix = term.endswith("*")
+        term = term.rstrip("*").strip().strip('"').strip()
+        if not term:
+            continue
+        quoted = '"' + term.replace('"', '""') + '"'
+        terms.append(quoted + " *" if prefix else quoted)
+
+    if not terms:
+        return None
+    expression = " AND ".join(terms)
+    if column:
+        return f"{column} : ({expression})"
+    return expression
+
+
+def search_resumes(conn, match_query, limit=None, offset=0, where="", params=()):
+    """
+    Run an indexed MATCH query ranked by BM25 (best match first).
+    Returns (Resume_ID, snippet) pairs; snippets mark hits in **bold**.
+    An optional `where` condition on RESUMES (e.g. facet filters) narrows the hits.
+    """
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    query = f'''
+        SELECT {FTS_TABLE}.rowid, snippet({FTS_TABLE}, -1, '**', '**', '…', 16)
+        FROM {FTS_TABLE}
+        {"JOIN RESUMES ON RESUMES.Resume_ID = " + FTS_TABLE + ".rowid" if where else ""}
+        WHERE {FTS_TABLE} MATCH ? {"AND " + where if where else ""}
+        ORDER BY bm25({FTS_TABLE}, {weights})
+    '''
+    query_params = [match_query, *params]
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        query_params.extend([limit, offset])
+    try:
+        return conn.execute(query, query_params).fetchall()
+    except sqlite3.OperationalError:
+        # Malformed user syntax (e.g. unbalanced quotes) simply finds nothing.
+        return []
+
+
+def count_matches(conn, match_query, where="", params=()):
+    """Number of resumes matching an FTS5 expression (0 for malformed input)."""
+    join = f"JOIN RESUMES ON RESUMES.Resume_ID = {FTS_TABLE}.rowid" if where else ""
+    condition = f"AND {where}" if where else ""
+    try:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM {FTS_TABLE} {join} WHERE {FTS_TABLE} MATCH ? {condition}",
+            (match_query, *params)
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+
+def normalize_email(email):
+    return email.strip().lower()
+
+
+def lookup_emails(conn, emails):
+    """
+    Resolve many email addresses through the normalised-email index in
+    chunked IN (...) queries. Returns {normalised email: [Resume_ID, ...]};
+    addresses with no resume are absent from the result.
+    """
+    wanted = sorted({normalize_email(e) for e in emails if e.strip()})
+    found = {}
+    for start in range(0, len(wanted), EMAIL_CHUNK_SIZE):
+        chunk = wanted[start:start + EMAIL_CHUNK_SIZE]
+        marks = ", ".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"SELECT {EMAIL_KEY}, Resume_ID FROM RESUMES WHERE {EMAIL_KEY} IN ({marks})", chunk
+        ).fetchall()
+        for email, resume_id in rows:
+            found.setdefault(email, []).append(resume_id)
+    return found
@@ -1,89 +1,317 @@
 import streamlit as st
 import sqlite3
 import pandas as pd
-import fitz  # PyMuPDF for PDF text extraction
-import docx
 import io
+import re
+from utils.db import get_connection
+from utils.resume_index import (
+    build_match_query, count_matches, ensure_resume_index, lookup_emails, normalize_email, search_resumes
+)
+from utils.fuzzy_index import ensure_fuzzy_index, fuzzy_lookup, fuzzy_resume_ids
+from utils.job_matching import best_jobs_label, job_recommendations
+from utils.facets import FACET_LABELS, ensure_facets, facet_counts, facet_filter_sql, filter_resume_ids
+
+# Metadata only: the resume blob is fetched by Resume_ID on View/Download.
+RESUME_COLUMNS = [
+    'Resume_ID', 'Name', 'Email ID', 'Phone Number', 'Job Title', 'Current Company',
+    'Skills', 'Location', 'File_Name'
+]
+METADATA_SELECT = """
+    SELECT
+        Resume_ID, NAME, EMAIL, PHONE_NUMBER, JOB_TITLE, CURRENT_JOB, SKILLS,
+        LOCATION, FILE_NAME
+    FROM RESUMES
+"""
+PAGE_SIZES = [10, 25, 50, 100]
 
 def extract_text_from_pdf(pdf_bytes):
     """Extract text from a PDF file."""
+    import fitz  # PyMuPDF, only needed when a resume is viewed
     doc = fitz.open(stream=pdf_bytes, filetype="pdf")
     text = "\n".join([page.get_text() for page in doc])
     return text if text.strip() else "No extractable text found in the PDF."
 
 def extract_text_from_docx(docx_bytes):
     """Extract text from a DOCX file."""
+    import docx
     doc = docx.Document(io.BytesIO(docx_bytes))
     text = "\n".join([para.text for para in doc.paragraphs])
     return text if text.strip() else "No extractable text found in the DOCX file."
 
-def get_all_resumes():
-    """Fetch all resume records from the database."""
-    conn = sqlite3.connect("mydb.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT 
-            NAME, EMAIL, PHONE_NUMBER, JOB_TITLE, CURRENT_JOB, SKILLS, 
-            LOCATION, RESUME_FILE, FILE_NAME
-        FROM RESUMES
-    """)
-    rows = cursor.fetchall()
-    conn.close()
-    df = pd.DataFrame(rows, columns=[
-        'Name', 'Email ID', 'Phone Number', 'Job Title', 'Current Company',
-        'Skills', 'Location', 'Resume_File', 'File_Name'
-    ])
-    return df
+def count_resumes(conn, facets=None):
+    """Number of resumes matching the facet selection (0 if the table does not exist yet)."""
+    where, params = facet_filter_sql(facets or {})
+    try:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM RESUMES {'WHERE ' + where if where else ''}", params
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+def get_resume_page(conn, page_size, before_id=None, facets=None):
+    """
+    Fetch one page of resume metadata, newest first.
+    Keyset paging: pass the last Resume_ID of the previous page as before_id.
+    """
+    where, params = facet_filter_sql(facets or {})
+    clauses = [where] if where else []
+    if before_id is not None:
+        clauses.append("Resume_ID < ?")
+        params.append(before_id)
+    query = METADATA_SELECT
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY Resume_ID DESC LIMIT ?"
+    params.append(page_size)
+    return pd.DataFrame(conn.execute(query, params).fetchall(), columns=RESUME_COLUMNS)
+
+def get_resumes_by_ids(conn, resume_ids):
+    """Fetch resume metadata for the given IDs, keeping the order of the IDs."""
+    if not resume_ids:
+        return pd.DataFrame(columns=RESUME_COLUMNS)
+    placeholders = ", ".join("?" for _ in resume_ids)
+    rows = conn.execute(f"{METADATA_SELECT} WHERE Resume_ID IN ({placeholders})", resume_ids).fetchall()
+    df = pd.DataFrame(rows, columns=RESUME_COLUMNS)
+    order = {resume_id: position for position, resume_id in enumerate(resume_ids)}
+    return df.sort_values("Resume_ID", key=lambda ids: ids.map(order)).reset_index(drop=True)
+
+def get_resume_file(resume_id):
+    """Fetch a single resume's binary and file name by Resume_ID."""
+    row = get_connection().execute(
+        "SELECT RESUME_FILE, FILE_NAME FROM RESUMES WHERE Resume_ID = ?", (resume_id,)
+    ).fetchone()
+    return row if row else (None, None)
+
+def full_text_search(conn, search_input, page, page_size, separator=",", column=None, facets=None):
+    """
+    Search resumes through the FTS5 index, best BM25 match first.
+    Returns (page of matching rows with a highlighted 'Snippet' column, total matches).
+    """
+    match_query = build_match_query(search_input, separator=separator, column=column)
+    if match_query is None:
+        return pd.DataFrame(columns=RESUME_COLUMNS + ["Snippet"]), 0
+    ensure_resume_index(conn)
+    where, params = facet_filter_sql(facets or {})
+    hits = search_resumes(conn, match_query, limit=page_size, offset=page * page_size, where=where, params=params)
+    df = get_resumes_by_ids(conn, [resume_id for resume_id, _ in hits])
+    df["Snippet"] = [snippet for _, snippet in hits]
+    return df, count_matches(conn, match_query, where=where, params=params)
+
+def fuzzy_search(conn, search_input, page, page_size, facets=None):
+    """
+    Typo-tolerant search over names, companies and skills via the trigram index.
+    Every comma-separated term must match; rows are ranked by mean similarity.
+    Returns (page of rows with a 'Snippet' naming the matched terms, total matches).
+    """
+    terms = [t.strip() for t in search_input.split(",") if t.strip()]
+    if not terms:
+        return pd.DataFrame(columns=RESUME_COLUMNS + ["Snippet"]), 0
+    ensure_fuzzy_index(conn)
+
+    scores = None
+    for term in terms:
+        hits = {resume_id: (similarity, matched) for resume_id, similarity, matched in fuzzy_resume_ids(conn, term)}
+        if scores is None:
+            scores = {resume_id: [hit] for resume_id, hit in hits.items()}
+        else:
+            scores = {resume_id: found + [hits[resume_id]] for resume_id, found in scores.items() if resume_id in hits}
+
+    ranked = sorted(
+        scores.items(),
+        key=lambda item: (-sum(sim for sim, _ in item[1]) / len(item[1]), -item[0])
+    )
+    if facets:
+        kept = set(filter_resume_ids(conn, [resume_id for resume_id, _ in ranked], facets))
+        ranked = [item for item in ranked if item[0] in kept]
+    page_hits = ranked[page * page_size:(page + 1) * page_size]
+    df = get_resumes_by_ids(conn, [resume_id for resume_id, _ in page_hits])
+    df["Snippet"] = [
+        ", ".join(f"{matched} ({similarity:.0%})" for similarity, matched in found)
+        for _, found in page_hits
+    ]
+    return df, len(ranked)
+
+def suggest_skills(conn, search_input):
+    """'Did you mean' corrections for comma-separated skills, from the trigram index."""
+    ensure_fuzzy_index(conn)
+    suggestions = []
+    for term in [t.strip().strip('"').rstrip("*") for t in search_input.split(",") if t.strip()]:
+        best = fuzzy_lookup(conn, term, kinds=("skill",), limit=1)
+        suggestions.append(best[0][1] if best else term)
+    return suggestions
+
+def parse_emails(search_input):
+    """Emails pasted from a tracker, split on whitespace, commas or semicolons, in input order."""
+    seen = {}
+    for email in re.split(r"[\s,;]+", search_input):
+        if email.strip():
+            seen.setdefault(normalize_email(email), None)
+    return list(seen)
+
+def email_search(conn, search_input, page, page_size, facets=None):
+    """
+    Indexed lookup of pasted emails.
+    Returns (page of matching resumes in input order, total matches, unmatched emails).
+    """
+    search_list = parse_emails(search_input)
+    if not search_list:
+        return pd.DataFrame(columns=RESUME_COLUMNS), 0, search_list
+    ensure_resume_index(conn)
+    found = lookup_emails(conn, search_list)
+    unmatched = [email for email in search_list if email not in found]
+    resume_ids = [resume_id for email in search_list for resume_id in found.get(email, [])]
+    if facets:
+        resume_ids = filter_resume_ids(conn, resume_ids, facets)
+    page_ids = resume_ids[page * page_size:(page + 1) * page_size]
+    return get_resumes_by_ids(conn, page_ids), len(resume_ids), unmatched
+
+def browse_resumes(conn, page, page_size, facets=None):
+    """
+    Return (page of all resumes, total). Keyset cursors for pages already
+    visited are kept in session state so Next/Previous never use OFFSET.
+    """
+    cursors = st.session_state.setdefault("search_cursors", {0: None})
+    if page in cursors:
+        df = get_resume_page(conn, page_size, before_id=cursors[page], facets=facets)
+    else:
+        where, params = facet_filter_sql(facets or {})
+        rows = conn.execute(
+            f"{METADATA_SELECT} {'WHERE ' + where if where else ''} ORDER BY Resume_ID DESC LIMIT ? OFFSET ?",
+            params + [page_size, page * page_size]
+        ).fetchall()
+        df = pd.DataFrame(rows, columns=RESUME_COLUMNS)
+    if not df.empty:
+        cursors[page + 1] = int(df["Resume_ID"].iloc[-1])
+    return df, count_resumes(conn, facets)
+
+def facet_filters(conn):
+    """Facet multiselects labelled with their live counts; returns the selection."""
+    ensure_facets(conn)
+    selected = {}
+    with st.expander("Filters", expanded=False):
+        columns = st.columns(len(FACET_LABELS))
+        for column, (facet, label) in zip(columns, FACET_LABELS.items()):
+            counts = dict(facet_counts(conn, facet))
+            selected[facet] = column.multiselect(
+                label,
+                options=list(counts),
+                format_func=lambda value, counts=counts: f"{value} ({counts[value]})",
+                key=f"facet_{facet}"
+            )
+    return {facet: values for facet, values in selected.items() if values}
+
+def _mime_type(file_name):
+    return (
+        "application/pdf" if file_name.lower().endswith('.pdf')
+        else "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        if file_name.lower().endswith('.docx')
+        else "application/octet-stream"
+    )
+
+def _set_search_page(page):
+    st.session_state.search_page = page
+
+def _pager(total, page_size, page):
+    """Previous/Next controls; the callbacks move the page before the next rerun."""
+    page_count = max(1, -(-total // page_size))
+    col1, col2, col3 = st.columns([0.2, 0.6, 0.2])
+    col1.button("◀ Previous", key="search_prev", disabled=page == 0,
+                on_click=_set_search_page, args=(page - 1,))
+    col3.button("Next ▶", key="search_next", disabled=page >= page_count - 1,
+                on_click=_set_search_page, args=(page + 1,))
+    col2.markdown(f"Page **{page + 1}** of **{page_count}**")
 
 def search_fun():
-    df = get_all_resumes()
-    if df.empty:
+    conn = get_connection()
+    if count_resumes(conn) == 0:
         st.info("No resumes found in the database.")
         return
 
     st.title("Resume Viewer & Downloader")
-    search_option = st.radio("Search resumes by:", ("Skills", "Emails"), horizontal=True)
+    search_option = st.radio("Search resumes by:", ("Skills", "Keywords", "Fuzzy", "Emails"), horizontal=True, key="search_option")
 
     if search_option == "Skills":
-        search_input = st.text_input("Enter Skills (comma-separated):", placeholder="e.g., Python, Machine Learning")
-        if search_input:
-            search_list = [s.strip().lower() for s in search_input.split(",") if s.strip()]
-            df_filtered = df[df["Skills"].apply(lambda x: all(skill in x.lower() for skill in search_list))]
-        else:
-            df_filtered = df
+        search_input = st.text_input("Enter Skills (comma-separated):", placeholder="e.g., Python, Machine Learning, Kube*", key="search_skills")
+    elif search_option == "Keywords":
+        search_input = st.text_input(
+            "Enter Keywords (comma-separated, \"quoted phrases\" and prefix* allowed):",
+            placeholder='e.g., "data engineer", Spark, Azure*',
+            key="search_keywords"
+        )
+    elif search_option == "Fuzzy":
+        search_input = st.text_input(
+            "Enter Names, Companies or Skills (comma-separated, typos allowed):",
+            placeholder="e.g., Kubernets, Pysthon",
+            key="search_fuzzy"
+        )
     else:  # Emails search
-        search_input = st.text_input("Enter Emails (space-separated):", placeholder="e.g., example@example.com another@example.com")
-        if search_input:
-            search_list = [s.strip().lower() for s in search_input.split() if s.strip()]
-            df_filtered = df[df["Email ID"].str.lower().isin(search_list)]
-        else:
-            df_filtered = df
+        search_input = st.text_input("Enter Emails (space-separated):", placeholder="e.g., example@example.com another@example.com", key="search_emails")
+    facets = facet_filters(conn)
+    page_size = st.selectbox("Results per page:", PAGE_SIZES, index=1, key="search_page_size")
+
+    # Start from the first page whenever the query changes.
+    query_key = (search_option, search_input, page_size, repr(sorted(facets.items())))
+    if st.session_state.get("search_query_key") != query_key:
+        st.session_state.search_query_key = query_key
+        st.session_state.search_page = 0
+        st.session_state.search_cursors = {0: None}
+    page = st.session_state.search_page
 
-    st.write(f"Total Resumes Found: {len(df_filtered)}")
+    suggestions = None
+    unmatched = []
+    if not search_input:
+        df_page, total = browse_resumes(conn, page, page_size, facets)
+    elif search_option == "Skills":
+        df_page, total = full_text_search(conn, search_input, page, page_size, separator=",", column="SKILLS", facets=facets)
+        if total == 0:
+            suggestions = suggest_skills(conn, search_input)
+    elif search_option == "Keywords":
+        df_page, total = full_text_search(conn, search_input, page, page_size, separator=",", facets=facets)
+    elif search_option == "Fuzzy":
+        df_page, total = fuzzy_search(conn, search_input, page, page_size, facets)
+    else:
+        df_page, total, unmatched = email_search(conn, search_input, page, page_size, facets)
 
-    for index, row in df_filtered.iterrows():
+    st.write(f"Total Resumes Found: {total}")
+    if unmatched:
+        with st.expander(f"Emails not found ({len(unmatched)})"):
+            st.text_area("Unmatched Emails", "\n".join(unmatched), height=150)
+            st.download_button(
+                label="📥 Export Unmatched Emails",
+                data="\n".join(unmatched),
+                file_name="unmatched_emails.txt",
+                mime="text/plain",
+                key="download_unmatched_emails"
+            )
+    if suggestions and [s.lower() for s in suggestions] != [t.strip().lower() for t in search_input.split(",") if t.strip()]:
+        st.info(f"Did you mean: **{', '.join(suggestions)}**?")
+    if total > page_size:
+        _pager(total, page_size, page)
+
+    # Best-fit jobs stored at upload time, read for the whole page at once
+    recommendations = job_recommendations(df_page["Resume_ID"].tolist()) if not df_page.empty else {}
+
+    for _, row in df_page.iterrows():
+        resume_id = row["Resume_ID"]
         with st.expander(f"📄 {row['Name']} - {row['Job Title']}"):
             st.write(f"**Email:** {row['Email ID']}")
             st.write(f"**Phone:** {row['Phone Number']}")
             st.write(f"**Current Job:** {row['Current Company']}")
             st.write(f"**Skills:** {row['Skills']}")
             st.write(f"**Location:** {row['Location']}")
-
-            file_name = row["File_Name"]
-            resume_bytes = row["Resume_File"]
-            
-            mime_type = (
-                "application/pdf" if file_name.lower().endswith('.pdf')
-                else "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                if file_name.lower().endswith('.docx')
-                else "application/octet-stream"
-            )
+            if isinstance(row.get("Snippet"), str) and row["Snippet"]:
+                st.markdown(f"**Match:** {row['Snippet']}")
+            if resume_id in recommendations:
+                st.write(f"**Best-fit jobs:** {best_jobs_label(recommendations[resume_id])}")
 
             # Add View and Download Buttons
             col1, col2 = st.columns([0.2, 0.2])
-            if col1.button("👁 View", key=f"view_{index}"):
+            if col1.button("👁 View", key=f"view_{resume_id}"):
                 with st.spinner("Extracting text..."):
-                    if file_name.lower().endswith(".pdf"):
+                    resume_bytes, file_name = get_resume_file(resume_id)
+                    if resume_bytes is None:
+                        extracted_text = "No resume file stored for this candidate."
+                    elif file_name.lower().endswith(".pdf"):
                         extracted_text = extract_text_from_pdf(resume_bytes)
                     elif file_name.lower().endswith(".docx"):
                         extracted_text = extract_text_from_docx(resume_bytes)
@@ -91,14 +319,25 @@ def search_fun():
                         extracted_text = "Unsupported file format."
 
                     st.text_area("Extracted Resume Text", extracted_text, height=300)
-            
-            col2.download_button(
-                label="⬇️ Download", 
-                data=resume_bytes, 
-                file_name=file_name, 
-                mime=mime_type,
-                key=f"download_{index}"
-            )
+
+            # The binary is only loaded after the user asks for it, and only
+            # one prepared file is kept in session state at a time.
+            if col2.button("⬇️ Download", key=f"prepare_{resume_id}"):
+                resume_bytes, file_name = get_resume_file(resume_id)
+                if resume_bytes is None:
+                    st.warning("No resume file stored for this candidate.")
+                else:
+                    st.session_state.search_download = (resume_id, resume_bytes, file_name)
+            prepared = st.session_state.get("search_download")
+            if prepared and prepared[0] == resume_id:
+                _, resume_bytes, file_name = prepared
+                col2.download_button(
+                    label=f"💾 Save {file_name}",
+                    data=resume_bytes,
+                    file_name=file_name,
+                    mime=_mime_type(file_name),
+                    key=f"download_{resume_id}"
+                )
 
 if __name__ == "__main__":
     search_fun()
@@ -0,0 +1,112 @@
+import importlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# ------------------------------------------------------------------------------
+# Cold start: lazy page imports and background warm-up
+# ------------------------------------------------------------------------------
+# The login screen must not wait for torch, transformers or the Gemini
+# client. Pages that need them are imported the first time their tab is
+# opened (lazy_page), and after login a daemon thread imports them and
+# loads the embedding model so the first visit is usually already warm.
+# check_import_budget() guards this: it imports the login-path modules in
+# a fresh interpreter and fails if they are slow or pull in a heavy package.
+LOGIN_MODULES = [
+    "utils.db",
+    "utils.migrations",
+    "utils.dashboard",
+    "utils.recruiter_page",
+    "utils.jobs_page",
+    "utils.submissions_page",
+    "utils.search",
+    "utils.near_duplicates",
+    "utils.prescore",
+    "utils.performance_page",
+]
+HEAVY_MODULES = ["utils.ATS_Score", "utils.Bulk_Upload"]
+# Packages that must not be imported before a heavy page is opened.
+HEAVY_PACKAGES = ["torch", "transformers", "sentence_transformers", "sklearn", "google.generativeai"]
+LOGIN_IMPORT_BUDGET = 1.5  # seconds, on top of streamlit and pandas themselves
+WARM_UP = os.getenv("ATS_WARM_UP", "1") == "1"
+
+logger = logging.getLogger(__name__)
+_warm_up_lock = threading.Lock()
+_warm_up_thread = None
+
+
+def lazy_page(module_name, function_name):
+    """Page function that imports its module on first use."""
+    def page():
+        return getattr(importlib.import_module(module_name), function_name)()
+    page.__name__ = function_name
+    return page
+
+
+def _warm_up():
+    started = time.perf_counter()
+    try:
+        for module_name in HEAVY_MODULES:
+            importlib.import_module(module_name)
+        ats = importlib.import_module("utils.ATS_Score")
+        ats.get_analyzer()
+        ats.get_cross_encoder()
+    except Exception:
+        # A failed warm-up only costs speed; the page reports the real error.
+        logger.exception("Background warm-up failed")
+    else:
+        logger.info("Heavy modules warmed up in %.1fs", time.perf_counter() - started)
+
+
+def warm_up_in_background():
+    """Start the warm-up thread once per process (no-op when ATS_WARM_UP=0)."""
+    global _warm_up_thread
+    if not WARM_UP:
+        return
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=_warm_up, name="ats-warm-up", daemon=True)
+            _warm_up_thread.start()
+
+
+_PROFILE_SCRIPT = """
+import json, sys, time
+import streamlit, pandas
+started = time.perf_counter()
+for name in sys.argv[1].split(","):
+    __import__(name)
+elapsed = time.perf_counter() - started
+heavy = [name for name in sys.argv[2].split(",") if name in sys.modules]
+print(json.dumps({"seconds": elapsed, "heavy": heavy}))
+"""
+
+
+def check_import_budget(budget=LOGIN_IMPORT_BUDGET, root=None):
+    """
+    Import LOGIN_MODULES in a fresh interpreter. Returns (seconds, problems),
+    where problems lists heavy packages that were loaded and budget overruns.
+    root is the directory that contains the utils package (default: ours).
+    """
+    root = root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", _PROFILE_SCRIPT, ",".join(LOGIN_MODULES), ",".join(HEAVY_PACKAGES)],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+    profile = json.loads(result.stdout.strip().splitlines()[-1])
+    problems = [f"{name} is imported on the login path" for name in profile["heavy"]]
+    if profile["seconds"] > budget:
+        problems.append(f"login imports took {profile['seconds']:.2f}s (budget {budget:.2f}s)")
+    return profile["seconds"], problems
+
+
+# python -m utils.startup  -> exits non-zero when the login path is too heavy
+if __name__ == "__main__":
+    seconds, problems = check_import_budget()
+    print(f"Login-path imports: {seconds:.2f}s")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if problems else 0)
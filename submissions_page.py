@@ -1,98 +1,78 @@
-import streamlit as st
-import pandas as pd
 import sqlite3
+import streamlit as st
+from utils.db import bump_version, cached_query, get_connection
+from utils.bulk_io import bulk_import_export
+from utils.table_view import fetch_row, paged_table_view, row_id_input
 
-# Database connection
-def get_db_connection():
-    return sqlite3.connect('mydb.db')
-
-# Fetch submission details
-def load_submission_data():
-    conn = get_db_connection()
-    query = "SELECT * FROM Submissions"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+# Fetch one submission's details
+def load_submission(submission_id):
+    return fetch_row("Submissions", submission_id)
 
 # Fetch recruiter names
 def fetch_recruiter_names():
-    conn = get_db_connection()
     query = "SELECT Name FROM Recruiter"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = cached_query(query, ["Recruiter"])
     return df['Name'].tolist()
 
 # Fetch job IDs and details
 def fetch_job_ids():
-    conn = get_db_connection()
     query = "SELECT Job_ID, Job_Details FROM Jobs"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = cached_query(query, ["Jobs"])
     return df.set_index('Job_ID')['Job_Details'].to_dict()
 
 # Update submission notes
 def update_submission_notes(submission_id, new_notes):
-    conn = get_db_connection()
+    conn = get_connection()
     query = """
         UPDATE Submissions
         SET notes = ?
         WHERE Submission_ID = ?
     """
     conn.execute(query, (new_notes, submission_id))
+    bump_version(conn, "Submissions")
     conn.commit()
-    conn.close()
 
 # Add a new submission
 def add_new_submission(Job_ID, Date_of_Submission, Client_Name, Job_title, City, State, Country, Recruiter_name, Visa, Pay_Rate, Status, Notes):
-    conn = get_db_connection()
+    conn = get_connection()
     query = """
         INSERT INTO Submissions (Job_ID, Data_of_Submission, Client_Name, Job_title, Candidate_City, Candidate_State, Candidate_Country, Recruiter_name, Visa, Pay_Rate, Status, notes)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
     conn.execute(query, (Job_ID, Date_of_Submission, Client_Name, Job_title, City, State, Country, Recruiter_name, Visa, Pay_Rate, Status, Notes))
+    bump_version(conn, "Submissions")
     conn.commit()
-    conn.close()
 
 # Remove a submission
 def remove_submission(submission_id):
-    conn = get_db_connection()
+    conn = get_connection()
     query = "DELETE FROM Submissions WHERE Submission_ID = ?"
     conn.execute(query, (submission_id,))
+    bump_version(conn, "Submissions")
     conn.commit()
-    conn.close()
 
 # Submissions Page
 def submissions_page():
     st.header("Submission Table")
 
-    submission_data = load_submission_data()
-
-    # Search functionality
-    search_term = st.text_input("Search by Client Name:")
-    filtered_df = submission_data[
-        submission_data['Client_Name'].str.contains(search_term, case=False, na=False)
-    ]
-    with st.expander("Submission Table", expanded=bool(search_term)):
-        st.dataframe(filtered_df, hide_index=True, use_container_width=True)
+    # Search, sort and page through submissions; only the visible page is loaded
+    _, search_term = paged_table_view("Submissions", "Submission Table", "Search by Client Name:", "submissions")
+    bulk_import_export("Submissions", "Submissions", "submissions", search_term)
 
     # Action selection
     action = st.radio(
         "Choose Action:",
-        options=["Edit Notes for a Submission", "Add a New Submission", "Remove Submission"]
+        options=["Edit Notes for a Submission", "Add a New Submission", "Remove Submission"],
+        key="submissions_action"
     )
 
     if action == "Edit Notes for a Submission":
         st.subheader("Edit Notes for a Submission")
-        submission_ids = filtered_df['Submission_ID'].tolist()
-        submission_ids.insert(0, "Select a Submission ID")
-
-        selected_submission_id = st.selectbox("Select Submission ID:", submission_ids)
-        if selected_submission_id != "Select a Submission ID":
-            current_notes = submission_data.loc[
-                submission_data['Submission_ID'] == selected_submission_id, 'notes'
-            ].values[0] if not submission_data.loc[
-                submission_data['Submission_ID'] == selected_submission_id, 'notes'
-            ].empty else ""
+        selected_submission_id, current_row = row_id_input(
+            "Submission ID:", load_submission, "submissions_edit_id"
+        )
+        if current_row is not None:
+            current_notes = current_row['notes'] or ""
             new_notes = st.text_area("Update Notes:", value=current_notes)
 
             if st.button("Save Notes"):
@@ -123,17 +103,22 @@ def submissions_page():
             notes = st.text_area("Notes:")
 
             if st.form_submit_button("Add Submission"):
-                add_new_submission(job_id, date_of_submission, client_name, job_title, city, state, country, recruiter_name, visa, pay_rate, status, notes)
-                st.success("New submission added successfully!")
-                st.rerun()
+                try:
+                    add_new_submission(job_id, date_of_submission, client_name, job_title, city, state, country, recruiter_name, visa, pay_rate, status, notes)
+                except sqlite3.IntegrityError:
+                    get_connection().rollback()
+                    st.error("The selected job or recruiter no longer exists. Reload the page and try again.")
+                else:
+                    st.success("New submission added successfully!")
+                    st.rerun()
 
     elif action == "Remove Submission":
         st.subheader("Remove a Submission")
-        submission_ids = filtered_df['Submission_ID'].tolist()
-        submission_ids.insert(0, "Select a Submission ID")
-
-        selected_submission_id = st.selectbox("Select Submission ID:", submission_ids)
-        if selected_submission_id != "Select a Submission ID":
+        selected_submission_id, current_row = row_id_input(
+            "Submission ID to Remove:", load_submission, "submissions_remove_id"
+        )
+        if current_row is not None:
+            st.caption(f"{current_row['Client_Name']}, {current_row['Job_title']} ({current_row['Status']})")
             if st.button("Remove Submission"):
                 remove_submission(selected_submission_id)
                 st.success("Submission removed successfully!")
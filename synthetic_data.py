@@ -0,0 +1,378 @@
+import argparse
+import io
+import random
+import sys
+import time
+import zipfile
+from datetime import date, timedelta
+from xml.sax.saxutils import escape
+from utils.db import bump_version, get_connection
+from utils.fuzzy_index import index_resume
+from utils.migrations import run_migrations
+from utils.near_duplicates import index_signature, resume_text
+
+# ------------------------------------------------------------------------------
+# Deterministic synthetic data for benchmarks
+# ------------------------------------------------------------------------------
+# Fills the database named by ATS_DB_PATH with recruiters, jobs, submissions
+# and resumes at a chosen scale:
+#
+#   ATS_DB_PATH=bench.db python -m utils.synthetic_data --resumes 100000
+#
+# The same seed and counts always produce the same rows, so benchmark
+# baselines (utils.bench) stay comparable between runs. Rows go through
+# the normal triggers and index hooks (FTS, facets, counters, rollups,
+# fuzzy terms, MinHash signatures), so the derived tables look like those
+# of a real install. The first FILE_SAMPLE resumes also get a generated
+# PDF or DOCX file, readable by the same libraries the upload page uses.
+# About DUPLICATE_SHARE of the resumes are lightly edited copies of earlier
+# ones under a new email, for the near-duplicate detector.
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+FILE_SAMPLE = 1000
+DUPLICATE_SHARE = 0.01
+CHUNK_ROWS = 5000        # rows written per transaction
+FIRST_DAY = date(2023, 1, 1)
+DAYS = 730               # submissions are spread over two years from FIRST_DAY
+INSERT_DOMAIN = "bench-insert.example"  # emails of records made for insert benchmarks
+
+FIRST_NAMES = [
+    "Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun", "Divya", "Karthik", "Meera",
+    "James", "Emily", "Michael", "Sarah", "David", "Jessica", "Daniel", "Laura", "Kevin", "Rachel",
+    "Wei", "Mei", "Hiro", "Yuki", "Carlos", "Sofia", "Luis", "Elena", "Omar", "Fatima",
+]
+LAST_NAMES = [
+    "Sharma", "Reddy", "Patel", "Iyer", "Nair", "Rao", "Gupta", "Singh", "Kumar", "Menon",
+    "Smith", "Johnson", "Brown", "Miller", "Davis", "Wilson", "Moore", "Taylor", "Clark", "Lewis",
+    "Chen", "Wang", "Tanaka", "Sato", "Garcia", "Lopez", "Martinez", "Rossi", "Khan", "Ali",
+]
+LOCATIONS = [
+    ("New York", "NY"), ("San Francisco", "CA"), ("Austin", "TX"), ("Dallas", "TX"), ("Seattle", "WA"),
+    ("Chicago", "IL"), ("Atlanta", "GA"), ("Boston", "MA"), ("Denver", "CO"), ("Phoenix", "AZ"),
+    ("Charlotte", "NC"), ("Jersey City", "NJ"), ("Raleigh", "NC"), ("Columbus", "OH"), ("Tampa", "FL"),
+]
+JOB_TITLES = [
+    "Data Scientist", "Data Engineer", "Machine Learning Engineer", "Java Developer", "Python Developer",
+    "DevOps Engineer", "Cloud Architect", "Business Analyst", "QA Engineer", "Full Stack Developer",
+    "Salesforce Developer", "Scrum Master", "Database Administrator", "Frontend Developer", "SRE",
+]
+SKILLS = [
+    "Python", "Java", "SQL", "AWS", "Azure", "GCP", "Spark", "Kafka", "Airflow", "Docker", "Kubernetes",
+    "Terraform", "React", "Angular", "Node.js", "TypeScript", "Spring Boot", "Hibernate", "Pandas",
+    "TensorFlow", "PyTorch", "Scikit-learn", "Tableau", "Power BI", "Snowflake", "Databricks", "Jenkins",
+    "Git", "Linux", "REST", "GraphQL", "MongoDB", "PostgreSQL", "Redis", "Selenium", "Salesforce", "Agile",
+]
+COMPANIES = [
+    "Acme Corp", "Globex", "Initech", "Umbrella Analytics", "Stark Industries", "Wayne Enterprises",
+    "Hooli", "Vandelay Imports", "Soylent Systems", "Cyberdyne", "Tyrell Data", "Wonka Labs",
+]
+CLIENTS = ["Tek Systems", "Capgemini", "Infosys", "Deloitte", "Accenture", "Cognizant", "Wipro", "TCS"]
+VISAS = ["H1B", "GC", "US Citizen", "OPT", "H4 EAD", "TN"]
+STATUSES = ["Initial discussion", "Interview", "Submitted", "Selected"]
+DESIGNATIONS = ["Recruiter", "Senior Recruiter", "Lead Recruiter", "Account Manager"]
+SUMMARY_TEMPLATES = [
+    "{title} with {years} years of experience building solutions with {skills}. Currently at {company}.",
+    "Experienced {title} ({years} years) skilled in {skills}. Delivered projects for {company} and others.",
+    "{years}+ years as a {title}. Strong background in {skills}; recently worked at {company}.",
+]
+
+
+def scale_counts(resumes):
+    """Rows per table for a resume count, in the proportions of a typical install."""
+    return {
+        "recruiters": max(10, resumes // 2000),
+        "jobs": max(20, resumes // 50),
+        "submissions": resumes // 2,
+        "resumes": resumes,
+    }
+
+
+def _person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _phone(rng):
+    return f"({rng.randint(200, 989)}) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+
+
+# ------------------------------------------------------------------------------
+# Resume files
+# ------------------------------------------------------------------------------
+def _wrap(text, width=90):
+    lines = []
+    for paragraph in text.splitlines():
+        line = ""
+        for word in paragraph.split():
+            if line and len(line) + 1 + len(word) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+    return lines
+
+
+def pdf_bytes(text):
+    """A one-page PDF (Helvetica) containing the text."""
+    def pdf_string(line):
+        return "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+    lines = _wrap(text)[:50]
+    content = "BT /F1 11 Tf 14 TL 72 740 Td " + " ".join(f"{pdf_string(line)} Tj T*" for line in lines) + " ET"
+    content = content.encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+_DOCX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def docx_bytes(text):
+    """A minimal DOCX with one paragraph per line of text."""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in text.splitlines()
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{paragraphs}</w:body></w:document>'
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as docx:
+        # Fixed timestamps keep the bytes identical from run to run.
+        for name, data in [*_DOCX_PARTS.items(), ("word/document.xml", document)]:
+            docx.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), data)
+    return out.getvalue()
+
+
+# ------------------------------------------------------------------------------
+# Row generators
+# ------------------------------------------------------------------------------
+def recruiters(seed, count):
+    """Recruiter rows with unique names (Submissions reference them by name)."""
+    rng = random.Random(f"{seed}:recruiters")
+    seen = set()
+    for i in range(count):
+        name = _person(rng)
+        if name in seen:
+            name = f"{name} {i}"
+        seen.add(name)
+        city, _ = rng.choice(LOCATIONS)
+        email = f"{name.lower().replace(' ', '.')}@staffing.example"
+        yield (name, email, _phone(rng), city, rng.choice(DESIGNATIONS))
+
+
+def jobs(seed, count):
+    rng = random.Random(f"{seed}:jobs")
+    for _ in range(count):
+        title = rng.choice(JOB_TITLES)
+        city, state = rng.choice(LOCATIONS)
+        skills = rng.sample(SKILLS, rng.randint(4, 8))
+        description = (
+            f"{title} with {rng.randint(2, 12)}+ years of experience. Must have {', '.join(skills[:-2])}. "
+            f"Nice to have {skills[-2]} and {skills[-1]}."
+        )
+        yield (title, f"{city}, {state}", rng.randint(40, 120), "/".join(rng.sample(VISAS, 2)),
+               description, rng.choice(CLIENTS))
+
+
+def submissions(seed, count, job_rows, recruiter_names):
+    """Submission rows; job_rows is a list of (Job_ID, Job_Details, Client)."""
+    rng = random.Random(f"{seed}:submissions")
+    for _ in range(count):
+        job_id, title, client = rng.choice(job_rows)
+        city, state = rng.choice(LOCATIONS)
+        day = FIRST_DAY + timedelta(days=rng.randrange(DAYS))
+        yield (job_id, day.isoformat(), client, title, city, state, "USA", rng.choice(recruiter_names),
+               rng.choice(VISAS), rng.randint(30, 100), rng.choices(STATUSES, weights=[4, 3, 2, 1])[0],
+               rng.choice(["", "Strong communication", "Available immediately", "Needs relocation"]))
+
+
+def resume_records(seed, count, start=0, email_domain=None, file_sample=FILE_SAMPLE):
+    """
+    Resume records in the shape Bulk_Upload.batch_insert() takes, numbered
+    from start. Records below file_sample carry a PDF or DOCX file.
+    """
+    rng = random.Random(f"{seed}:resumes:{start}")
+    earlier = []
+    for i in range(start, start + count):
+        if earlier and rng.random() < DUPLICATE_SHARE:
+            record = dict(rng.choice(earlier))
+            record["summary"] = record["summary"].replace("years", "yrs", 1)
+            record["resume_text"] = record["resume_text"].replace("years", "yrs", 1)
+        else:
+            title = rng.choice(JOB_TITLES)
+            skills = rng.sample(SKILLS, rng.randint(5, 10))
+            city, state = rng.choice(LOCATIONS)
+            company = rng.choice(COMPANIES)
+            summary = rng.choice(SUMMARY_TEMPLATES).format(
+                title=title, years=rng.randint(1, 20), skills=", ".join(skills[:4]), company=company
+            )
+            record = {
+                "name": _person(rng), "phone": _phone(rng), "job_title": title, "current_company": company,
+                "skills": ", ".join(skills), "location": f"{city}, {state}", "summary": summary,
+            }
+            record["resume_text"] = "\n".join([
+                record["name"], f"{title} | {record['location']} | {record['phone']}", "Summary", summary,
+                "Skills", record["skills"], "Experience", f"{company}: {title}",
+            ])
+            if len(earlier) < 1000:
+                earlier.append(record)
+        name = record["name"].lower().replace(" ", ".")
+        record["email"] = f"{name}.{i}@{email_domain or 'candidates.example'}"
+        record["resume_file"], record["file_name"] = None, None
+        if i < file_sample:
+            if i % 2:
+                record["resume_file"], record["file_name"] = docx_bytes(record["resume_text"]), f"resume_{i}.docx"
+            else:
+                record["resume_file"], record["file_name"] = pdf_bytes(record["resume_text"]), f"resume_{i}.pdf"
+        yield record
+
+
+# ------------------------------------------------------------------------------
+# Loading
+# ------------------------------------------------------------------------------
+def _chunks(rows, size=CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert_resumes(conn, records):
+    for record in records:
+        cursor = conn.execute('''
+            INSERT INTO RESUMES (
+                NAME, EMAIL, PHONE_NUMBER, JOB_TITLE, CURRENT_JOB,
+                SKILLS, LOCATION, RESUME_SUMMARY, RESUME_FILE, FILE_NAME, RESUME_TEXT
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            record["name"], record["email"], record["phone"], record["job_title"], record["current_company"],
+            record["skills"], record["location"], record["summary"], record["resume_file"], record["file_name"],
+            record["resume_text"],
+        ))
+        index_resume(conn, cursor.lastrowid, record["name"], record["current_company"], record["skills"])
+        index_signature(conn, cursor.lastrowid, resume_text(
+            record["resume_text"], record["summary"], record["skills"], record["name"]
+        ))
+
+
+def generate(resumes, seed=0, file_sample=FILE_SAMPLE, progress=None):
+    """Fill the database with scale_counts(resumes) rows. Returns the counts."""
+    conn = get_connection()
+    run_migrations(conn)
+    counts = scale_counts(resumes)
+    report = progress or (lambda table, done, total: None)
+
+    steps = [
+        ("recruiters", "Recruiter", recruiters(seed, counts["recruiters"]),
+         "INSERT INTO Recruiter (Name, Email, Phone_Number, Location, Designation) VALUES (?, ?, ?, ?, ?)"),
+        ("jobs", "Jobs", jobs(seed, counts["jobs"]),
+         "INSERT INTO Jobs (Job_Details, Job_Location, Bill_Rate, Visas, Description, Client) VALUES (?, ?, ?, ?, ?, ?)"),
+    ]
+    for key, table, rows, sql in steps:
+        done = 0
+        for chunk in _chunks(rows):
+            conn.executemany(sql, chunk)
+            bump_version(conn, table)
+            conn.commit()
+            done += len(chunk)
+            report(table, done, counts[key])
+
+    job_rows = conn.execute("SELECT Job_ID, Job_Details, Client FROM Jobs ORDER BY Job_ID").fetchall()
+    recruiter_names = [row[0] for row in conn.execute("SELECT Name FROM Recruiter ORDER BY Recruiter_id")]
+    done = 0
+    for chunk in _chunks(submissions(seed, counts["submissions"], job_rows, recruiter_names)):
+        conn.executemany('''
+            INSERT INTO Submissions (Job_ID, Data_of_Submission, Client_Name, Job_title, Candidate_City,
+                                     Candidate_State, Candidate_Country, Recruiter_name, Visa, Pay_Rate, Status, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', chunk)
+        bump_version(conn, "Submissions")
+        conn.commit()
+        done += len(chunk)
+        report("Submissions", done, counts["submissions"])
+
+    done = 0
+    for chunk in _chunks(resume_records(seed, resumes, file_sample=file_sample), CHUNK_ROWS // 5):
+        _insert_resumes(conn, chunk)
+        bump_version(conn, "RESUMES")
+        conn.commit()
+        done += len(chunk)
+        report("RESUMES", done, resumes)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the ATS_DB_PATH database with synthetic data.")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="preset resume count")
+    parser.add_argument("--resumes", type=int, help="resume count (other tables scale with it)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--files", type=int, default=FILE_SAMPLE, help="resumes that get a PDF/DOCX file")
+    parser.add_argument("--force", action="store_true", help="add rows even if the database has resumes")
+    args = parser.parse_args()
+    resumes = args.resumes or SCALES.get(args.scale)
+    if not resumes:
+        parser.error("pass --scale or --resumes")
+
+    conn = get_connection()
+    run_migrations(conn)
+    if conn.execute("SELECT COUNT(*) FROM RESUMES").fetchone()[0] and not args.force:
+        sys.exit("The database already has resumes; use a fresh ATS_DB_PATH or pass --force.")
+
+    started = time.perf_counter()
+    last = {}
+
+    def progress(table, done, total):
+        # One line per table per ~10%, so 1M-row runs stay readable.
+        step = max(total // 10, 1)
+        if done == total or done // step != last.get(table, -1):
+            last[table] = done // step
+            print(f"{table}: {done}/{total} ({time.perf_counter() - started:.0f}s)", flush=True)
+
+    counts = generate(resumes, seed=args.seed, file_sample=args.files, progress=progress)
+    print(f"Generated {counts} in {time.perf_counter() - started:.0f}s")
+
+
+# ATS_DB_PATH=bench.db python -m utils.synthetic_data --scale 10k
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import streamlit as st
+import pandas as pd
+from utils.db import cached_query, get_connection
+from utils.dashboard import fetch_totals
+
+# ------------------------------------------------------------------------------
+# Server-side paginated table views for Recruiters, Jobs and Submissions
+# ------------------------------------------------------------------------------
+# Only the visible page is read from SQLite. Searches of three or more
+# characters go through a trigram FTS5 index (case-insensitive substring
+# match, like the old str.contains filter); shorter ones are indexed prefix
+# matches. Pages are fetched with keyset pagination on (sort column, key),
+# and every sortable column has an index, so deep pages cost the same as
+# the first one. Columns listed as "nullable" may hold NULLs, which SQLite
+# sorts first; their page cursors step into and out of the NULL block
+# explicitly, as a plain row-value comparison with NULL matches nothing.
+TABLE_VIEWS = {
+    "Jobs": {
+        "key": "Job_ID",
+        "search": "Description",
+        "sortable": ["Job_ID", "Job_Details", "Job_Location", "Bill_Rate", "Client"],
+    },
+    "Recruiter": {
+        "key": "Recruiter_id",
+        "search": "Name",
+        "sortable": ["Recruiter_id", "Name", "Location", "Designation"],
+    },
+    "Submissions": {
+        "key": "Submission_ID",
+        "search": "Client_Name",
+        "sortable": ["Submission_ID", "Data_of_Submission", "Client_Name", "Recruiter_name", "Status", "Job_ID"],
+        "nullable": ["Job_ID", "Data_of_Submission"],  # Job_ID is optional; legacy rows lack dates
+    },
+}
+PAGE_SIZES = [25, 50, 100, 250]
+MIN_FTS_LENGTH = 3  # the trigram tokenizer cannot match shorter strings
+
+
+def ensure_table_view(conn, table):
+    """Make sure the table's search index and sort indexes exist (created by migration 7)."""
+    from utils.migrations import run_migrations
+    run_migrations(conn)
+
+
+def _search_condition(table, search_term):
+    """SQL condition and parameters for the search box (empty when no search)."""
+    view = TABLE_VIEWS[table]
+    term = search_term.strip()
+    if not term:
+        return "", []
+    if len(term) >= MIN_FTS_LENGTH:
+        fts = f"{table.upper()}_SEARCH_FTS"
+        return (
+            f"{view['key']} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)",
+            ['"' + term.replace('"', '""') + '"']
+        )
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{view['search']} LIKE ? ESCAPE '\\'", [escaped + "%"]
+
+
+def fetch_page(table, search_term, sort_column, descending, page_size, cursor=None, offset=0):
+    """
+    One page of rows ordered by (sort_column, key). `cursor` is the
+    (sort value, key) of the last row on the previous page; without it the
+    page is located with OFFSET (only used for pages not reached by Next).
+    """
+    view = TABLE_VIEWS[table]
+    key = view["key"]
+    if sort_column not in view["sortable"]:
+        raise ValueError(f"Cannot sort {table} by {sort_column}")
+    ensure_table_view(get_connection(), table)
+
+    where, params = _search_condition(table, search_term)
+    clauses = [where] if where else []
+    direction, compare = ("DESC", "<") if descending else ("ASC", ">")
+    if cursor is not None:
+        value, last_key = cursor
+        if sort_column == key:
+            clauses.append(f"{key} {compare} ?")
+            params.append(last_key)
+        elif sort_column not in view.get("nullable", ()):
+            clauses.append(f"({sort_column}, {key}) {compare} (?, ?)")
+            params.extend(cursor)
+        elif value is None:
+            # Inside the NULL block: first in ascending order, last in descending.
+            rest = f"({sort_column} IS NULL AND {key} {compare} ?)"
+            clauses.append(f"({rest} OR {sort_column} IS NOT NULL)" if not descending else rest)
+            params.append(last_key)
+        else:
+            after = f"({sort_column}, {key}) {compare} (?, ?)"
+            clauses.append(f"({after} OR {sort_column} IS NULL)" if descending else after)
+            params.extend(cursor)
+    order = f"{key} {direction}" if sort_column == key else f"{sort_column} {direction}, {key} {direction}"
+    query = f"SELECT * FROM {table}"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += f" ORDER BY {order} LIMIT ?"
+    params.append(page_size)
+    if cursor is None and offset:
+        query += " OFFSET ?"
+        params.append(offset)
+    return cached_query(query, [table], params=params)
+
+
+def count_rows(table, search_term):
+    """Row count for the current search; the unfiltered total comes from the trigger-kept counters."""
+    where, params = _search_condition(table, search_term)
+    if not where:
+        return fetch_totals()[table]
+    ensure_table_view(get_connection(), table)
+    df = cached_query(f"SELECT COUNT(*) AS n FROM {table} WHERE {where}", [table], params=params)
+    return int(df["n"].iloc[0])
+
+
+def fetch_row(table, row_id):
+    """A single row by primary key as a Series, or None."""
+    key = TABLE_VIEWS[table]["key"]
+    df = pd.read_sql_query(f"SELECT * FROM {table} WHERE {key} = ?", get_connection(), params=(row_id,))
+    return None if df.empty else df.iloc[0]
+
+
+def _plain(value):
+    """numpy scalar -> Python value, so it can be bound as an SQL parameter (NaN -> None)."""
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def row_id_input(label, load_row, key):
+    """
+    ID box for the Edit / Remove actions. Any row can be picked, not only
+    those on the visible page. Returns (ID, row from load_row) or (None, None).
+    """
+    row_id = st.number_input(label, min_value=1, step=1, value=None, placeholder="ID from the table above", key=key)
+    if row_id is None:
+        return None, None
+    row = load_row(int(row_id))
+    if row is None:
+        st.warning(f"There is no row with ID {int(row_id)}.")
+        return None, None
+    return int(row_id), row
+
+
+def _set_page(prefix, page):
+    st.session_state[f"{prefix}_page"] = page
+
+
+def paged_table_view(table, title, search_label, prefix):
+    """
+    Search box, sort controls and one page of `table` inside an expander.
+    Returns (rows on the visible page, search term).
+    """
+    view = TABLE_VIEWS[table]
+    search_term = st.text_input(search_label, key=f"{prefix}_search")
+    col1, col2, col3 = st.columns([0.4, 0.3, 0.3])
+    sort_column = col1.selectbox("Sort by:", view["sortable"], key=f"{prefix}_sort")
+    descending = col2.toggle("Descending", value=True, key=f"{prefix}_desc")
+    page_size = col3.selectbox("Rows per page:", PAGE_SIZES, key=f"{prefix}_page_size")
+
+    # Start from the first page whenever the query changes.
+    query_key = (search_term, sort_column, descending, page_size)
+    if st.session_state.get(f"{prefix}_query_key") != query_key:
+        st.session_state[f"{prefix}_query_key"] = query_key
+        st.session_state[f"{prefix}_page"] = 0
+        st.session_state[f"{prefix}_cursors"] = {0: None}
+    page = st.session_state[f"{prefix}_page"]
+    cursors = st.session_state[f"{prefix}_cursors"]
+
+    df = fetch_page(
+        table, search_term, sort_column, descending, page_size,
+        cursor=cursors.get(page), offset=page * page_size
+    )
+    if not df.empty:
+        last = df.iloc[-1]
+        cursors[page + 1] = (_plain(last[sort_column]), _plain(last[view["key"]]))
+    total = count_rows(table, search_term)
+    page_count = max(1, -(-total // page_size))
+
+    with st.expander(title, expanded=bool(search_term)):
+        st.dataframe(df, hide_index=True, use_container_width=True)
+        col1, col2, col3 = st.columns([0.2, 0.6, 0.2])
+        col1.button("◀ Previous", key=f"{prefix}_prev", disabled=page == 0,
+                    on_click=_set_page, args=(prefix, page - 1))
+        col3.button("Next ▶", key=f"{prefix}_next", disabled=page >= page_count - 1,
+                    on_click=_set_page, args=(prefix, page + 1))
+        col2.markdown(f"Page **{page + 1}** of **{page_count}** ({total} rows)")
+    return df, search_term
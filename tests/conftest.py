@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+# ------------------------------------------------------------------------------
+# The modules import each other as utils.X (the app is checked out as a
+# package named utils). Alias that package to this checkout, and point the
+# shared connection at a scratch database so no test touches mydb.db.
+# ------------------------------------------------------------------------------
+ROOT = Path(__file__).resolve().parents[1]
+
+if "utils" not in sys.modules:
+    utils = types.ModuleType("utils")
+    utils.__path__ = [str(ROOT)]
+    sys.modules["utils"] = utils
+
+os.environ.setdefault("ATS_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="ats-tests-"), "mydb.db"))
@@ -0,0 +1,25 @@
+import sqlite3
+from utils.migrations import MIGRATIONS, foreign_keys_usable, run_migrations, schema_version, verify_indexes
+
+
+def _migrated(tmp_path):
+    conn = sqlite3.connect(tmp_path / "ats.db")
+    applied = run_migrations(conn)
+    return conn, applied
+
+
+def test_fresh_database_gets_every_migration(tmp_path):
+    conn, applied = _migrated(tmp_path)
+    assert applied == [version for version, _, _ in MIGRATIONS]
+    assert schema_version(conn) == MIGRATIONS[-1][0]
+
+
+def test_every_lookup_uses_its_index(tmp_path):
+    conn, _ = _migrated(tmp_path)
+    assert verify_indexes(conn) == []
+
+
+def test_foreign_keys_enforced_on_the_migrated_connection(tmp_path):
+    conn, _ = _migrated(tmp_path)
+    assert foreign_keys_usable(conn)
+    assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from utils.startup import HEAVY_PACKAGES, check_import_budget
+
+# Runs app.py headlessly (no one logs in) and lists the heavy packages loaded.
+_APP_SCRIPT = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("utils/app.py", default_timeout=60).run()
+if at.exception:
+    sys.exit(at.exception[0].message)
+print(json.dumps([name for name in sys.argv[1].split(",") if name in sys.modules]))
+"""
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def package_root(tmp_path):
+    """A directory whose utils/ is this checkout, as in a deployment."""
+    (tmp_path / "utils").symlink_to(ROOT, target_is_directory=True)
+    return tmp_path
+
+
+def test_login_modules_skip_heavy_packages(package_root):
+    _, problems = check_import_budget(budget=float("inf"), root=str(package_root))
+    assert problems == []
+
+
+def test_app_import_skips_heavy_packages(package_root):
+    try:
+        import streamlit_cookies_manager  # noqa: F401
+    except Exception as exc:  # it breaks on some Streamlit releases
+        pytest.skip(f"streamlit_cookies_manager unavailable: {exc!r}")
+    env = dict(os.environ, ATS_WARM_UP="0", ATS_PRESCORE="0")
+    result = subprocess.run(
+        [sys.executable, "-c", _APP_SCRIPT, ",".join(HEAVY_PACKAGES)],
+        cwd=package_root, env=env, capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []